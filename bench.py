@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Pigeon Finder Benchmark - Synthetic Duplicate Trees and Stage Timings
+
+Generates a reproducible directory tree, runs the scanner and engine, the
+scan pipeline and the CLI over it, and prints the timings as JSON so runs
+can be compared between commits:
+
+    python -m bench --files 5000 --output before.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.file_scanner import FileScanner
+from core.pigeonhole_engine import PigeonholeEngine
+from core.pipeline import ScanPipeline
+
+# Bumped whenever the JSON layout changes
+RESULT_VERSION = 1
+
+SIZE_DISTRIBUTIONS = ('log', 'uniform', 'fixed')
+
+# Bytes generated per write when filling a file
+WRITE_CHUNK = 1024 * 1024
+
+# Bytes at the end of a file that tell same-prefix variants apart
+TAIL_BYTES = 8
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cli', 'duplicate-finder.py')
+
+
+def _pick_size(rng: random.Random, distribution: str, min_size: int, max_size: int) -> int:
+    """Draw one file size"""
+    if distribution == 'fixed' or min_size >= max_size:
+        return min_size
+    if distribution == 'uniform':
+        return rng.randint(min_size, max_size)
+    # Log-uniform: as many small files as large ones per order of magnitude
+    return int(min_size * (max_size / min_size) ** rng.random())
+
+
+def write_content(path: str, spec: Tuple[int, int, int]):
+    """
+    Write the bytes described by a content spec
+
+    Args:
+        path: File to create
+        spec: (seed, size, tail) - random bytes from seed; a non-zero tail
+            replaces the last TAIL_BYTES bytes
+    """
+    seed, size, tail = spec
+    rng = random.Random(seed)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            length = WRITE_CHUNK if remaining > WRITE_CHUNK else remaining
+            # Random.randbytes needs Python 3.9
+            f.write(rng.getrandbits(8 * length).to_bytes(length, 'little'))
+            remaining -= length
+        if tail:
+            length = TAIL_BYTES if size > TAIL_BYTES else size
+            f.seek(size - length)
+            f.write(tail.to_bytes(TAIL_BYTES, 'little')[:length])
+
+
+def generate_tree(root: str, files: int = 1000, size_distribution: str = 'log',
+                  min_size: int = 1024, max_size: int = 1024 * 1024,
+                  duplicate_ratio: float = 0.3, same_size_ratio: float = 0.2,
+                  same_prefix_ratio: float = 0.1, depth: int = 3, fanout: int = 4,
+                  seed: int = 0) -> Dict:
+    """
+    Create a reproducible tree of files with known duplicates
+
+    Each file is one of:
+    - a duplicate: an exact copy of an earlier file
+    - same size: as large as an earlier file, but with other content
+    - same prefix: a copy of an earlier file with its last TAIL_BYTES bytes
+      changed, so it survives head screening and is only told apart at the end
+    - unique: new content with a size from size_distribution
+
+    Args:
+        root: Directory to create the tree in (created if missing)
+        files: Number of files
+        size_distribution: 'log' (log-uniform), 'uniform' or 'fixed' (min_size)
+        min_size: Smallest file size in bytes
+        max_size: Largest file size in bytes
+        duplicate_ratio: Share of files that duplicate an earlier file
+        same_size_ratio: Share of files that only match an earlier file's size
+        same_prefix_ratio: Share of files that match an earlier file except at the end
+        depth: Directory levels below root
+        fanout: Subdirectories per directory
+        seed: Random seed; the same arguments always give the same tree
+
+    Returns:
+        Manifest with the parameters, file and byte counts and the number
+        of duplicate groups the tree contains
+    """
+    if size_distribution not in SIZE_DISTRIBUTIONS:
+        raise ValueError(f"Unsupported size distribution: {size_distribution}")
+    if min_size < 1 or max_size < min_size:
+        raise ValueError("Sizes must satisfy 1 <= min_size <= max_size")
+    if duplicate_ratio + same_size_ratio + same_prefix_ratio > 1.0:
+        raise ValueError("duplicate, same-size and same-prefix ratios add up to more than 1")
+
+    rng = random.Random(seed)
+
+    directories = [root]
+    level = [root]
+    for d in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                next_level.append(os.path.join(parent, f"d{d}_{i}"))
+        directories.extend(next_level)
+        level = next_level
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+    specs: List[Tuple[int, int, int]] = []
+    copies: Dict[Tuple[int, int, int], int] = {}
+    kinds = {'unique': 0, 'duplicate': 0, 'same_size': 0, 'same_prefix': 0}
+    total_bytes = 0
+
+    for index in range(files):
+        roll = rng.random()
+        if specs and roll < duplicate_ratio:
+            kind = 'duplicate'
+            spec = rng.choice(specs)
+        elif specs and roll < duplicate_ratio + same_size_ratio:
+            kind = 'same_size'
+            spec = (rng.getrandbits(64), rng.choice(specs)[1], 0)
+        elif specs and roll < duplicate_ratio + same_size_ratio + same_prefix_ratio:
+            kind = 'same_prefix'
+            base_seed, base_size, _ = rng.choice(specs)
+            spec = (base_seed, base_size, rng.getrandbits(64) | 1)
+        else:
+            kind = 'unique'
+            spec = (rng.getrandbits(64),
+                    _pick_size(rng, size_distribution, min_size, max_size), 0)
+
+        if spec not in copies:
+            copies[spec] = 0
+            specs.append(spec)
+        copies[spec] += 1
+        kinds[kind] += 1
+        total_bytes += spec[1]
+
+        path = os.path.join(rng.choice(directories), f"file_{index:07d}.bin")
+        write_content(path, spec)
+
+    duplicate_groups = 0
+    duplicate_files = 0
+    for count in copies.values():
+        if count > 1:
+            duplicate_groups += 1
+            duplicate_files += count - 1
+
+    return {
+        'params': {
+            'files': files,
+            'size_distribution': size_distribution,
+            'min_size': min_size,
+            'max_size': max_size,
+            'duplicate_ratio': duplicate_ratio,
+            'same_size_ratio': same_size_ratio,
+            'same_prefix_ratio': same_prefix_ratio,
+            'depth': depth,
+            'fanout': fanout,
+            'seed': seed,
+        },
+        'directories': len(directories),
+        'files': files,
+        'bytes': total_bytes,
+        'kinds': kinds,
+        'duplicate_groups': duplicate_groups,
+        'duplicate_files': duplicate_files,
+    }
+
+
+def bench_engine(root: str, hash_algorithm: str = 'md5', workers: int = 1) -> Dict:
+    """Time FileScanner walk, size bucketing, then engine screening and hashing"""
+    scanner = FileScanner()
+    engine = PigeonholeEngine(hash_algorithm, workers=workers)
+
+    start = time.perf_counter()
+    scanner.scan_directories([root])
+    walked = time.perf_counter()
+    size_groups = scanner.get_file_id_groups_by_size()
+    bucketed = time.perf_counter()
+    groups = engine.find_duplicates(size_groups, file_info=scanner.file_table)
+    finished = time.perf_counter()
+
+    stats = engine.get_optimization_stats()
+    return {
+        'walk': walked - start,
+        'bucket': bucketed - walked,
+        'screening': stats['screening_time'],
+        'hashing': stats['hashing_time'],
+        'total': finished - start,
+        'groups': len(groups),
+        'partial_hashes': stats['partial_hashes'],
+        'full_hashes': stats['full_hashes'],
+        'bytes_read': stats['bytes_read'],
+    }
+
+
+def bench_pipeline(root: str, hash_algorithm: str = 'md5', workers: int = 1) -> Dict:
+    """Time the staged pipeline; its stages overlap, so only the total is meaningful"""
+    engine = PigeonholeEngine(hash_algorithm, workers=workers)
+    pipeline = ScanPipeline(engine, [root], hash_workers=workers)
+
+    start = time.perf_counter()
+    groups = pipeline.run()
+    finished = time.perf_counter()
+
+    return {
+        'total': finished - start,
+        'groups': len(groups),
+        'screen_hashes': pipeline.stats['screen_hashes'],
+        'full_hashes': pipeline.stats['full_hashes'],
+        'hashed_during_walk': pipeline.stats['hashed_during_walk'],
+    }
+
+
+def _load_cli():
+    """Import cli/duplicate-finder.py, whose file name is not a module name"""
+    spec = importlib.util.spec_from_file_location('duplicate_finder_cli', CLI_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_cli(root: str, hash_algorithm: str = 'md5', workers: int = 1) -> Dict:
+    """Time the CLI's scan (walk and bucketing) and its duplicate search"""
+    cli = _load_cli()
+
+    # The CLI reports its phases on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        files_by_size = cli.scan_files([root], None, 0, False, workers=workers)
+        scanned = time.perf_counter()
+        duplicate_sets = cli.find_duplicates(files_by_size, hash_algorithm)
+        finished = time.perf_counter()
+
+    return {
+        'scan': scanned - start,
+        'hashing': finished - scanned,
+        'total': finished - start,
+        'groups': len(duplicate_sets),
+    }
+
+
+BENCHMARKS = {
+    'engine': bench_engine,
+    'pipeline': bench_pipeline,
+    'cli': bench_cli,
+}
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(root: str, manifest: Dict, benchmarks: Optional[List[str]] = None,
+                   repeat: int = 3, hash_algorithm: str = 'md5', workers: int = 1) -> Dict:
+    """
+    Run each benchmark repeat times over a generated tree
+
+    Files stay in the page cache after the first run, so the timings
+    measure a warm cache.
+
+    Args:
+        root: Tree created by generate_tree
+        manifest: generate_tree's manifest for root
+        benchmarks: Names from BENCHMARKS (defaults to all)
+        repeat: Runs per benchmark
+        hash_algorithm: Hash algorithm for the engine, pipeline and CLI
+        workers: Hashing (and, for the CLI, listing) threads
+
+    Returns:
+        JSON-serializable results: every run plus the median of each timing
+    """
+    results = {}
+    for name in benchmarks or list(BENCHMARKS):
+        runs = [BENCHMARKS[name](root, hash_algorithm, workers) for _ in range(repeat)]
+        median = {}
+        for key, value in runs[0].items():
+            if isinstance(value, float):
+                median[key] = _median([run[key] for run in runs])
+            else:
+                median[key] = value
+        # Every implementation must find exactly the groups the tree was built with
+        median['correct'] = median['groups'] == manifest['duplicate_groups']
+        results[name] = {'median': median, 'runs': runs}
+
+    return {
+        'version': RESULT_VERSION,
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'hash_algorithm': hash_algorithm,
+        'workers': workers,
+        'repeat': repeat,
+        'tree': manifest,
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark Pigeon Finder on a synthetic duplicate tree")
+    parser.add_argument('--files', type=int, default=1000, help="Number of files to generate")
+    parser.add_argument('--size-distribution', choices=SIZE_DISTRIBUTIONS, default='log',
+                        help="How file sizes are drawn between --min-size and --max-size")
+    parser.add_argument('--min-size', type=int, default=1024, help="Smallest file size in bytes")
+    parser.add_argument('--max-size', type=int, default=1024 * 1024, help="Largest file size in bytes")
+    parser.add_argument('--duplicate-ratio', type=float, default=0.3,
+                        help="Share of files that are exact copies")
+    parser.add_argument('--same-size-ratio', type=float, default=0.2,
+                        help="Share of files with a shared size but different content")
+    parser.add_argument('--same-prefix-ratio', type=float, default=0.1,
+                        help="Share of files differing from another file only in the last bytes")
+    parser.add_argument('--depth', type=int, default=3, help="Directory levels")
+    parser.add_argument('--fanout', type=int, default=4, help="Subdirectories per directory")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the tree")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark")
+    parser.add_argument('--benchmark', action='append', choices=list(BENCHMARKS),
+                        help="Benchmark to run (repeatable; defaults to all)")
+    parser.add_argument('--hash-algorithm', default='md5', help="Hash algorithm to use")
+    parser.add_argument('--workers', type=int, default=1, help="Hashing threads")
+    parser.add_argument('--tree-dir', help="Generate the tree here and keep it (default: a temporary directory)")
+    parser.add_argument('--output', help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    root = args.tree_dir or tempfile.mkdtemp(prefix='pigeon_bench_')
+    try:
+        manifest = generate_tree(root, args.files, args.size_distribution, args.min_size,
+                                 args.max_size, args.duplicate_ratio, args.same_size_ratio,
+                                 args.same_prefix_ratio, args.depth, args.fanout, args.seed)
+        results = run_benchmarks(root, manifest, args.benchmark, args.repeat,
+                                 args.hash_algorithm, args.workers)
+    finally:
+        if not args.tree_dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
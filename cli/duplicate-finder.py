@@ -7,6 +7,13 @@ from collections import defaultdict
 from datetime import datetime
 import time
 
+# Make the project packages importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.hashing import FileHasher
+from core.file_walker import walk_files_parallel
+from core.file_table import FileTable
+
 # --- Configuration Constants ---
 HASH_CHUNK_SIZE = 65536     # 64 KB chunks for reading large files
 PARTIAL_HASH_SIZE = 4096    # Check first 4 KB for intermediate pigeonhole
@@ -55,63 +62,61 @@ def _hash_file_chunked(filepath, size_limit=None, hash_algorithm=hashlib.sha256)
         print(f"\n[ERROR] Failed to read or hash file {filepath}: {e}", file=sys.stderr)
         return None
 
-def get_partial_hash(filepath):
+def get_partial_hash(filepath, hash_algorithm=hashlib.sha256):
     """Calculates the hash of the first 4KB (PARTIAL_HASH_SIZE)."""
-    return _hash_file_chunked(filepath, size_limit=PARTIAL_HASH_SIZE)
+    return _hash_file_chunked(filepath, size_limit=PARTIAL_HASH_SIZE, hash_algorithm=hash_algorithm)
 
-def get_full_hash(filepath):
+def get_full_hash(filepath, hash_algorithm=hashlib.sha256):
     """Calculates the hash of the entire file."""
-    return _hash_file_chunked(filepath)
+    return _hash_file_chunked(filepath, hash_algorithm=hash_algorithm)
 
 # --- Core Logic Functions ---
 
-def scan_files(root_path, allowed_extensions, min_size, include_zero_byte):
+def scan_files(root_paths, allowed_extensions, min_size, include_zero_byte, workers=1):
     """
-    PIGEONHOLE LEVEL 1: Recursively scans directory and groups files by size.
+    PIGEONHOLE LEVEL 1: Recursively scans directories and groups files by size.
     Applies initial filtering (extension, min size, zero-byte handling).
+    Overlapping roots are scanned once; workers > 1 lists directories concurrently.
+    Only sizes shared by two or more files are returned.
     """
-    files_by_size = defaultdict(list)
+    table = FileTable()
     
-    print(f"\n[PHASE 1] Scanning {root_path} and Grouping by Size...")
-
-    for dirpath, _, filenames in os.walk(root_path):
-        for filename in filenames:
-            filepath = os.path.join(dirpath, filename)
-            
-            if not os.path.isfile(filepath):
-                continue
-                
-            try:
-                file_size = os.path.getsize(filepath)
-                
-                # 1. Zero-byte handling
-                if file_size == ZERO_BYTE_SIZE and not include_zero_byte:
-                    continue
-
-                # 2. Minimum size filtering
-                if file_size < min_size:
-                    continue
-
-                # 3. Extension filtering
-                if allowed_extensions:
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext not in allowed_extensions:
-                        continue
-                        
-                files_by_size[file_size].append(filepath)
-            
-            except OSError as e:
-                # Handle permission denied or other system errors
-                print(f"[WARNING] Skipping file {filepath} due to OS error: {e}", file=sys.stderr)
-
+    print(f"\n[PHASE 1] Scanning {', '.join(root_paths)} and Grouping by Size...")
+
+    def report_error(filepath, error):
+        # Handle permission denied or other system errors
+        print(f"[WARNING] Skipping file {filepath} due to OS error: {error}", file=sys.stderr)
+
+    # 1. Zero-byte handling, 2. Minimum size filtering and 3. Extension filtering
+    # happen inside the walker, before any per-file stat where possible
+    for entry in walk_files_parallel(root_paths, allowed_extensions, min_size,
+                                     include_zero_byte=include_zero_byte, on_error=report_error,
+                                     workers=workers):
+        table.add_entry(entry)
+
+    # Bucketing runs over the size column; sizes held by one file never become lists
+    files_by_size = {}
+    for size, file_ids in table.size_groups(include_zero_byte).items():
+        files_by_size[size] = [table.path_of(file_id) for file_id in file_ids]
     return files_by_size
 
-def find_duplicates(files_by_size):
+def find_duplicates(files_by_size, algorithm='sha256', prefilter_algorithm=None):
     """
     PIGEONHOLE LEVEL 2 & 3: Refines size-based groups using partial and full hashing.
+    Returns the list of confirmed duplicate sets (see iter_duplicates).
     """
+    return list(iter_duplicates(files_by_size, algorithm, prefilter_algorithm))
+
+def iter_duplicates(files_by_size, algorithm='sha256', prefilter_algorithm=None):
+    """
+    PIGEONHOLE LEVEL 2 & 3: Refines size-based groups using partial and full hashing.
+    A cheap prefilter_algorithm may be used for Level 2; Level 3 always uses algorithm.
+    Yields each confirmed duplicate set as soon as its Level 3 hashes are done.
+    """
+    full_hash_algorithm = FileHasher.HASH_ALGORITHMS[algorithm]
+    partial_hash_algorithm = FileHasher.HASH_ALGORITHMS[prefilter_algorithm or algorithm]
+
     potential_duplicates = defaultdict(list)
-    confirmed_duplicates = []
     
     # Filter for groups that have more than one file (i.e., potential duplicates)
     groups_to_check = {}
@@ -124,7 +129,7 @@ def find_duplicates(files_by_size):
         total_potential += len(paths)
     
     if not total_potential:
-        return []
+        return
         
     print(f"\n[PHASE 2] Starting 3-Level Pigeonhole Check on {total_potential} potential files...")
 
@@ -136,7 +141,7 @@ def find_duplicates(files_by_size):
         files_by_partial_hash = defaultdict(list)
 
         for filepath in file_list:
-            partial_hash = get_partial_hash(filepath)
+            partial_hash = get_partial_hash(filepath, partial_hash_algorithm)
             partial_hash_count += 1
             print(f"\r Hashing Level 2 Progress: {partial_hash_count}/{total_potential} files...", end='', flush=True)
 
@@ -157,7 +162,7 @@ def find_duplicates(files_by_size):
     
     if not total_to_full_hash:
         print("No files passed the partial hash check.")
-        return []
+        return
         
     print(f"\n[PHASE 3] Starting Full Hash Check on {total_to_full_hash} files...")
     
@@ -169,7 +174,7 @@ def find_duplicates(files_by_size):
         files_by_full_hash = defaultdict(list)
 
         for filepath in file_list:
-            full_hash = get_full_hash(filepath)
+            full_hash = get_full_hash(filepath, full_hash_algorithm)
             full_hash_count += 1
             print(f"\r Hashing Level 3 Progress: {full_hash_count}/{total_to_full_hash} files...", end='', flush=True)
 
@@ -179,10 +184,9 @@ def find_duplicates(files_by_size):
         # A set with len > 1 is a CONFIRMED duplicate group
         for _, paths in files_by_full_hash.items():
             if len(paths) > 1:
-                confirmed_duplicates.append(paths)
+                yield paths
 
     print("\n Hashing Level 3 Complete.")
-    return confirmed_duplicates
 
 # --- Action and Selection Functions ---
 
@@ -291,15 +295,40 @@ def process_action(duplicate_set, original_path, action, move_path=None):
 def generate_report(duplicate_sets, args, start_time):
     """
     Generates the final report to the console and optionally to a file.
+    duplicate_sets may be any iterable (e.g. iter_duplicates); each set is
+    announced and acted upon as soon as it arrives, while hashing continues.
     """
+    set_sections = []
+    total_sets = 0
+    total_duplicates = 0
+    total_processed = 0
+
+    for duplicate_set in duplicate_sets:
+        if len(duplicate_set) < 2:
+            continue
+        total_sets += 1
+        total_duplicates += (len(duplicate_set) - 1)
+
+        original_path = select_original_file(duplicate_set, args.keep_mode)
+        print(f"\n  [FOUND] Duplicate set {total_sets}: {len(duplicate_set)} files, keeping {original_path}")
+
+        set_sections.append(f"\n[DUPLICATE SET {total_sets}] ({len(duplicate_set)} files)")
+        set_sections.append(f"  Original ({args.keep_mode}): {original_path}")
+
+        files_to_remove = [p for p in duplicate_set if p != original_path]
+
+        # --- Perform Action if requested ---
+        if args.action:
+            processed_count = process_action(duplicate_set, original_path, args.action, args.move_path)
+            total_processed += processed_count
+            set_sections.append(f"  Action Result: Successfully processed {processed_count} file(s).")
+
+        set_sections.append("  Files Found (Duplicates to be acted upon):")
+        for path in files_to_remove:
+            set_sections.append(f"    - {path}")
+
     end_time = time.time()
     total_runtime = end_time - start_time
-    total_sets = len(duplicate_sets)
-    total_duplicates = 0
-    for s in duplicate_sets:
-        if len(s) > 1:
-            total_duplicates += (len(s) - 1)
-    
     
     report_content = []
     
@@ -309,8 +338,9 @@ def generate_report(duplicate_sets, args, start_time):
     report_content.append(f"Scan Time: {datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S')}")
     report_content.append(f"Runtime: {total_runtime:.2f} seconds")
     report_content.append("-" * 65)
-    report_content.append(f"Target Path: {args.path}")
+    report_content.append(f"Target Path: {', '.join(args.path)}")
     report_content.append(f"Keep Mode: {args.keep_mode}")
+    report_content.append(f"Hash Algorithm: {args.algorithm}")
     report_content.append(f"Zero-Byte Files Included: {args.include_zero_byte}")
     report_content.append(f"Action Taken: {args.action or 'None'}")
     if args.move_path:
@@ -321,27 +351,7 @@ def generate_report(duplicate_sets, args, start_time):
         report_content.append("\nSUCCESS: No confirmed duplicate file sets found.")
     else:
         report_content.append(f"\nSummary: Found {total_sets} Duplicate Set(s) containing {total_duplicates} duplicate files.")
-        
-        total_processed = 0
-        
-        for i, duplicate_set in enumerate(duplicate_sets, 1):
-            
-            original_path = select_original_file(duplicate_set, args.keep_mode)
-            
-            report_content.append(f"\n[DUPLICATE SET {i}] ({len(duplicate_set)} files)")
-            report_content.append(f"  Original ({args.keep_mode}): {original_path}")
-            
-            files_to_remove = [p for p in duplicate_set if p != original_path]
-            
-            # --- Perform Action if requested ---
-            if args.action:
-                processed_count = process_action(duplicate_set, original_path, args.action, args.move_path)
-                total_processed += processed_count
-                report_content.append(f"  Action Result: Successfully processed {processed_count} file(s).")
-                
-            report_content.append("  Files Found (Duplicates to be acted upon):")
-            for path in files_to_remove:
-                report_content.append(f"    - {path}")
+        report_content.extend(set_sections)
                 
         report_content.append("-" * 65)
         report_content.append(f"Total Duplicates Identified: {total_duplicates}")
@@ -375,7 +385,8 @@ def main():
     parser.add_argument(
         "path",
         type=str,
-        help="The root directory path to scan for duplicate files."
+        nargs="+",
+        help="One or more root directory paths to scan for duplicate files."
     )
     
     # Optional Filtering Arguments
@@ -391,6 +402,12 @@ def main():
         default=0,
         help="Minimum file size (in bytes) to consider for scanning. Default is 0."
     )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=1,
+        help="Number of threads listing directories in parallel (helps on network shares). Default is 1."
+    )
     parser.add_argument(
         "--include-zero-byte",
         action="store_true",
@@ -428,6 +445,22 @@ def main():
         help="Criteria used to select the 'original' file to keep: 'newest' (default), 'oldest', or 'path_length' (shortest path)."
     )
 
+    # Hashing Arguments
+    parser.add_argument(
+        "--algorithm",
+        type=str,
+        choices=list(FileHasher.HASH_ALGORITHMS.keys()),
+        default='sha256',
+        help="Hash algorithm used to confirm duplicates. Default is sha256."
+    )
+    parser.add_argument(
+        "--prefilter-algorithm",
+        type=str,
+        choices=['auto'] + list(FileHasher.HASH_ALGORITHMS.keys()),
+        default=None,
+        help="Cheaper hash used for the partial-hash check ('auto' picks the fastest installed). Defaults to --algorithm."
+    )
+
     # Output Argument
     parser.add_argument(
         "--output",
@@ -438,11 +471,12 @@ def main():
     args = parser.parse_args()
     
     # --- Pre-Execution Validation ---
-    root_path = os.path.abspath(args.path)
+    root_paths = [os.path.abspath(path) for path in args.path]
 
-    if not os.path.isdir(root_path):
-        print(f"Error: Path '{root_path}' is not a valid directory.", file=sys.stderr)
-        sys.exit(1)
+    for root_path in root_paths:
+        if not os.path.isdir(root_path):
+            print(f"Error: Path '{root_path}' is not a valid directory.", file=sys.stderr)
+            sys.exit(1)
         
     if args.action == 'move' and not args.move_path:
         print("Error: When using --move, you must specify a destination path using --move-path.", file=sys.stderr)
@@ -455,12 +489,16 @@ def main():
     print(f"\nStarting Duplicate Finder Scan at {datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S')}")
     
     # --- 1. Scan and Size Pigeonhole (Level 1) ---
-    files_by_size = scan_files(root_path, allowed_extensions, args.min_size, args.include_zero_byte)
+    files_by_size = scan_files(root_paths, allowed_extensions, args.min_size, args.include_zero_byte,
+                               workers=args.scan_workers)
 
     # --- 2. Hashing Pigeonhole (Level 2 & 3) ---
-    duplicate_sets = find_duplicates(files_by_size)
+    prefilter_algorithm = args.prefilter_algorithm
+    if prefilter_algorithm == 'auto':
+        prefilter_algorithm = FileHasher.fastest_algorithm()
+    duplicate_sets = iter_duplicates(files_by_size, args.algorithm, prefilter_algorithm)
 
-    # --- 3. Reporting and Action ---
+    # --- 3. Reporting and Action (streamed: sets are handled as they are confirmed) ---
     generate_report(duplicate_sets, args, start_time)
 
 if __name__ == "__main__":
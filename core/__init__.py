@@ -3,8 +3,13 @@ Pigeon Finder Core Modules
 """
 
 from .file_scanner import FileScanner
+from .file_table import FileTable
 from .hashing import FileHasher
+from .hash_cache import HashCache
 from .duplicate_manager import DuplicateManager
 from .pigeonhole_engine import PigeonholeEngine
+from .scan_snapshot import ScanSnapshot
+from .live_index import LiveDuplicateIndex
 
-__all__ = ['FileScanner', 'FileHasher', 'DuplicateManager', 'PigeonholeEngine']
\ No newline at end of file
+__all__ = ['FileScanner', 'FileTable', 'FileHasher', 'HashCache', 'DuplicateManager', 'PigeonholeEngine',
+           'ScanSnapshot', 'LiveDuplicateIndex']
\ No newline at end of file
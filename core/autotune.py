@@ -0,0 +1,261 @@
+"""
+Adaptive I/O Concurrency Tuning from Measured Throughput
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+import logging
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Filesystems where many requests in flight hide per-request latency
+NETWORK_FILESYSTEMS = ('nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'fuse.sshfs', 'afs', '9p')
+
+
+def mount_point(path: str) -> str:
+    """Mount point holding a path"""
+    path = os.path.realpath(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def filesystem_type(mount: str) -> Optional[str]:
+    """Filesystem type of a mount point, if psutil can tell"""
+    if psutil is None:
+        return None
+    try:
+        for partition in psutil.disk_partitions(all=True):
+            if partition.mountpoint == mount:
+                return partition.fstype.lower()
+    except Exception as e:
+        logger.debug(f"Could not list partitions: {e}")
+    return None
+
+
+class IOAutotuner:
+    """
+    Hill-climbing tuner for hashing concurrency and read size
+
+    The engine reports every finished file through observe(). Every
+    SAMPLE_SECONDS the achieved throughput is scored and compared with the
+    best setting so far. The worker count is tuned first: it is doubled
+    while that helps, and halved when doubling did not help. Network
+    storage usually ends up with many workers, spinning disks with few.
+    Then the read size is tuned the same way, and the settings stay fixed.
+
+    The score is bytes per second plus SEEK_COST_BYTES for every file, so
+    runs of many small files (where files/s matters) and of few large
+    files (where MB/s matters) both give a useful signal.
+
+    Settled values are stored per mount point in PROFILE_PATH and used as
+    the starting point of the next run on that mount.
+    """
+
+    PROFILE_PATH = Path.home() / ".pigeonfinder" / "io_profiles.json"
+
+    SAMPLE_SECONDS = 0.5
+    MIN_SAMPLE_FILES = 8
+    # Relative score gain a change must bring to be kept
+    IMPROVEMENT = 0.05
+    SEEK_COST_BYTES = 64 * 1024
+
+    MIN_CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, mount: str = '', workers: int = 4, chunk_size: int = 65536,
+                 max_workers: int = 32, profile_path: Optional[Path] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            mount: Mount point the profile is stored under
+            workers: Starting worker count
+            chunk_size: Starting read size in bytes
+            max_workers: Upper bound for the worker count
+            profile_path: Profile file (defaults to PROFILE_PATH)
+            clock: Time source, replaceable for tests
+        """
+        self.mount = mount
+        self.max_workers = max_workers
+        self.workers = self._clamp_workers(workers)
+        self.chunk_size = self._clamp_chunk(chunk_size)
+        self.profile_path = Path(profile_path) if profile_path else self.PROFILE_PATH
+        self._clock = clock
+
+        # 'workers', then 'chunk_size', then 'settled'
+        self.phase = 'workers'
+        self._best_score: Optional[float] = None
+        self._best_value: Optional[int] = None
+        self._direction = 'up'
+
+        self._sample_start = clock()
+        self._sample_files = 0
+        self._sample_bytes = 0
+        self._last_bytes: Optional[int] = None
+
+        self.bytes_per_second = 0.0
+        self.files_per_second = 0.0
+        self.adjustments = 0
+
+    @classmethod
+    def for_path(cls, path: str, workers: int = 4, chunk_size: int = 65536,
+                 max_workers: int = 32, profile_path: Optional[Path] = None) -> 'IOAutotuner':
+        """
+        Tuner for the mount holding path, starting from its stored profile
+
+        Without a profile, network filesystems start with at least 8 workers.
+        """
+        mount = mount_point(path)
+        profile = cls.load_profiles(profile_path).get(mount)
+        if profile:
+            workers = profile.get('workers', workers)
+            chunk_size = profile.get('chunk_size', chunk_size)
+            logger.info(f"Using I/O profile for {mount}: {workers} workers, {chunk_size} byte reads")
+        elif filesystem_type(mount) in NETWORK_FILESYSTEMS and workers < 8:
+            workers = 8
+        return cls(mount, workers, chunk_size, max_workers, profile_path)
+
+    @classmethod
+    def load_profiles(cls, profile_path: Optional[Path] = None) -> Dict[str, Dict]:
+        """Stored profiles by mount point"""
+        path = Path(profile_path) if profile_path else cls.PROFILE_PATH
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def begin(self, bytes_total: int = 0):
+        """Start measuring from the current value of the byte counter"""
+        self._last_bytes = bytes_total
+        self._sample_start = self._clock()
+        self._sample_files = 0
+        self._sample_bytes = 0
+
+    def observe(self, bytes_total: int, files: int = 1) -> bool:
+        """
+        Record finished files and adjust the settings when a sample is complete
+
+        Args:
+            bytes_total: Running total of bytes read (any monotonic counter)
+            files: Files finished since the last call
+
+        Returns:
+            True if workers or chunk_size changed
+        """
+        if self._last_bytes is not None:
+            self._sample_bytes += bytes_total - self._last_bytes
+        self._last_bytes = bytes_total
+        self._sample_files += files
+
+        elapsed = self._clock() - self._sample_start
+        if elapsed < self.SAMPLE_SECONDS or self._sample_files < self.MIN_SAMPLE_FILES:
+            return False
+
+        self.bytes_per_second = self._sample_bytes / elapsed
+        self.files_per_second = self._sample_files / elapsed
+        score = (self._sample_bytes + self._sample_files * self.SEEK_COST_BYTES) / elapsed
+        self._sample_start = self._clock()
+        self._sample_files = 0
+        self._sample_bytes = 0
+
+        if self.phase == 'settled':
+            return False
+        return self._climb(score)
+
+    def _climb(self, score: float) -> bool:
+        """One hill-climbing step on the parameter of the current phase"""
+        current = self.workers if self.phase == 'workers' else self.chunk_size
+
+        if self._best_score is None or score > self._best_score * (1 + self.IMPROVEMENT):
+            self._best_score, self._best_value = score, current
+            proposal = self._step(current)
+            if proposal == current and self._direction == 'up':
+                # Already at the upper limit; see whether less is better
+                self._direction = 'down'
+                proposal = self._step(current)
+        elif self._direction == 'up':
+            # Going up did not pay off; try the other side of the best value
+            self._direction = 'down'
+            proposal = self._step(self._best_value)
+        else:
+            proposal = self._best_value
+
+        if proposal == self._best_value:
+            return self._next_phase()
+        return self._apply(proposal)
+
+    def _step(self, value: int) -> int:
+        """Next value to try in the current direction"""
+        value = value * 2 if self._direction == 'up' else value // 2
+        if self.phase == 'workers':
+            return self._clamp_workers(value)
+        return self._clamp_chunk(value)
+
+    def _next_phase(self) -> bool:
+        """Fix the best value of this phase and move on"""
+        changed = self._apply(self._best_value)
+        logger.info(f"I/O tuning for {self.mount or 'storage'}: {self.phase} settled at {self._best_value}")
+        self.phase = 'chunk_size' if self.phase == 'workers' else 'settled'
+        self._best_score = None
+        self._best_value = None
+        self._direction = 'up'
+        return changed
+
+    def _apply(self, value: int) -> bool:
+        """Set the parameter of the current phase"""
+        if self.phase == 'workers':
+            changed = value != self.workers
+            self.workers = value
+        else:
+            changed = value != self.chunk_size
+            self.chunk_size = value
+        if changed:
+            self.adjustments += 1
+        return changed
+
+    def _clamp_workers(self, workers: int) -> int:
+        if workers < 1:
+            return 1
+        if workers > self.max_workers:
+            return self.max_workers
+        return workers
+
+    def _clamp_chunk(self, chunk_size: int) -> int:
+        if chunk_size < self.MIN_CHUNK_SIZE:
+            return self.MIN_CHUNK_SIZE
+        if chunk_size > self.MAX_CHUNK_SIZE:
+            return self.MAX_CHUNK_SIZE
+        return chunk_size
+
+    def save(self):
+        """Record the current settings for this mount point"""
+        if not self.mount:
+            return
+        profiles = self.load_profiles(self.profile_path)
+        profiles[self.mount] = {
+            'workers': self.workers,
+            'chunk_size': self.chunk_size,
+            'bytes_per_second': round(self.bytes_per_second),
+            'files_per_second': round(self.files_per_second, 1),
+            'updated': time.time()
+        }
+        try:
+            self.profile_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.profile_path.with_name(self.profile_path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(profiles, f, indent=2)
+            os.replace(temp_path, self.profile_path)
+        except OSError as e:
+            logger.warning(f"Could not save I/O profile: {e}")
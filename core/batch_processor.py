@@ -3,12 +3,13 @@ Advanced Batch Processing for Large Operations
 """
 
 import threading
-import queue
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import List, Dict, Callable, Any
 import logging
 import os
 from pathlib import Path
+from .progress import ProgressReporter, ProgressSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +17,27 @@ class BatchProcessor:
     """
     Advanced batch processor with threading and progress tracking
     for handling large file operations
+    
+    Batches run on a pool of at most max_workers threads. Only a few
+    batches per worker are submitted ahead, so a huge task list never
+    turns into thousands of queued futures. Workers count finished tasks
+    in a ProgressReporter, which the calling thread polls so progress is
+    reported at most every PROGRESS_INTERVAL seconds.
     """
     
+    # Minimum seconds between two progress events
+    PROGRESS_INTERVAL = 0.1
+    
+    # Batches submitted ahead per worker
+    BATCHES_PER_WORKER = 2
+    
     def __init__(self, max_workers=4, batch_size=100):
         self.max_workers = max_workers
         self.batch_size = batch_size
-        self.workers = []
-        self.task_queue = queue.Queue()
-        self.result_queue = queue.Queue()
         self.is_running = False
         self.progress_callbacks = []
+        self._stop_event = threading.Event()
+        self._progress = ProgressReporter([self._report_snapshot], interval=self.PROGRESS_INTERVAL)
     
     def add_progress_callback(self, callback: Callable):
         """Add progress callback function"""
@@ -40,81 +52,94 @@ class BatchProcessor:
             process_func: Function to process each task
             
         Returns:
-            List of results
+            List of results in task order. After stop_processing only the
+            tasks that ran are included.
         """
         if not tasks:
             return []
         
         self.is_running = True
-        self.workers = []
-        results = []
-        
-        # Split tasks into batches
-        batches = [tasks[i:i + self.batch_size] for i in range(0, len(tasks), self.batch_size)]
+        self._stop_event.clear()
         
-        total_batches = len(batches)
-        completed_batches = 0
+        batch_size = self.batch_size if self.batch_size > 0 else 1
+        workers = self.max_workers if self.max_workers > 0 else 1
+        total_tasks = len(tasks)
+        total_batches = (total_tasks + batch_size - 1) // batch_size
+        batch_results = [None] * total_batches
+        progress = self._progress
+        progress.set_stage("Processed", files_total=total_tasks)
         
-        def worker(batch, batch_index):
-            """Worker function to process a batch"""
-            batch_results = []
-            for task_index, task in enumerate(batch):
-                if not self.is_running:
+        def worker(batch_index):
+            """Process one batch, stopping early when cancelled"""
+            results = []
+            start = batch_index * batch_size
+            for task in tasks[start:start + batch_size]:
+                if self._stop_event.is_set():
                     break
                 
                 try:
-                    result = process_func(task)
-                    batch_results.append(result)
-                    
-                    # Calculate overall progress
-                    overall_progress = ((batch_index * self.batch_size + task_index + 1) / len(tasks)) * 100
-                    self._notify_progress(overall_progress, f"Processing batch {batch_index + 1}/{total_batches}")
-                    
+                    results.append(process_func(task))
                 except Exception as e:
                     logger.error(f"Batch processing error for task {task}: {e}")
-                    batch_results.append({'error': str(e), 'task': task})
-            
-            self.result_queue.put((batch_index, batch_results))
+                    results.append({'error': str(e), 'task': task})
+                
+                progress.add(files=1)
+            return batch_index, results
         
-        # Start workers for each batch
-        for i, batch in enumerate(batches):
-            if not self.is_running:
-                break
-            thread = threading.Thread(target=worker, args=(batch, i))
-            thread.daemon = True
-            thread.start()
-            self.workers.append(thread)
+        next_batch = 0
+        in_flight = set()
         
-        # Collect results
-        batch_results = [None] * total_batches
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while next_batch < total_batches or in_flight:
+                    # Backpressure: keep only a few batches per worker queued
+                    while (next_batch < total_batches and not self._stop_event.is_set()
+                           and len(in_flight) < workers * self.BATCHES_PER_WORKER):
+                        in_flight.add(executor.submit(worker, next_batch))
+                        next_batch += 1
+                    
+                    if self._stop_event.is_set():
+                        next_batch = total_batches
+                    if not in_flight:
+                        break
+                    
+                    done, in_flight = wait(in_flight, timeout=self.PROGRESS_INTERVAL,
+                                           return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch_index, results = future.result()
+                        batch_results[batch_index] = results
+                    
+                    progress.poll()
+        finally:
+            cancelled = self._stop_event.is_set()
+            self.is_running = False
         
-        while completed_batches < total_batches and self.is_running:
-            try:
-                batch_index, results_batch = self.result_queue.get(timeout=1.0)
-                batch_results[batch_index] = results_batch
-                completed_batches += 1
-                
-                self._notify_progress(
-                    (completed_batches / total_batches) * 100,
-                    f"Completed {completed_batches}/{total_batches} batches"
-                )
-                
-            except queue.Empty:
-                continue
+        if cancelled:
+            logger.info(f"Batch processing stopped after {progress.totals()[0]}/{total_tasks} tasks")
+        else:
+            progress.flush()
         
         # Flatten results
+        results = []
         for batch in batch_results:
             if batch:
                 results.extend(batch)
-        
-        self.is_running = False
         return results
     
     def stop_processing(self):
-        """Stop batch processing"""
+        """
+        Stop batch processing
+        
+        Running tasks finish; no further task starts. Safe to call from
+        any thread, including a progress callback.
+        """
+        self._stop_event.set()
         self.is_running = False
-        for worker in self.workers:
-            worker.join(timeout=1.0)
+    
+    def _report_snapshot(self, snapshot: ProgressSnapshot):
+        """Report the tasks completed so far across all workers"""
+        self._notify_progress(snapshot.percent,
+                              f"Processed {snapshot.files_done}/{snapshot.files_total} items")
     
     def _notify_progress(self, progress: float, message: str):
         """Notify progress to all callbacks"""
@@ -133,21 +158,31 @@ class SmartBatchManager:
         self.processor = BatchProcessor()
         self.operation_history = []
     
+    # Files stat'ed to estimate the average size of a batch job
+    SIZE_SAMPLE_FILES = 32
+    
     def optimize_batch_size(self, file_paths: List[str]) -> int:
-        """Dynamically determine optimal batch size based on file characteristics"""
+        """
+        Dynamically determine optimal batch size based on file characteristics
+        
+        The average size is estimated from up to SIZE_SAMPLE_FILES evenly
+        spaced files, so large jobs are not stat'ed twice.
+        """
         if not file_paths:
             return 100
-        # Compute total size of existing files without using built-in sum()
+        
+        step = len(file_paths) // self.SIZE_SAMPLE_FILES or 1
         total_size = 0
-        for f in file_paths:
+        sampled = 0
+        for f in file_paths[::step][:self.SIZE_SAMPLE_FILES]:
             try:
-                if os.path.exists(f):
-                    total_size += os.path.getsize(f)
-            except Exception:
+                total_size += os.path.getsize(f)
+                sampled += 1
+            except OSError:
                 # Ignore files we cannot stat
                 continue
 
-        avg_size = total_size / len(file_paths) if file_paths else 0
+        avg_size = total_size / sampled if sampled else 0
         
         # Adjust batch size based on average file size
         if avg_size > 100 * 1024 * 1024:  # > 100MB
@@ -161,8 +196,6 @@ class SmartBatchManager:
     
     def batch_delete(self, file_paths: List[str], use_trash: bool = True) -> Dict:
         """Batch delete files with optimization"""
-        from ..core.duplicate_manager import DuplicateManager
-        
         self.processor.batch_size = self.optimize_batch_size(file_paths)
         
         def delete_task(file_path):
@@ -247,11 +280,20 @@ class SmartBatchManager:
             'destination': destination
         }
     
-    def batch_hash(self, file_paths: List[str], algorithm: str = 'md5') -> Dict:
-        """Batch compute file hashes"""
-        from ..core.hashing import FileHasher
+    def batch_hash(self, file_paths: List[str], algorithm: str = 'md5',
+                   backend: str = 'thread') -> Dict:
+        """
+        Batch compute file hashes
+        
+        Args:
+            file_paths: Files to hash
+            algorithm: Hash algorithm
+            backend: 'thread' for the BatchProcessor threads, or 'process'
+                for a ProcessHashPool with max_workers processes, which
+                scales CPU-bound digests (sha256, sha512) across cores
+        """
+        from .hashing import FileHasher
         
-        self.processor.batch_size = self.optimize_batch_size(file_paths)
         hasher = FileHasher(algorithm)
         
         def hash_task(file_path):
@@ -266,7 +308,39 @@ class SmartBatchManager:
             except Exception as e:
                 return {'success': False, 'file': file_path, 'error': str(e)}
         
-        results = self.processor.process_batch(file_paths, hash_task)
+        if backend == 'process':
+            from .process_hashing import ProcessHashPool
+            
+            results = []
+            with ProcessHashPool(self.processor.max_workers) as pool:
+                for file_path, file_hash in hasher.map_hashes(file_paths, pool):
+                    if file_hash is None:
+                        results.append({'success': False, 'file': file_path,
+                                        'error': 'File could not be read'})
+                        continue
+                    try:
+                        size = os.path.getsize(file_path)
+                    except OSError as e:
+                        results.append({'success': False, 'file': file_path, 'error': str(e)})
+                        continue
+                    results.append({'success': True, 'file': file_path,
+                                    'hash': file_hash, 'size': size})
+        elif backend == 'thread':
+            from .autotune import IOAutotuner, mount_point
+            
+            # Reuse the worker count tuned for this mount by earlier scans
+            default_workers = self.processor.max_workers
+            if file_paths:
+                profile = IOAutotuner.load_profiles().get(mount_point(file_paths[0]))
+                if profile:
+                    self.processor.max_workers = profile.get('workers', default_workers)
+            self.processor.batch_size = self.optimize_batch_size(file_paths)
+            try:
+                results = self.processor.process_batch(file_paths, hash_task)
+            finally:
+                self.processor.max_workers = default_workers
+        else:
+            raise ValueError(f"Unsupported hashing backend: {backend}")
         
         # Group by hash to find duplicates
         hash_groups = {}
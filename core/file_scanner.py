@@ -10,21 +10,38 @@ import psutil
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import logging
+from .file_walker import walk_files_parallel, list_directory, normalize_roots
+from .scan_snapshot import ScanSnapshot, changed_sizes
+from .file_table import FileTable
+from .pipeline import ScanPipeline
+from .progress import ProgressReporter, percent_callback
 
 logger = logging.getLogger(__name__)
 
 class FileScanner:
     """Advanced file scanner with real-time monitoring"""
     
+    # Directories modified this recently are re-listed on the next scan, since
+    # a change within the filesystem's timestamp granularity would be missed
+    RACY_WINDOW_NS = 2_000_000_000
+    
     def __init__(self):
-        self.scanned_files: Dict[str, Dict] = {}
+        self.file_table = FileTable()
+        # Sizes whose buckets changed in the last incremental scan (None: all)
+        self.dirty_sizes: Optional[Set[int]] = None
         self.observer = None
         self.is_monitoring = False
+    
+    @property
+    def scanned_files(self) -> FileTable:
+        """Files from the last scan, as a read-only path -> info mapping"""
+        return self.file_table
         
     def scan_directory(self, directory: str, 
                       extensions: Optional[List[str]] = None,
                       min_size: int = 0,
-                      max_size: int = 0) -> Dict[str, Dict]:
+                      max_size: int = 0,
+                      workers: int = 1) -> FileTable:
         """
         Scan directory for files with optional filters
         
@@ -33,70 +50,229 @@ class FileScanner:
             extensions: List of file extensions to include
             min_size: Minimum file size in bytes
             max_size: Maximum file size in bytes
+            workers: Number of directory listing threads
+            
+        Returns:
+            FileTable with the scanned files (a path -> info mapping)
+        """
+        return self.scan_directories([directory], extensions, min_size, max_size, workers)
+    
+    def scan_directories(self, directories: List[str],
+                        extensions: Optional[List[str]] = None,
+                        min_size: int = 0,
+                        max_size: int = 0,
+                        workers: int = 1,
+                        progress_callback=None) -> FileTable:
+        """
+        Scan several directories in one pass
+        
+        Overlapping roots (the same directory twice, or one root inside
+        another) are only walked once. With workers > 1 subdirectories are
+        listed concurrently, which mostly helps on network filesystems.
+        The number of files found is reported at most ten times a second;
+        the total is unknown until the walk ends, so the percentage stays 0.
+        
+        Args:
+            directories: Paths to scan
+            extensions: List of file extensions to include
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes
+            workers: Number of directory listing threads
+            progress_callback: Called as progress_callback(percent, message)
+            
+        Returns:
+            FileTable with the scanned files (a path -> info mapping)
+        """
+        directories = [os.path.normpath(directory) for directory in directories]
+        for directory in directories:
+            if not os.path.exists(directory):
+                raise ValueError(f"Directory does not exist: {directory}")
+            
+        progress = None
+        if progress_callback:
+            progress = ProgressReporter([percent_callback(progress_callback)])
+            progress.set_stage("Scanning")
+            
+        table = FileTable()
+        for entry in walk_files_parallel(directories, extensions, min_size, max_size,
+                                         skip_dir=self._is_skipped_directory,
+                                         workers=workers):
+            table.add_entry(entry)
+            if progress is not None:
+                progress.add(files=1)
+                progress.poll()
+        if progress is not None:
+            progress.flush()
+        
+        self.file_table = table
+        logger.info(f"Scanned {len(table)} files from {', '.join(directories)} "
+                    f"({table.memory_usage() / (1024 * 1024):.1f} MB of metadata)")
+        return table
+    
+    def scan_pipeline(self, directories: List[str], engine,
+                      extensions: Optional[List[str]] = None,
+                      min_size: int = 0,
+                      max_size: int = 0,
+                      workers: int = 1,
+                      progress_callback=None) -> ScanPipeline:
+        """
+        Set up a scan that hashes shared sizes while the walk is still running
+        
+        The pipeline's file table becomes this scanner's file table and
+        fills in as the pipeline runs; iterate ScanPipeline.stream() (or
+        call run()) to perform the scan.
+        
+        Args:
+            directories: Paths to scan
+            engine: PigeonholeEngine providing hashers, cache and statistics
+            extensions: List of file extensions to include
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes
+            workers: Number of directory listing threads
+            progress_callback: Called as progress_callback(percent, message)
             
         Returns:
-            Dictionary of file information
+            ScanPipeline ready to run
+        """
+        directories = [os.path.normpath(directory) for directory in directories]
+        for directory in directories:
+            if not os.path.exists(directory):
+                raise ValueError(f"Directory does not exist: {directory}")
+        
+        pipeline = ScanPipeline(engine, directories, extensions, min_size, max_size,
+                                skip_dir=self._is_skipped_directory, walk_workers=workers,
+                                progress_callback=progress_callback)
+        self.file_table = pipeline.file_table
+        self.dirty_sizes = None
+        return pipeline
+    
+    def scan_incremental(self, directories: List[str], snapshot: ScanSnapshot,
+                         extensions: Optional[List[str]] = None,
+                         min_size: int = 0,
+                         max_size: int = 0) -> Dict[str, Dict]:
         """
-        directory = os.path.normpath(directory)
-        if not os.path.exists(directory):
-            raise ValueError(f"Directory does not exist: {directory}")
+        Rescan directories, reusing a previous snapshot where nothing changed
+        
+        Every directory is stat'ed, but only directories whose mtime differs
+        from the snapshot are listed again; files in the others are taken
+        from the snapshot. The sizes of added, removed and changed files are
+        left in self.dirty_sizes so only those buckets need re-checking.
+        The snapshot is updated in place. If it was taken with other roots
+        or filters it is reset and self.dirty_sizes is None (everything).
+        
+        Args:
+            directories: Paths to scan
+            snapshot: Snapshot from the previous scan (may be empty)
+            extensions: List of file extensions to include
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes
             
-        self.scanned_files.clear()
-        scanned_count = 0
+        Returns:
+            FileTable with the scanned files (a path -> info mapping)
+        """
+        roots = normalize_roots(directories)
+        for directory in roots:
+            if not os.path.exists(directory):
+                raise ValueError(f"Directory does not exist: {directory}")
+        
+        filters = ScanSnapshot.make_filters(extensions, min_size, max_size)
+        full_scan = not snapshot.matches(roots, filters)
+        if full_scan:
+            snapshot.reset(roots, filters)
+        
+        allowed_extensions = set(filters['extensions']) or None
+        previous = snapshot.directories
+        current = {}
+        dirty_sizes = set()
+        relisted = 0
+        racy_limit = time.time_ns() - self.RACY_WINDOW_NS
         
-        for root, dirs, files in os.walk(directory):
-            # Skip system directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['System Volume Information']]
+        table = FileTable()
+        stack = list(reversed(roots))
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError as e:
+                logger.warning(f"Could not access {directory}: {e}")
+                continue
+            
+            record = previous.get(directory)
+            if record is not None and record['mtime_ns'] == mtime_ns:
+                files, subdirectories = record['files'], record['subdirs']
+            else:
+                entries, subdirectory_paths = list_directory(
+                    directory, allowed_extensions, min_size, max_size, True,
+                    self._is_skipped_directory, self._log_scan_error
+                )
+                files = [[entry.name, entry.size, entry.mtime, entry.ctime, entry.mtime_ns,
+                          entry.device, entry.inode] for entry in entries]
+                subdirectories = [os.path.basename(path) for path in subdirectory_paths]
+                dirty_sizes.update(changed_sizes(record['files'] if record else None, files))
+                relisted += 1
+            
+            current[directory] = {
+                'mtime_ns': mtime_ns if mtime_ns < racy_limit else None,
+                'files': files,
+                'subdirs': subdirectories
+            }
             
-            for file in files:
-                try:
-                    file_path = os.path.join(root, file)
-                    
-                    # Get file stats
-                    stat = os.stat(file_path)
-                    file_size = stat.st_size
-                    
-                    # Apply filters
-                    if min_size > 0 and file_size < min_size:
-                        continue
-                    if max_size > 0 and file_size > max_size:
-                        continue
-                    if extensions:
-                        file_ext = Path(file).suffix.lower()
-                        if file_ext not in [ext.lower() for ext in extensions]:
-                            continue
-                    
-                    # Store file info
-                    self.scanned_files[file_path] = {
-                        'size': file_size,
-                        'modified': stat.st_mtime,
-                        'created': stat.st_ctime,
-                        'path': file_path,
-                        'name': file
-                    }
-                    
-                    scanned_count += 1
-                    
-                except (OSError, PermissionError) as e:
-                    logger.warning(f"Could not access file {file}: {e}")
-                    continue
-        
-        logger.info(f"Scanned {scanned_count} files from {directory}")
-        return self.scanned_files.copy()
+            if files:
+                dir_id = table.add_directory(directory, files[0][5])
+                for name, size, _, ctime, file_mtime_ns, device, inode in files:
+                    table.add(dir_id, name, size, file_mtime_ns, ctime, device, inode)
+            
+            # Reversed so subdirectories are visited in listing order
+            for name in reversed(subdirectories):
+                stack.append(os.path.join(directory, name))
+        
+        # Directories that disappeared take their files with them
+        for directory, record in previous.items():
+            if directory not in current:
+                for file_record in record['files']:
+                    dirty_sizes.add(file_record[1])
+        
+        snapshot.directories = current
+        self.file_table = table
+        self.dirty_sizes = None if full_scan else dirty_sizes
+        
+        logger.info(f"Incremental scan: {len(table)} files, "
+                    f"{relisted} of {len(current)} directories re-listed")
+        return table
     
-    def get_file_groups_by_size(self) -> Dict[int, List[str]]:
+    def _log_scan_error(self, path: str, error: OSError):
+        """Log unreadable entries and keep scanning"""
+        logger.warning(f"Could not access {path}: {error}")
+    
+    def _is_skipped_directory(self, name: str) -> bool:
+        """Skip hidden and system directories"""
+        return name.startswith('.') or name in ['System Volume Information']
+    
+    def get_file_groups_by_size(self, extensions: Optional[List[str]] = None,
+                                min_size: int = 0,
+                                max_size: int = 0) -> Dict[int, List[str]]:
         """Group files by size for pigeonhole principle optimization"""
         size_groups = {}
-        for file_path, info in self.scanned_files.items():
-            size = info['size']
-            if size == 0:  # Skip empty files
-                continue
-            if size not in size_groups:
-                size_groups[size] = []
-            size_groups[size].append(file_path)
+        for size, file_ids in self.get_file_id_groups_by_size(extensions, min_size, max_size).items():
+            size_groups[size] = [self.file_table.path_of(file_id) for file_id in file_ids]
+        return size_groups
+    
+    def get_file_id_groups_by_size(self, extensions: Optional[List[str]] = None,
+                                   min_size: int = 0,
+                                   max_size: int = 0) -> Dict[int, List[int]]:
+        """
+        Group file ids by size, skipping empty files and sizes held by one file
+        
+        Pass the result together with file_info=self.file_table to
+        PigeonholeEngine to keep paths out of memory until files are read.
         
-        # Only return groups with more than one file (potential duplicates)
-        return {size: files for size, files in size_groups.items() if len(files) > 1}
+        Args:
+            extensions: Narrow the last scan to these extensions
+            min_size: Narrow the last scan to files of at least this size
+            max_size: Narrow the last scan to files of at most this size
+        """
+        return self.file_table.size_groups(extensions=extensions, min_size=min_size,
+                                           max_size=max_size)
     
     def start_monitoring(self, directory: str, callback):
         """Start real-time directory monitoring"""
@@ -112,6 +288,12 @@ class FileScanner:
             def on_modified(self, event):
                 if not event.is_directory:
                     callback('modified', event.src_path)
+            
+            def on_moved(self, event):
+                # A rename leaves one path and arrives at another
+                if not event.is_directory:
+                    callback('deleted', event.src_path)
+                    callback('created', event.dest_path)
         
         self.observer = Observer()
         handler = ChangeHandler()
@@ -0,0 +1,284 @@
+"""
+Compact Columnar Table of Scanned Files
+"""
+
+import os
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+from .file_walker import FileEntry
+from .size_buckets import BucketRange, bucket_ranges, np
+
+logger = logging.getLogger(__name__)
+
+
+class FileTable(Mapping):
+    """
+    Scanned file metadata stored column by column
+
+    Every file gets an integer id. Directory paths are stored once and
+    referenced by index. File names are kept as one encoded byte blob with
+    an offset column. Size, mtime_ns, ctime and inode are fixed-width
+    arrays, so a file costs about 40 bytes plus its name, instead of a
+    dict and two path strings.
+
+    The device is normally the same for every file in a directory, so it
+    is stored per directory. Files that differ from their directory are
+    recorded separately. Lower-cased extensions are interned like
+    directories, so extension filters can run over an integer column.
+
+    For compatibility the table is also a read-only Mapping from path to
+    the info dict FileScanner used to store (size, modified, modified_ns,
+    created, path, name, device, inode). Those dicts are built on access.
+    """
+
+    def __init__(self):
+        self.directories: List[str] = []
+        self._dir_index: Dict[str, int] = {}
+        self._dir_device = array('Q')
+        self._device_overrides: Dict[int, int] = {}
+        self.extensions: List[str] = []
+        self._ext_index: Dict[str, int] = {}
+
+        self._dir_id = array('L')
+        self._name_end = array('Q')
+        self._names = bytearray()
+        self._size = array('q')
+        self._mtime_ns = array('q')
+        self._ctime = array('d')
+        self._inode = array('Q')
+        self._ext_id = array('L')
+
+        # Per-directory file ids for path lookups, built on first use
+        self._members: Optional[List[array]] = None
+        self._sorted_dirs = set()
+
+    def add_directory(self, directory: str, device: int = 0) -> int:
+        """
+        Intern a directory path and return its id
+
+        Args:
+            directory: Directory path
+            device: Device of the files in it (taken from the first file)
+        """
+        dir_id = self._dir_index.get(directory)
+        if dir_id is None:
+            dir_id = len(self.directories)
+            self.directories.append(directory)
+            self._dir_index[directory] = dir_id
+            self._dir_device.append(device)
+        return dir_id
+
+    def add(self, dir_id: int, name: str, size: int, mtime_ns: int, ctime: float,
+            device: int, inode: int) -> int:
+        """
+        Append one file
+
+        Returns:
+            The new file id
+        """
+        file_id = len(self._size)
+        self._dir_id.append(dir_id)
+        self._names += os.fsencode(name)
+        self._name_end.append(len(self._names))
+        self._size.append(size)
+        self._mtime_ns.append(mtime_ns)
+        self._ctime.append(ctime)
+        self._inode.append(inode)
+
+        extension = os.path.splitext(name)[1].lower()
+        ext_id = self._ext_index.get(extension)
+        if ext_id is None:
+            ext_id = len(self.extensions)
+            self.extensions.append(extension)
+            self._ext_index[extension] = ext_id
+        self._ext_id.append(ext_id)
+
+        if device != self._dir_device[dir_id]:
+            self._device_overrides[file_id] = device
+
+        self._members = None
+        return file_id
+
+    def add_entry(self, entry: FileEntry) -> int:
+        """Append a file found by the walker"""
+        dir_id = self.add_directory(os.path.dirname(entry.path), entry.device)
+        return self.add(dir_id, entry.name, entry.size, entry.mtime_ns, entry.ctime,
+                        entry.device, entry.inode)
+
+    def path_of(self, file_id: int) -> str:
+        """Full path of a file"""
+        return os.path.join(self.directories[self._dir_id[file_id]], self.name_of(file_id))
+
+    def name_of(self, file_id: int) -> str:
+        """Base name of a file"""
+        return os.fsdecode(self._name_bytes(file_id))
+
+    def size_of(self, file_id: int) -> int:
+        """Size of a file in bytes"""
+        return self._size[file_id]
+
+    def device_of(self, file_id: int) -> int:
+        """Device (st_dev) of a file"""
+        device = self._device_overrides.get(file_id)
+        if device is None:
+            device = self._dir_device[self._dir_id[file_id]]
+        return device
+
+    def identity(self, file_id: int) -> Tuple[int, int]:
+        """(device, inode) of a file"""
+        return self.device_of(file_id), self._inode[file_id]
+
+    def info(self, file_id: int) -> Dict:
+        """Info dict of a file, in the format FileScanner has always used"""
+        path = self.path_of(file_id)
+        return {
+            'size': self._size[file_id],
+            'modified': self._mtime_ns[file_id] / 1e9,
+            'modified_ns': self._mtime_ns[file_id],
+            'created': self._ctime[file_id],
+            'path': path,
+            'name': os.path.basename(path),
+            'device': self.device_of(file_id),
+            'inode': self._inode[file_id]
+        }
+
+    def id_of(self, path: str) -> Optional[int]:
+        """
+        Look up a file id by path
+
+        Returns:
+            The file id, or None if the path is not in the table
+        """
+        directory, name = os.path.split(path)
+        dir_id = self._dir_index.get(directory)
+        if dir_id is None:
+            return None
+
+        members = self._sorted_members(dir_id)
+        target = os.fsencode(name)
+        low, high = 0, len(members)
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(members[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(members) and self._name_bytes(members[low]) == target:
+            return members[low]
+        return None
+
+    def size_buckets(self, include_zero_byte: bool = False,
+                     extensions: Optional[List[str]] = None,
+                     min_size: int = 0,
+                     max_size: int = 0) -> Tuple[List[int], List[BucketRange]]:
+        """
+        Bucket the size column, keeping only sizes shared by two or more files
+
+        Filtering, sorting and singleton removal run over the columns (with
+        NumPy when installed, see bucket_ranges), so a table can be
+        re-filtered without walking the tree again.
+
+        Args:
+            include_zero_byte: Whether empty files form a bucket
+            extensions: File extensions to keep (None for all)
+            min_size: Minimum file size in bytes (0 for no limit)
+            max_size: Maximum file size in bytes (0 for no limit)
+
+        Returns:
+            Tuple of (order, ranges); each bucket is order[start:end] for a
+            (size, start, end) in ranges
+        """
+        keep = None
+        if extensions:
+            keep = self._extension_mask(extensions)
+        return bucket_ranges(self._size, min_size, max_size, include_zero_byte, keep)
+
+    def size_groups(self, include_zero_byte: bool = False,
+                    extensions: Optional[List[str]] = None,
+                    min_size: int = 0,
+                    max_size: int = 0) -> Dict[int, List[int]]:
+        """
+        File ids grouped by size, keeping only sizes shared by two or more files
+
+        Args:
+            (as for size_buckets)
+
+        Returns:
+            Dictionary of size -> file ids, in ascending size
+        """
+        order, ranges = self.size_buckets(include_zero_byte, extensions, min_size, max_size)
+        groups = {}
+        for size, start, end in ranges:
+            groups[size] = order[start:end]
+        return groups
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the table's columns and interned strings"""
+        total = len(self._names)
+        for column in (self._dir_id, self._name_end, self._size, self._mtime_ns,
+                       self._ctime, self._inode, self._ext_id, self._dir_device):
+            total += column.itemsize * len(column)
+        for directory in self.directories:
+            total += len(directory)
+        return total
+
+    def __getitem__(self, path: str) -> Dict:
+        file_id = self.id_of(path)
+        if file_id is None:
+            raise KeyError(path)
+        return self.info(file_id)
+
+    def __iter__(self) -> Iterator[str]:
+        for file_id in range(len(self._size)):
+            yield self.path_of(file_id)
+
+    def __len__(self) -> int:
+        return len(self._size)
+
+    def __contains__(self, path) -> bool:
+        return isinstance(path, str) and self.id_of(path) is not None
+
+    def items(self):
+        """(path, info) pairs in file id order, without path lookups"""
+        for file_id in range(len(self._size)):
+            info = self.info(file_id)
+            yield info['path'], info
+
+    def values(self):
+        """Info dicts in file id order"""
+        for file_id in range(len(self._size)):
+            yield self.info(file_id)
+
+    def _extension_mask(self, extensions: List[str]):
+        """Per-file flags: True where the file has one of the extensions"""
+        wanted = set()
+        for extension in extensions:
+            ext_id = self._ext_index.get(extension.lower())
+            if ext_id is not None:
+                wanted.add(ext_id)
+
+        if np is not None:
+            return np.isin(np.array(self._ext_id, dtype=np.int64),
+                           np.array(sorted(wanted), dtype=np.int64))
+        return [ext_id in wanted for ext_id in self._ext_id]
+
+    def _name_bytes(self, file_id: int) -> bytes:
+        start = self._name_end[file_id - 1] if file_id else 0
+        return bytes(self._names[start:self._name_end[file_id]])
+
+    def _sorted_members(self, dir_id: int) -> array:
+        """File ids of one directory, sorted by encoded name"""
+        if self._members is None:
+            self._members = [array('L') for _ in self.directories]
+            self._sorted_dirs = set()
+            for file_id, member_dir in enumerate(self._dir_id):
+                self._members[member_dir].append(file_id)
+
+        members = self._members[dir_id]
+        if dir_id not in self._sorted_dirs:
+            members = array('L', sorted(members, key=self._name_bytes))
+            self._members[dir_id] = members
+            self._sorted_dirs.add(dir_id)
+        return members
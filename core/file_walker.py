@@ -0,0 +1,276 @@
+"""
+Fast Directory Traversal using os.scandir
+"""
+
+import os
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FileEntry(NamedTuple):
+    """
+    Metadata of one scanned file, taken from a single DirEntry.stat() call
+
+    Device and inode are both 0 when the file's identity is unknown.
+    """
+    path: str
+    name: str
+    size: int
+    mtime: float
+    ctime: float
+    mtime_ns: int
+    device: int
+    inode: int
+
+
+def _log_error(path: str, error: OSError):
+    """Default error handler: log and keep walking"""
+    logger.warning(f"Could not access {path}: {error}")
+
+
+def normalize_roots(roots: Iterable[str]) -> List[str]:
+    """
+    Normalize scan roots and drop duplicates and roots nested inside another
+
+    Overlap is detected on resolved (real) paths so that two spellings of the
+    same directory are only walked once; the first spelling given is kept.
+    """
+    resolved_roots = []
+    seen = set()
+    for root in roots:
+        root = os.path.normpath(root)
+        real_root = os.path.realpath(root)
+        if real_root not in seen:
+            seen.add(real_root)
+            resolved_roots.append((real_root, root))
+
+    kept = []
+    for real_root, root in resolved_roots:
+        nested = False
+        for other_real, _ in resolved_roots:
+            if other_real != real_root and real_root.startswith(other_real.rstrip(os.sep) + os.sep):
+                nested = True
+                break
+        if not nested:
+            kept.append(root)
+    return kept
+
+
+def list_directory(directory: str, allowed_extensions: Optional[Set[str]], min_size: int,
+                    max_size: int, include_zero_byte: bool,
+                    skip_dir: Optional[Callable[[str], bool]],
+                    on_error: Callable[[str, OSError], None]) -> Tuple[List[FileEntry], List[str]]:
+    """
+    List one directory
+
+    Returns:
+        Tuple of (matching files, subdirectories to descend into)
+    """
+    files = []
+    subdirectories = []
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if skip_dir is None or not skip_dir(entry.name):
+                            subdirectories.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+
+                    if allowed_extensions is not None:
+                        if os.path.splitext(entry.name)[1].lower() not in allowed_extensions:
+                            continue
+
+                    stat = entry.stat()
+                except OSError as e:
+                    on_error(entry.path, e)
+                    continue
+
+                file_size = stat.st_size
+                if file_size == 0 and not include_zero_byte:
+                    continue
+                if min_size > 0 and file_size < min_size:
+                    continue
+                if max_size > 0 and file_size > max_size:
+                    continue
+
+                device, inode = stat.st_dev, stat.st_ino
+                if not device:
+                    # DirEntry.stat() on Windows leaves st_dev (and st_ino) 0;
+                    # a full stat has the volume serial and file index
+                    try:
+                        full_stat = os.stat(entry.path)
+                        device, inode = full_stat.st_dev, full_stat.st_ino
+                    except OSError:
+                        device = 0
+                    if not device:
+                        # Unknown identity: (0, 0) is never used to match files
+                        inode = 0
+
+                files.append(FileEntry(entry.path, entry.name, file_size, stat.st_mtime,
+                                       stat.st_ctime, stat.st_mtime_ns, device, inode))
+    except OSError as e:
+        on_error(directory, e)
+
+    return files, subdirectories
+
+
+def walk_files(root: str,
+               extensions: Optional[Iterable[str]] = None,
+               min_size: int = 0,
+               max_size: int = 0,
+               include_zero_byte: bool = True,
+               skip_dir: Optional[Callable[[str], bool]] = None,
+               progress_callback: Optional[Callable[[int, int], None]] = None,
+               on_error: Callable[[str, OSError], None] = _log_error) -> Iterator[FileEntry]:
+    """
+    Walk a directory tree and yield every file that passes the filters
+
+    Uses an explicit stack instead of recursion, and takes size, mtime and
+    inode from the cached DirEntry data so each file costs at most one stat
+    call (none for extension-filtered files). On Windows, where DirEntry
+    has no device number, matching files are stat'ed once more.
+
+    Args:
+        root: Directory to walk
+        extensions: File extensions to include (e.g. {'.jpg'}), case-insensitive
+        min_size: Minimum file size in bytes (0 for no limit)
+        max_size: Maximum file size in bytes (0 for no limit)
+        include_zero_byte: Whether empty files are yielded
+        skip_dir: Predicate on a directory name; True prunes that subtree
+        progress_callback: Called as progress_callback(matched, estimated_total)
+            for every yielded file. The total is estimated from the files found
+            per directory so far and the directories still on the stack.
+        on_error: Called as on_error(path, error) for unreadable entries
+
+    Yields:
+        FileEntry for every matching file, in os.walk (top-down) order
+    """
+    allowed_extensions = _normalize_extensions(extensions)
+
+    stack = [root]
+    directories_done = 0
+    matched = 0
+    estimated_total = 0
+
+    while stack:
+        directory = stack.pop()
+        files, subdirectories = list_directory(directory, allowed_extensions, min_size,
+                                                max_size, include_zero_byte, skip_dir, on_error)
+
+        for entry in files:
+            matched += 1
+            yield entry
+
+            if progress_callback is not None:
+                if estimated_total < matched:
+                    estimated_total = matched
+                progress_callback(matched, estimated_total)
+
+        # Reversed so the stack visits subdirectories in listing order
+        stack.extend(reversed(subdirectories))
+        directories_done += 1
+        estimated_total = matched + (len(stack) * matched) // directories_done
+
+
+def walk_files_parallel(roots: Iterable[str],
+                        extensions: Optional[Iterable[str]] = None,
+                        min_size: int = 0,
+                        max_size: int = 0,
+                        include_zero_byte: bool = True,
+                        skip_dir: Optional[Callable[[str], bool]] = None,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        on_error: Callable[[str, OSError], None] = _log_error,
+                        workers: int = 4) -> Iterator[FileEntry]:
+    """
+    Walk several directory trees at once with a pool of listing threads
+
+    Directories go into one shared queue that every worker pulls from, so
+    idle workers pick up subdirectories discovered by busy ones. This keeps
+    many directory listings in flight on high-latency network filesystems.
+    Overlapping roots are walked once (see normalize_roots).
+
+    Args:
+        roots: Directories to walk
+        workers: Number of listing threads; 1 walks the roots serially
+        (other arguments as for walk_files)
+
+    Yields:
+        FileEntry for every matching file. With workers > 1 the entries are
+        yielded sorted by path once the walk completes, so results do not
+        depend on thread timing.
+    """
+    roots = normalize_roots(roots)
+
+    if workers <= 1:
+        for root in roots:
+            yield from walk_files(root, extensions, min_size, max_size, include_zero_byte,
+                                  skip_dir, progress_callback, on_error)
+        return
+
+    allowed_extensions = _normalize_extensions(extensions)
+    directory_queue = queue.Queue()
+    result_queue = queue.Queue()
+
+    def worker():
+        while True:
+            directory = directory_queue.get()
+            if directory is None:
+                return
+            try:
+                files, subdirectories = list_directory(directory, allowed_extensions, min_size,
+                                                        max_size, include_zero_byte, skip_dir,
+                                                        on_error)
+            except Exception as e:
+                logger.error(f"Directory listing failed for {directory}: {e}")
+                files, subdirectories = [], []
+            for subdirectory in subdirectories:
+                directory_queue.put(subdirectory)
+            result_queue.put((files, len(subdirectories)))
+
+    threads = []
+    for _ in range(workers):
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    for root in roots:
+        directory_queue.put(root)
+
+    # Directories queued but not yet reported back; the walk ends at zero
+    outstanding = len(roots)
+    directories_done = 0
+    collected = []
+
+    try:
+        while outstanding:
+            files, new_directories = result_queue.get()
+            outstanding += new_directories - 1
+            directories_done += 1
+            collected.extend(files)
+
+            if progress_callback is not None and files:
+                estimated_total = len(collected) + (outstanding * len(collected)) // directories_done
+                progress_callback(len(collected), estimated_total)
+    finally:
+        for _ in threads:
+            directory_queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    collected.sort(key=lambda entry: entry.path)
+    yield from collected
+
+
+def _normalize_extensions(extensions: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    """Lower-case the extension filter, or None when every extension is allowed"""
+    if not extensions:
+        return None
+    return {ext.lower() for ext in extensions}
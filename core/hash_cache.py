@@ -0,0 +1,233 @@
+"""
+Persistent Hash Cache for Skipping Re-reads of Unchanged Files
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_INT64_LIMIT = 1 << 63
+
+
+def _to_sqlite_int(value: int) -> int:
+    """Fold unsigned 64-bit stat fields into SQLite's signed INTEGER range"""
+    if value >= _INT64_LIMIT:
+        return value - (1 << 64)
+    return value
+
+
+class HashCache:
+    """
+    On-disk digest cache keyed by file identity
+
+    Entries are keyed by (device, inode, algorithm, kind) and are only
+    returned while the file's size and mtime_ns still match the values that
+    were recorded when the digest was computed. ``kind`` distinguishes full
+    digests from block digests (``'full'``, ``'head:65536'``,
+    ``'tail:65536'`` or ``'samples:4x65536'``).
+    """
+
+    COMMIT_INTERVAL = 256
+
+    def __init__(self, cache_file: Optional[str] = None):
+        if cache_file is None:
+            cache_file = Path.home() / ".pigeonfinder" / "hash_cache.db"
+
+        self.cache_file = str(cache_file)
+        if self.cache_file != ':memory:':
+            Path(self.cache_file).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0}
+
+        self._conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS digests (
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                algorithm TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (device, inode, algorithm, kind)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS digests_path ON digests(path)")
+        self._conn.commit()
+
+    def get(self, file_path: str, kind: str, algorithm: str,
+            stat: Optional[os.stat_result] = None) -> Optional[str]:
+        """
+        Look up a stored digest
+
+        Args:
+            file_path: Path to file
+            kind: Digest kind ('full' or a partial descriptor)
+            algorithm: Hash algorithm name
+            stat: Pre-computed stat result to avoid a second stat call
+
+        Returns:
+            Stored hexadecimal digest, or None if missing or stale
+        """
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError:
+            return None
+
+        if not stat.st_dev or not stat.st_ino:
+            # No stable file identity on this filesystem
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM digests "
+                "WHERE device = ? AND inode = ? AND algorithm = ? AND kind = ?",
+                (_to_sqlite_int(stat.st_dev), _to_sqlite_int(stat.st_ino), algorithm, kind)
+            ).fetchone()
+
+            if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                self.stats['hits'] += 1
+                return row[2]
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, file_path: str, kind: str, algorithm: str, digest: str,
+            stat: Optional[os.stat_result] = None):
+        """
+        Store a digest for a file
+
+        Args:
+            file_path: Path to file
+            kind: Digest kind ('full' or a partial descriptor)
+            algorithm: Hash algorithm name
+            digest: Hexadecimal digest
+            stat: Stat result taken before the file was read
+        """
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError:
+            return
+
+        if not stat.st_dev or not stat.st_ino:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO digests "
+                "(device, inode, algorithm, kind, size, mtime_ns, path, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (_to_sqlite_int(stat.st_dev), _to_sqlite_int(stat.st_ino), algorithm, kind,
+                 stat.st_size, stat.st_mtime_ns, file_path, digest)
+            )
+            self.stats['writes'] += 1
+            self._pending_writes += 1
+
+            if self._pending_writes >= self.COMMIT_INTERVAL:
+                self._conn.commit()
+                self._pending_writes = 0
+
+    def invalidate(self, file_path: str) -> int:
+        """
+        Drop every stored digest for a file
+
+        Args:
+            file_path: Path to file (need not exist any more)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM digests WHERE path = ?", (file_path,)
+            ).rowcount
+
+            # The file may have been cached under another hardlinked path
+            try:
+                stat = os.stat(file_path)
+                if stat.st_ino:
+                    removed += self._conn.execute(
+                        "DELETE FROM digests WHERE device = ? AND inode = ?",
+                        (_to_sqlite_int(stat.st_dev), _to_sqlite_int(stat.st_ino))
+                    ).rowcount
+            except OSError:
+                pass
+
+            self._conn.commit()
+            self._pending_writes = 0
+
+        return removed
+
+    def clear(self):
+        """Remove all cached digests"""
+        with self._lock:
+            self._conn.execute("DELETE FROM digests")
+            self._conn.commit()
+            self._pending_writes = 0
+        logger.info(f"Cleared hash cache {self.cache_file}")
+
+    def compact(self) -> int:
+        """
+        Remove entries for files that no longer exist or have changed,
+        then reclaim the freed space on disk
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT DISTINCT device, inode, size, mtime_ns, path FROM digests"
+            ).fetchall()
+
+        stale = []
+        for device, inode, size, mtime_ns, path in rows:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stale.append((device, inode))
+                continue
+
+            if (_to_sqlite_int(stat.st_dev) != device or _to_sqlite_int(stat.st_ino) != inode
+                    or stat.st_size != size or stat.st_mtime_ns != mtime_ns):
+                stale.append((device, inode))
+
+        with self._lock:
+            removed = 0
+            for device, inode in stale:
+                removed += self._conn.execute(
+                    "DELETE FROM digests WHERE device = ? AND inode = ?", (device, inode)
+                ).rowcount
+            self._conn.commit()
+            self._pending_writes = 0
+            self._conn.execute("VACUUM")
+
+        logger.info(f"Hash cache compaction removed {removed} stale entries")
+        return removed
+
+    def flush(self):
+        """Commit pending writes to disk"""
+        with self._lock:
+            if self._pending_writes:
+                self._conn.commit()
+                self._pending_writes = 0
+
+    def close(self):
+        """Flush pending writes and close the database"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
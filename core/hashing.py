@@ -3,13 +3,32 @@ Advanced File Hashing with Multiple Algorithms and Optimization
 """
 
 import hashlib
+import mmap
 import os
-from typing import Dict, List, Optional, Callable
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 from pathlib import Path
+from .hash_cache import HashCache
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
 logger = logging.getLogger(__name__)
 
+
+def _blake3_multithreaded():
+    """BLAKE3 hasher that spreads large updates over all cores"""
+    return blake3.blake3(max_threads=blake3.blake3.AUTO)
+
+
 class FileHasher:
     """Advanced file hashing with progress tracking and multiple algorithms"""
     
@@ -22,12 +41,39 @@ class FileHasher:
         'blake2b': hashlib.blake2b
     }
     
-    def __init__(self, algorithm: str = 'md5', chunk_size: int = 8192):
+    # Optional fast hashes, available when their packages are installed
+    if xxhash is not None:
+        HASH_ALGORITHMS['xxh3_128'] = xxhash.xxh3_128
+    if blake3 is not None:
+        HASH_ALGORITHMS['blake3'] = _blake3_multithreaded
+    
+    # Preference order for cheap prefilter hashing
+    FAST_ALGORITHMS = ('xxh3_128', 'blake3', 'md5')
+    
+    # Full-file read strategies ('auto' picks one per file size)
+    IO_STRATEGIES = ('auto', 'mmap', 'readinto', 'read')
+    MMAP_THRESHOLD = 64 * 1024 * 1024
+    MAX_CHUNK_SIZE = 8 * 1024 * 1024
+    TARGET_ITERATIONS = 1024
+    # Per-file progress callbacks fire at most once per this many bytes
+    PROGRESS_BYTES = 4 * 1024 * 1024
+    
+    def __init__(self, algorithm: str = 'md5', chunk_size: int = 8192,
+                 cache: Optional[HashCache] = None, io_strategy: str = 'auto'):
         self.algorithm = algorithm.lower()
         self.chunk_size = chunk_size
+        self.cache = cache
+        self.io_strategy = io_strategy
+        self.io_stats = {'full_reads': 0, 'partial_reads': 0, 'bytes_read': 0}
+        self._stats_lock = threading.Lock()
+        self._buffers = threading.local()
+        # Optional ProgressReporter credited with the bytes of every read
+        self.progress = None
         
         if self.algorithm not in self.HASH_ALGORITHMS:
             raise ValueError(f"Unsupported algorithm: {algorithm}")
+        if self.io_strategy not in self.IO_STRATEGIES:
+            raise ValueError(f"Unsupported I/O strategy: {io_strategy}")
     
     def calculate_hash(self, file_path: str, 
                       progress_callback: Optional[Callable] = None) -> str:
@@ -41,28 +87,295 @@ class FileHasher:
         Returns:
             Hexadecimal hash string
         """
-        if not os.path.exists(file_path):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        file_size = os.path.getsize(file_path)
+        if self.cache is not None:
+            cached_hash = self.cache.get(file_path, 'full', self.algorithm, stat)
+            if cached_hash:
+                return cached_hash
+        
+        file_size = stat.st_size
         hash_func = self.HASH_ALGORITHMS[self.algorithm]()
-        bytes_read = 0
+        chunk_size = self.select_chunk_size(file_size)
+        strategy = self.select_io_strategy(file_size)
         
         try:
-            with open(file_path, 'rb') as f:
-                while chunk := f.read(self.chunk_size):
-                    hash_func.update(chunk)
-                    bytes_read += len(chunk)
-                    
-                    if progress_callback and file_size > 0:
-                        progress = (bytes_read / file_size) * 100
-                        progress_callback(file_path, progress)
+            if strategy == 'mmap':
+                try:
+                    bytes_read = self._hash_mmap(file_path, hash_func, chunk_size,
+                                                 file_size, progress_callback)
+                except (ValueError, mmap.error):
+                    # Some files (pipes, special filesystems) cannot be mapped
+                    hash_func = self.HASH_ALGORITHMS[self.algorithm]()
+                    bytes_read = self._hash_readinto(file_path, hash_func, chunk_size,
+                                                     file_size, progress_callback)
+            elif strategy == 'readinto':
+                bytes_read = self._hash_readinto(file_path, hash_func, chunk_size,
+                                                 file_size, progress_callback)
+            else:
+                bytes_read = self._hash_read(file_path, hash_func, chunk_size,
+                                             file_size, progress_callback)
                         
         except (IOError, OSError) as e:
             logger.error(f"Error reading file {file_path}: {e}")
             raise
         
-        return hash_func.hexdigest()
+        self._record_read('full_reads', bytes_read)
+        
+        file_hash = hash_func.hexdigest()
+        if self.cache is not None:
+            self.cache.put(file_path, 'full', self.algorithm, file_hash, stat)
+        
+        return file_hash
+    
+    def calculate_partial_hash(self, file_path: str, size: Optional[int] = None) -> str:
+        """
+        Hash only the first bytes of a file for bucketing same-sized files
+        
+        Args:
+            file_path: Path to file
+            size: Number of leading bytes to hash (defaults to 3 chunks,
+                  the same prefix quick_hash_comparison inspects)
+            
+        Returns:
+            Hexadecimal hash string of the prefix
+        """
+        return self.calculate_block_hash(file_path, 'head', size)
+    
+    def calculate_block_hash(self, file_path: str, position: str = 'head',
+                             block_size: Optional[int] = None,
+                             sample_count: int = 4) -> str:
+        """
+        Hash sampled blocks of a file for progressive screening
+        
+        Args:
+            file_path: Path to file
+            position: 'head' (first block), 'tail' (last block) or
+                      'samples' (sample_count evenly spaced blocks)
+            block_size: Size of each block (defaults to 3 chunks)
+            sample_count: Number of blocks hashed for 'samples'
+            
+        Returns:
+            Hexadecimal hash string of the sampled blocks
+        """
+        if block_size is None:
+            block_size = self.chunk_size * 3
+        
+        stat = os.stat(file_path)
+        offsets, kind = self.block_offsets(stat.st_size, position, block_size, sample_count)
+        
+        if self.cache is not None:
+            cached_hash = self.cache.get(file_path, kind, self.algorithm, stat)
+            if cached_hash:
+                return cached_hash
+        
+        hash_func = self.HASH_ALGORITHMS[self.algorithm]()
+        bytes_read = 0
+        with open(file_path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                block = f.read(block_size)
+                hash_func.update(block)
+                bytes_read += len(block)
+        self._record_read('partial_reads', bytes_read)
+        
+        file_hash = hash_func.hexdigest()
+        if self.cache is not None:
+            self.cache.put(file_path, kind, self.algorithm, file_hash, stat)
+        
+        return file_hash
+    
+    @staticmethod
+    def block_offsets(file_size: int, position: str, block_size: int,
+                      sample_count: int = 4) -> Tuple[List[int], str]:
+        """
+        Where the blocks of a screening stage start, and the cache kind for them
+        
+        Returns:
+            Tuple of (block offsets, cache kind)
+        """
+        span = file_size - block_size
+        
+        if position == 'head':
+            return [0], f'head:{block_size}'
+        if position == 'tail':
+            return [span if span > 0 else 0], f'tail:{block_size}'
+        if position == 'samples':
+            if span > 0:
+                offsets = [span * k // (sample_count + 1) for k in range(1, sample_count + 1)]
+            else:
+                offsets = [0]
+            return offsets, f'samples:{sample_count}x{block_size}'
+        raise ValueError(f"Unsupported block position: {position}")
+    
+    def map_hashes(self, file_paths: Iterable[str], pool, position: str = 'full',
+                   block_size: Optional[int] = None, sample_count: int = 4,
+                   known: Optional[Dict[str, str]] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Hash many files in a ProcessHashPool, yielding (path, hash) in input order
+        
+        Stat calls, cache lookups and cache updates stay in this process;
+        the workers only receive paths and byte ranges. Files that cannot
+        be read are logged and yield None.
+        
+        Args:
+            file_paths: Files to hash
+            pool: ProcessHashPool to run the reads and digests in
+            position: 'full' for calculate_hash, or a calculate_block_hash position
+            block_size: Block size for screening positions (defaults to 3 chunks)
+            sample_count: Number of blocks for 'samples'
+            known: Hashes already known by path; those files are not read
+        """
+        if block_size is None:
+            block_size = self.chunk_size * 3
+        
+        def plan():
+            for file_path in file_paths:
+                if known and file_path in known:
+                    yield (file_path, None, None, known[file_path]), None
+                    continue
+                try:
+                    stat = os.stat(file_path)
+                except OSError as e:
+                    logger.warning(f"Could not hash {file_path}: {e}")
+                    yield (file_path, None, None, None), None
+                    continue
+                
+                if position == 'full':
+                    ranges, kind = None, 'full'
+                else:
+                    offsets, kind = self.block_offsets(stat.st_size, position, block_size,
+                                                       sample_count)
+                    ranges = [(offset, block_size) for offset in offsets]
+                
+                if self.cache is not None:
+                    cached_hash = self.cache.get(file_path, kind, self.algorithm, stat)
+                    if cached_hash:
+                        yield (file_path, None, None, cached_hash), None
+                        continue
+                yield (file_path, stat, kind, None), (file_path, ranges)
+        
+        counter = 'full_reads' if position == 'full' else 'partial_reads'
+        for (file_path, stat, kind, answer), result in pool.imap(self.algorithm, plan()):
+            if result is None:
+                yield file_path, answer
+                continue
+            
+            digest, bytes_read, error = result
+            if error is not None:
+                logger.warning(f"Could not hash {file_path}: {error}")
+                yield file_path, None
+                continue
+            
+            self._record_read(counter, bytes_read)
+            file_hash = digest.hex()
+            if self.cache is not None:
+                self.cache.put(file_path, kind, self.algorithm, file_hash, stat)
+            yield file_path, file_hash
+    
+    def _record_read(self, counter: str, bytes_read: int):
+        """Account for one file read in the I/O statistics"""
+        with self._stats_lock:
+            self.io_stats[counter] += 1
+            self.io_stats['bytes_read'] += bytes_read
+        if self.progress is not None:
+            self.progress.add(bytes_read=bytes_read)
+    
+    def select_chunk_size(self, file_size: int) -> int:
+        """
+        Pick a read size that keeps large files to about TARGET_ITERATIONS
+        reads while never going below the configured chunk size
+        """
+        chunk_size = self.chunk_size
+        while chunk_size < self.MAX_CHUNK_SIZE and file_size // chunk_size > self.TARGET_ITERATIONS:
+            chunk_size *= 2
+        return chunk_size
+    
+    def select_io_strategy(self, file_size: int) -> str:
+        """Pick how a file of this size is read for full hashing"""
+        if self.io_strategy != 'auto':
+            return self.io_strategy
+        if file_size >= self.MMAP_THRESHOLD:
+            return 'mmap'
+        if file_size > self.chunk_size:
+            return 'readinto'
+        return 'read'
+    
+    def _hash_read(self, file_path: str, hash_func, chunk_size: int, file_size: int,
+                   progress_callback: Optional[Callable] = None) -> int:
+        """Hash a file with plain read() calls (cheapest for small files)"""
+        bytes_read = 0
+        reported = 0
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                hash_func.update(chunk)
+                bytes_read += len(chunk)
+                
+                if progress_callback and file_size > 0 and (
+                        bytes_read - reported >= self.PROGRESS_BYTES or bytes_read >= file_size):
+                    reported = bytes_read
+                    progress_callback(file_path, (bytes_read / file_size) * 100)
+        return bytes_read
+    
+    def _hash_readinto(self, file_path: str, hash_func, chunk_size: int, file_size: int,
+                       progress_callback: Optional[Callable] = None) -> int:
+        """Hash a file by reading into a reused per-thread buffer"""
+        view = self._get_buffer(chunk_size)
+        bytes_read = 0
+        reported = 0
+        with open(file_path, 'rb', buffering=0) as f:
+            while True:
+                count = f.readinto(view)
+                if not count:
+                    break
+                hash_func.update(view if count == chunk_size else view[:count])
+                bytes_read += count
+                
+                if progress_callback and file_size > 0 and (
+                        bytes_read - reported >= self.PROGRESS_BYTES or bytes_read >= file_size):
+                    reported = bytes_read
+                    progress_callback(file_path, (bytes_read / file_size) * 100)
+        return bytes_read
+    
+    def _hash_mmap(self, file_path: str, hash_func, chunk_size: int, file_size: int,
+                   progress_callback: Optional[Callable] = None) -> int:
+        """Hash a file through a read-only memory map, without copying chunks"""
+        bytes_read = 0
+        reported = 0
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    mapped_size = len(mapped)
+                    for offset in range(0, mapped_size, chunk_size):
+                        with view[offset:offset + chunk_size] as chunk:
+                            hash_func.update(chunk)
+                            bytes_read += len(chunk)
+                        
+                        if progress_callback and file_size > 0 and (
+                                bytes_read - reported >= self.PROGRESS_BYTES or bytes_read >= file_size):
+                            reported = bytes_read
+                            progress_callback(file_path, (bytes_read / file_size) * 100)
+                finally:
+                    view.release()
+        return bytes_read
+    
+    def _get_buffer(self, size: int) -> memoryview:
+        """Get this thread's preallocated read buffer, sized to exactly size bytes"""
+        buffer = getattr(self._buffers, 'buffer', None)
+        if buffer is None or len(buffer) < size:
+            buffer = bytearray(size)
+            self._buffers.buffer = buffer
+        return memoryview(buffer)[:size]
+    
+    def get_cached_hash(self, file_path: str) -> Optional[str]:
+        """Return the cached full hash for an unchanged file without reading it"""
+        if self.cache is None:
+            return None
+        return self.cache.get(file_path, 'full', self.algorithm)
     
     def calculate_hashes_batch(self, file_paths: List[str],
                              progress_callback: Optional[Callable] = None) -> Dict[str, str]:
@@ -125,4 +438,12 @@ class FileHasher:
 
     def get_available_algorithms(self) -> List[str]:
         """Get list of available hash algorithms"""
-        return list(self.HASH_ALGORITHMS.keys())
\ No newline at end of file
+        return list(self.HASH_ALGORITHMS.keys())
+    
+    @classmethod
+    def fastest_algorithm(cls) -> str:
+        """Get the fastest installed algorithm, for prefilter stages"""
+        for algorithm in cls.FAST_ALGORITHMS:
+            if algorithm in cls.HASH_ALGORITHMS:
+                return algorithm
+        return 'md5'
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Device-aware Scheduling of Hash Reads
+"""
+
+import os
+import queue
+import struct
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Linux FS_IOC_FIEMAP and its structures (see linux/fiemap.h)
+FS_IOC_FIEMAP = 0xC020660B
+_FIEMAP_HEADER = struct.Struct('=QQLLLL')
+_FIEMAP_EXTENT = struct.Struct('=QQQQQLLLL')
+
+_rotational_cache: Dict[int, Optional[bool]] = {}
+_rotational_lock = threading.Lock()
+
+
+def is_rotational(device: int) -> Optional[bool]:
+    """
+    Whether a device (st_dev) is a spinning disk
+
+    Reads /sys/dev/block/MAJOR:MINOR/queue/rotational, looking at the
+    parent disk for partitions.
+
+    Returns:
+        True or False, or None where this cannot be determined (other
+        platforms, network and virtual filesystems)
+    """
+    with _rotational_lock:
+        if device in _rotational_cache:
+            return _rotational_cache[device]
+
+    rotational = None
+    try:
+        block_dir = os.path.realpath(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+        for directory in (block_dir, os.path.dirname(block_dir)):
+            flag_path = os.path.join(directory, 'queue', 'rotational')
+            if os.path.exists(flag_path):
+                with open(flag_path, 'r') as f:
+                    rotational = f.read().strip() == '1'
+                break
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not tell whether device {device} is rotational: {e}")
+
+    with _rotational_lock:
+        _rotational_cache[device] = rotational
+    return rotational
+
+
+def physical_offset(file_path: str) -> Optional[int]:
+    """
+    Physical byte offset of a file's first extent, via FIEMAP
+
+    Returns:
+        The offset, or None where FIEMAP is unavailable (non-Linux, some
+        filesystems, empty or inline files)
+    """
+    if fcntl is None:
+        return None
+
+    request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    # fm_start=0, fm_length=whole file, no flags, room for one extent
+    _FIEMAP_HEADER.pack_into(request, 0, 0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0)
+    try:
+        with open(file_path, 'rb') as f:
+            fcntl.ioctl(f.fileno(), FS_IOC_FIEMAP, request, True)
+    except OSError:
+        return None
+
+    mapped_extents = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+    if not mapped_extents:
+        return None
+    return _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)[1]
+
+
+def order_by_disk_position(file_paths: List[str], inodes: Dict[str, int]) -> List[str]:
+    """
+    Order files of one device so they are read front to back
+
+    Files with a FIEMAP offset come first, sorted by it. The rest follow
+    in inode order, which on most filesystems roughly tracks allocation.
+    """
+    located = []
+    unlocated = []
+    for file_path in file_paths:
+        offset = physical_offset(file_path)
+        if offset is None:
+            unlocated.append((inodes.get(file_path, 0), file_path))
+        else:
+            located.append((offset, file_path))
+    located.sort()
+    unlocated.sort()
+    return [file_path for _, file_path in located] + [file_path for _, file_path in unlocated]
+
+
+class DeviceScheduler:
+    """
+    Runs per-file work with a separate queue and concurrency limit per device
+
+    Files are partitioned by st_dev, so one slow disk never holds up the
+    others and reads to different disks overlap. Spinning disks get
+    rotational_workers threads (one by default) and their files are
+    ordered by on-disk position. Everything else, including devices whose
+    type is unknown, gets workers threads and keeps the given order.
+    """
+
+    def __init__(self, workers: int = 4, rotational_workers: int = 1,
+                 order_rotational: bool = True):
+        """
+        Args:
+            workers: Concurrent reads per solid-state or unknown device
+            rotational_workers: Concurrent reads per spinning disk
+            order_rotational: Sort spinning-disk files by physical offset
+        """
+        self.workers = workers if workers > 0 else 1
+        self.rotational_workers = rotational_workers if rotational_workers > 0 else 1
+        self.order_rotational = order_rotational
+        self.stats = {'devices': 0, 'rotational_devices': 0}
+
+    def plan(self, file_paths: Iterable[str]) -> List[Tuple[int, bool, List[str]]]:
+        """
+        Partition files by device and order them for reading
+
+        Returns:
+            (device, rotational, files) per device, with unreadable files
+            under device -1
+        """
+        by_device: Dict[int, List[str]] = {}
+        inodes: Dict[str, int] = {}
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+                device = stat.st_dev
+                inodes[file_path] = stat.st_ino
+            except OSError:
+                device = -1
+            by_device.setdefault(device, []).append(file_path)
+
+        plan = []
+        for device, paths in by_device.items():
+            rotational = device >= 0 and is_rotational(device) is True
+            if rotational and self.order_rotational:
+                paths = order_by_disk_position(paths, inodes)
+            plan.append((device, rotational, paths))
+        return plan
+
+    def map(self, file_paths: Iterable[str], func: Callable[[str], object]) -> Iterator[Tuple[str, object]]:
+        """
+        Apply func to every file, yielding (path, result) as results complete
+
+        Results arrive in completion order, not input order. func should
+        handle its own errors; an exception is logged and gives None.
+        """
+        plan = self.plan(file_paths)
+        if not plan:
+            return
+
+        self.stats['devices'] += len(plan)
+        results = queue.Queue()
+        cancelled = threading.Event()
+        threads = []
+
+        for device, rotational, paths in plan:
+            if rotational:
+                self.stats['rotational_devices'] += 1
+            pending = deque(paths)
+            limit = self.rotational_workers if rotational else self.workers
+            if limit > len(paths):
+                limit = len(paths)
+            logger.debug(f"Device {device}: {len(paths)} files, {limit} readers"
+                         f"{' (rotational)' if rotational else ''}")
+
+            for _ in range(limit):
+                thread = threading.Thread(target=self._drain,
+                                          args=(pending, func, results, cancelled), daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        remaining = 0
+        for _, _, paths in plan:
+            remaining += len(paths)
+
+        try:
+            while remaining:
+                yield results.get()
+                remaining -= 1
+        finally:
+            # Stop handing out work if the caller gave up early
+            cancelled.set()
+            for thread in threads:
+                thread.join()
+
+    def _drain(self, pending: deque, func: Callable, results: queue.Queue,
+               cancelled: threading.Event):
+        """Reader thread: take files from one device's queue in order"""
+        while not cancelled.is_set():
+            try:
+                file_path = pending.popleft()
+            except IndexError:
+                return
+            try:
+                result = func(file_path)
+            except Exception as e:
+                logger.warning(f"Could not process {file_path}: {e}")
+                result = None
+            results.put((file_path, result))
@@ -0,0 +1,318 @@
+"""
+Live Duplicate Index Maintained from File System Events
+"""
+
+import os
+import threading
+from stat import S_ISREG
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+from .hashing import FileHasher
+
+logger = logging.getLogger(__name__)
+
+_SEED_PREFIX = 'seed:'
+
+
+class LiveDuplicateIndex:
+    """
+    Size buckets and duplicate groups kept current from monitor events
+
+    The index is seeded from a finished scan and then fed the
+    (event_type, path) pairs that FileScanner.start_monitoring reports.
+    Events are collected for a short debounce window so a burst of writes
+    to one file is handled once. Each touched path is then stat'ed again.
+    Only size buckets that gained or lost a member are re-evaluated, and
+    only files without a known digest are hashed.
+
+    Files from the seed scan carry a group token instead of a digest. When
+    a bucket has to be compared for real, each token class is hashed
+    through one representative. With a HashCache that read is usually a
+    cache hit.
+    """
+
+    DEBOUNCE_SECONDS = 0.5
+
+    def __init__(self, hasher: Optional[FileHasher] = None,
+                 extensions: Optional[Iterable[str]] = None,
+                 min_size: int = 0,
+                 max_size: int = 0,
+                 debounce: float = DEBOUNCE_SECONDS,
+                 on_update: Optional[Callable[[Set[str]], None]] = None):
+        """
+        Args:
+            hasher: Hasher used to confirm duplicates
+            extensions: File extensions to track (None for all)
+            min_size: Minimum file size in bytes (0 for no limit)
+            max_size: Maximum file size in bytes (0 for no limit)
+            debounce: Seconds to collect events before applying them
+            on_update: Called with the set of changed paths after each batch
+        """
+        self.hasher = hasher or FileHasher()
+        self.extensions = {ext.lower() for ext in extensions} if extensions else None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.debounce = debounce
+        self.on_update = on_update
+
+        # path -> (size, mtime_ns, device, inode)
+        self._files: Dict[str, Tuple[int, int, int, int]] = {}
+        self._buckets: Dict[int, Set[str]] = {}
+        # path -> full digest, or a seed token shared by one scanned group
+        self._keys: Dict[str, str] = {}
+        self._groups: Dict[int, List[List[str]]] = {}
+
+        self._lock = threading.Lock()
+        self._apply_lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._timer: Optional[threading.Timer] = None
+
+        self.stats = {'events': 0, 'batches': 0, 'files_hashed': 0}
+
+    def load(self, scanned_files: Dict[str, Dict],
+             duplicate_groups: Optional[Dict[str, List[str]]] = None):
+        """
+        Seed the index from a scan
+
+        Args:
+            scanned_files: FileScanner.scanned_files
+            duplicate_groups: Original -> duplicates found for that scan
+        """
+        with self._lock:
+            self._files.clear()
+            self._buckets.clear()
+            self._keys.clear()
+            self._groups.clear()
+
+            for path, info in scanned_files.items():
+                if not self._accepts(path, info['size']):
+                    continue
+                self._files[path] = (info['size'], info.get('modified_ns', 0),
+                                     info.get('device', 0), info.get('inode', 0))
+                self._buckets.setdefault(info['size'], set()).add(path)
+
+            # Every file gets a token; files of one scanned group share theirs
+            for path in self._files:
+                self._keys[path] = f"{_SEED_PREFIX}{path}"
+            for original, duplicates in (duplicate_groups or {}).items():
+                for path in [original] + list(duplicates):
+                    if path in self._files:
+                        self._keys[path] = f"{_SEED_PREFIX}{original}"
+
+            for size in self._buckets:
+                self._rebuild_groups(size)
+
+        logger.info(f"Live index seeded with {len(self._files)} files")
+
+    def on_event(self, event_type: str, path: str, dest_path: Optional[str] = None):
+        """
+        Queue a file system event
+
+        Args:
+            event_type: 'created', 'deleted', 'modified' or 'moved'
+            path: Affected path (source path for moves)
+            dest_path: Destination path for moves
+        """
+        with self._lock:
+            self.stats['events'] += 1
+            self._pending.add(path)
+            if dest_path:
+                self._pending.add(dest_path)
+
+            # The first event of a burst opens the window; later ones join it
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> Set[str]:
+        """
+        Apply all queued events now
+
+        Returns:
+            Paths whose state changed
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return self._apply_pending()
+
+    def stop(self):
+        """Cancel the debounce timer and drop queued events"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+
+    def get_duplicates(self) -> Dict[str, List[str]]:
+        """
+        Current duplicate groups, answered from the index without rescanning
+
+        Returns:
+            Dictionary of original -> duplicates
+        """
+        with self._lock:
+            duplicate_groups = {}
+            for size in sorted(self._groups, reverse=True):
+                for group in self._groups[size]:
+                    duplicate_groups[group[0]] = group[1:]
+            return duplicate_groups
+
+    def get_size_groups(self) -> Dict[int, List[str]]:
+        """Current size buckets with more than one file"""
+        with self._lock:
+            return {size: sorted(paths) for size, paths in self._buckets.items() if len(paths) > 1}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._files)
+
+    def _on_timer(self):
+        """Debounce window closed"""
+        with self._lock:
+            self._timer = None
+        try:
+            self._apply_pending()
+        except Exception as e:
+            logger.error(f"Live index update failed: {e}")
+
+    def _apply_pending(self) -> Set[str]:
+        """Re-stat queued paths, re-hash what changed and rebuild touched groups"""
+        with self._apply_lock:
+            with self._lock:
+                pending = self._pending
+                self._pending = set()
+            if not pending:
+                return set()
+
+            # Step 1: bring files and size buckets up to date
+            changed = set()
+            touched_sizes = set()
+            for path in pending:
+                try:
+                    stat = os.stat(path)
+                    is_file = S_ISREG(stat.st_mode)
+                except OSError:
+                    stat, is_file = None, False
+
+                with self._lock:
+                    old = self._files.get(path)
+                    if is_file and self._accepts(path, stat.st_size):
+                        new = (stat.st_size, stat.st_mtime_ns, stat.st_dev, stat.st_ino)
+                    else:
+                        new = None
+
+                    if old == new:
+                        continue
+                    changed.add(path)
+
+                    if old is not None:
+                        self._buckets[old[0]].discard(path)
+                        if not self._buckets[old[0]]:
+                            del self._buckets[old[0]]
+                        self._keys.pop(path, None)
+                        touched_sizes.add(old[0])
+                        del self._files[path]
+                    if new is not None:
+                        self._files[path] = new
+                        self._buckets.setdefault(new[0], set()).add(path)
+                        touched_sizes.add(new[0])
+
+            # Step 2: hash only what a touched bucket needs, outside the lock
+            with self._lock:
+                to_hash = self._paths_needing_digests(touched_sizes)
+            digests = {}
+            for path, members in to_hash.items():
+                try:
+                    digests[path] = (self.hasher.calculate_hash(path), members)
+                except (OSError, IOError) as e:
+                    logger.warning(f"Could not hash {path}: {e}")
+
+            # Step 3: store digests and rebuild only the touched groups
+            with self._lock:
+                for path, (digest, members) in digests.items():
+                    for member in members:
+                        if member in self._files:
+                            self._keys[member] = digest
+                self.stats['files_hashed'] += len(digests)
+                self.stats['batches'] += 1
+                for size in touched_sizes:
+                    self._rebuild_groups(size)
+
+        if changed:
+            logger.info(f"Live index applied {len(changed)} changes in {len(touched_sizes)} size groups")
+            if self.on_update:
+                self.on_update(changed)
+        return changed
+
+    def _paths_needing_digests(self, sizes: Set[int]) -> Dict[str, List[str]]:
+        """
+        Pick the files to hash for the given buckets
+
+        Returns:
+            Path to hash -> every path that takes on its digest
+        """
+        to_hash = {}
+        for size in sizes:
+            members = self._buckets.get(size)
+            if not members or len(members) < 2:
+                continue
+
+            seed_classes: Dict[str, List[str]] = {}
+            for path in members:
+                key = self._keys.get(path)
+                if key is None:
+                    to_hash[path] = [path]
+                elif key.startswith(_SEED_PREFIX):
+                    seed_classes.setdefault(key, []).append(path)
+
+            # Seed tokens are only comparable with each other; once a bucket
+            # changes, each scanned group is hashed through one member
+            for paths in seed_classes.values():
+                paths.sort()
+                to_hash[paths[0]] = paths
+        return to_hash
+
+    def _rebuild_groups(self, size: int):
+        """Recompute the duplicate groups of one size bucket"""
+        self._groups.pop(size, None)
+        members = self._buckets.get(size)
+        if not members or len(members) < 2:
+            return
+
+        by_key: Dict[str, List[str]] = {}
+        for path in sorted(members):
+            key = self._keys.get(path)
+            if key is not None:
+                by_key.setdefault(key, []).append(path)
+
+        groups = []
+        for paths in by_key.values():
+            # Hardlinks are the same data; keep one path per inode
+            identities = set()
+            distinct = []
+            for path in paths:
+                _, _, device, inode = self._files[path]
+                if device and inode and (device, inode) in identities:
+                    continue
+                identities.add((device, inode))
+                distinct.append(path)
+            if len(distinct) > 1:
+                groups.append(distinct)
+
+        if groups:
+            self._groups[size] = groups
+
+    def _accepts(self, path: str, size: int) -> bool:
+        """Apply the same filters as the scan"""
+        if size == 0:
+            return False
+        if self.min_size > 0 and size < self.min_size:
+            return False
+        if self.max_size > 0 and size > self.max_size:
+            return False
+        if self.extensions is not None:
+            return os.path.splitext(path)[1].lower() in self.extensions
+        return True
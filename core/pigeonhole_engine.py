@@ -3,10 +3,20 @@ Pigeonhole Principle Engine for Efficient Duplicate Detection
 """
 
 import os
-from typing import Dict, List, Set, Tuple
-from collections import defaultdict
+import time
+from typing import Dict, List, Set, Tuple, Optional, Callable, Iterator, Sequence
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 import logging
+import threading
 from .hashing import FileHasher
+from .hash_cache import HashCache
+from .file_table import FileTable
+from .process_hashing import ProcessHashPool
+from .autotune import IOAutotuner
+from .io_scheduler import DeviceScheduler
+from .progress import ProgressReporter, percent_callback
 
 logger = logging.getLogger(__name__)
 
@@ -16,117 +26,745 @@ class PigeonholeEngine:
     Optimizes by grouping files before hashing
     """
     
-    def __init__(self, hash_algorithm: str = 'md5'):
-        self.hasher = FileHasher(hash_algorithm)
+    # Screening stages, run in this order before the full hash
+    SCREENING_STAGES = ('head', 'tail', 'samples')
+    
+    # How candidate groups are confirmed after screening
+    COMPARE_STRATEGIES = ('hash', 'direct')
+    
+    # Files per window when streaming results from iter_duplicates
+    STREAM_WINDOW_FILES = 4096
+    
+    # Where hashing runs: worker threads, or worker processes for CPU-bound digests
+    EXECUTORS = ('thread', 'process')
+    
+    def __init__(self, hash_algorithm: str = 'md5', hash_cache: Optional[HashCache] = None,
+                 workers: int = 1, max_in_flight: Optional[int] = None,
+                 stages: Sequence[str] = SCREENING_STAGES, block_size: int = 65536,
+                 sample_blocks: int = 4, prefilter_algorithm: Optional[str] = None,
+                 chunk_size: int = 8192, io_strategy: str = 'auto',
+                 compare_strategy: str = 'hash', direct_compare_max: int = 3,
+                 executor: str = 'thread', autotune: bool = False,
+                 device_scheduling: bool = False, rotational_workers: int = 1):
+        self.hash_cache = hash_cache
+        self.hasher = FileHasher(hash_algorithm, chunk_size, cache=hash_cache,
+                                 io_strategy=io_strategy)
+        self.chunk_size = chunk_size
+        
+        # Screening stages may use a cheap hash; only the final hash must be strong
+        if prefilter_algorithm == 'auto':
+            prefilter_algorithm = FileHasher.fastest_algorithm()
+        if prefilter_algorithm and prefilter_algorithm.lower() != self.hasher.algorithm:
+            self.prefilter_hasher = FileHasher(prefilter_algorithm, chunk_size, cache=hash_cache,
+                                               io_strategy=io_strategy)
+        else:
+            self.prefilter_hasher = self.hasher
+        
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.block_size = block_size
+        self.sample_blocks = sample_blocks
+        self.stages = list(stages)
+        
+        for stage in self.stages:
+            if stage not in self.SCREENING_STAGES:
+                raise ValueError(f"Unsupported screening stage: {stage}")
+        
+        # 'direct' compares groups of up to direct_compare_max files byte by byte
+        # and falls back to hashing for larger groups
+        self.compare_strategy = compare_strategy
+        self.direct_compare_max = direct_compare_max
+        if self.compare_strategy not in self.COMPARE_STRATEGIES:
+            raise ValueError(f"Unsupported compare strategy: {compare_strategy}")
+        
+        # 'process' hashes in a pool of `workers` processes, started once per run
+        self.executor = executor
+        if self.executor not in self.EXECUTORS:
+            raise ValueError(f"Unsupported executor: {executor}")
+        self._process_pool: Optional[ProcessHashPool] = None
+        
+        # Tune thread count and read size from measured throughput (thread executor)
+        self.autotune = autotune
+        self._autotuner: Optional[IOAutotuner] = None
+        
+        # Per-device read queues, ordered by disk position on spinning disks
+        self.device_scheduler = None
+        if device_scheduling:
+            self.device_scheduler = DeviceScheduler(self.workers, rotational_workers)
+        
+        self._stats_lock = threading.Lock()
         self.stats = {
             'files_processed': 0,
             'hash_computations_saved': 0,
             'comparisons_made': 0,
-            'time_saved': 0.0
+            'partial_hashes': 0,
+            'full_hashes': 0,
+            'direct_compares': 0,
+            'bytes_read': 0,
+            'cache_hits': 0,
+            'hardlinks_collapsed': 0,
+            'time_saved': 0.0,
+            # Wall time of the screening stages and of confirmation (hashing
+            # or direct comparison), including time the caller spends per group
+            'screening_time': 0.0,
+            'hashing_time': 0.0
         }
+        
+        # Paths that share one inode: first path -> the other links to it
+        self.hardlink_groups: Dict[str, List[str]] = {}
     
     def find_duplicates(self, file_groups: Dict[int, List[str]], 
-                       progress_callback=None) -> Dict[str, List[str]]:
+                       progress_callback=None,
+                       file_info: Optional[Dict[str, Dict]] = None) -> Dict[str, List[str]]:
         """
         Find duplicates using pigeonhole principle optimization
         
+        Hardlinks (paths on the same device with the same inode) are the same
+        data, so they are collapsed to one path before any file is read and
+        reported separately through get_hardlink_groups().
+        
         Args:
-            file_groups: Files grouped by size (from pigeonhole principle)
+            file_groups: Files grouped by size (from pigeonhole principle).
+                With a FileTable as file_info the groups may hold file ids
+                (FileScanner.get_file_id_groups_by_size); results then use
+                file ids as well
             progress_callback: Callback for progress updates
+            file_info: Optional path -> info mapping with 'device' and 'inode'
+                keys (e.g. FileScanner.scanned_files); paths missing from it
+                are stat'ed
             
         Returns:
             Dictionary of original -> duplicates
         """
-        duplicate_groups = {}
-        total_groups = len(file_groups)
+        return dict(self.iter_duplicates(file_groups, progress_callback, file_info))
+    
+    def iter_duplicates(self, file_groups: Dict[int, List[str]],
+                        progress_callback=None,
+                        file_info: Optional[Dict[str, Dict]] = None,
+                        window_files: Optional[int] = None) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Yield duplicate groups as soon as they are confirmed
+        
+        Size groups are processed in windows of about window_files files.
+        Each window runs through screening and confirmation on its own, and
+        its groups are yielded before the next window starts. Results show up
+        early, and only one window's intermediate state is held in memory.
+        Statistics are updated even if the caller stops iterating early.
+        
+        Args:
+            file_groups: Files grouped by size (from pigeonhole principle)
+            progress_callback: Callback for progress updates
+            file_info: Optional path -> info mapping (see find_duplicates)
+            window_files: Files per window (defaults to STREAM_WINDOW_FILES)
+            
+        Yields:
+            (original, duplicates) for every confirmed group
+        """
+        size_groups = [(size, list(file_list)) for size, file_list in file_groups.items()
+                       if len(file_list) > 1]
         
-        for i, (size, file_list) in enumerate(file_groups.items()):
-            if progress_callback:
-                progress = (i / total_groups) * 100
-                progress_callback(progress, f"Processing {len(file_list)} files of size {size}")
+        # Count every candidate path, including links that are never read
+        files_processed = 0
+        for _, file_list in size_groups:
+            files_processed += len(file_list)
+        
+        # File ids are only turned into paths one window at a time
+        file_table = None
+        if isinstance(file_info, FileTable) and self._holds_ids(size_groups):
+            file_table = file_info
+        
+        self.hardlink_groups = {}
+        size_groups = self._collapse_hardlinks(size_groups, file_info, file_table)
+        windows = self._split_windows(size_groups, window_files or self.STREAM_WINDOW_FILES)
+        
+        reads_before = self._io_snapshot()
+        direct_before = self.stats['direct_compares']
+        groups_found = 0
+        completed = False
+        
+        try:
+            if self.autotune and self.executor == 'thread' and windows:
+                first_file = windows[0][0][1][0]
+                self._start_autotune(file_table.path_of(first_file) if file_table else first_file)
             
-            if len(file_list) == 1:
-                continue
+            for window_index, window in enumerate(windows):
+                window_callback = None
+                if progress_callback:
+                    window_callback = self._window_progress(progress_callback, window_index, len(windows))
+                
+                if file_table is None:
+                    for original, duplicates in self._iter_process_groups(window, window_callback):
+                        groups_found += 1
+                        yield original, duplicates
+                    continue
+                
+                path_window, path_ids = self._resolve_window(window, file_table)
+                for original, duplicates in self._iter_process_groups(path_window, window_callback):
+                    groups_found += 1
+                    yield path_ids[original], [path_ids[path] for path in duplicates]
+            completed = True
+        finally:
+            reads_after = self._io_snapshot()
+            direct_compares = self.stats['direct_compares'] - direct_before
             
-            # Find duplicates within this size group
-            size_duplicates = self._find_duplicates_in_group(file_list)
-            duplicate_groups.update(size_duplicates)
+            # Update statistics from the reads that actually happened
+            partial_reads = reads_after['partial_reads'] - reads_before['partial_reads']
+            full_reads = reads_after['full_reads'] - reads_before['full_reads']
+            self.stats['files_processed'] += files_processed
+            self.stats['partial_hashes'] += partial_reads
+            self.stats['full_hashes'] += full_reads
+            self.stats['bytes_read'] += reads_after['bytes_read'] - reads_before['bytes_read']
+            self.stats['comparisons_made'] += partial_reads + full_reads + direct_compares
+            self.stats['hash_computations_saved'] += files_processed - full_reads
             
-            # Update statistics
-            self.stats['files_processed'] += len(file_list)
-            potential_comparisons = len(file_list) * (len(file_list) - 1) // 2
-            self.stats['comparisons_made'] += len(size_duplicates)
-            self.stats['hash_computations_saved'] += potential_comparisons - len(size_duplicates)
+            self._close_process_pool()
+            self._finish_autotune()
+            if self.hash_cache is not None:
+                self.hash_cache.flush()
+        
+        if progress_callback and completed:
+            progress_callback(100.0, f"Found {groups_found} duplicate groups")
         
         logger.info(f"Pigeonhole optimization saved {self.stats['hash_computations_saved']} computations")
+    
+    def _holds_ids(self, size_groups: List[Tuple[int, List]]) -> bool:
+        """Check whether size groups hold file ids rather than paths"""
+        for _, file_list in size_groups:
+            return isinstance(file_list[0], int)
+        return False
+    
+    def _resolve_window(self, window: List[Tuple[int, List[int]]],
+                        file_table: FileTable) -> Tuple[List[Tuple[int, List[str]]], Dict[str, int]]:
+        """Turn one window of file id groups into path groups plus a path -> id map"""
+        path_window = []
+        path_ids = {}
+        for size, file_ids in window:
+            paths = []
+            for file_id in file_ids:
+                path = file_table.path_of(file_id)
+                path_ids[path] = file_id
+                paths.append(path)
+            path_window.append((size, paths))
+        return path_window, path_ids
+    
+    def _split_windows(self, size_groups: List[Tuple[int, List[str]]],
+                       window_files: int) -> List[List[Tuple[int, List[str]]]]:
+        """Cut the size groups into consecutive windows of about window_files files"""
+        windows = []
+        current = []
+        current_files = 0
+        for size, file_list in size_groups:
+            current.append((size, file_list))
+            current_files += len(file_list)
+            if current_files >= window_files:
+                windows.append(current)
+                current = []
+                current_files = 0
+        if current:
+            windows.append(current)
+        return windows
+    
+    def _window_progress(self, progress_callback: Callable, window_index: int,
+                         total_windows: int) -> Callable:
+        """Scale one window's 0-100 progress into its share of the whole run"""
+        def report(progress, message):
+            progress_callback((window_index + progress / 100) / total_windows * 100, message)
+        return report
+    
+    def update_duplicates(self, file_groups: Dict[int, List[str]],
+                          previous_groups: Dict[str, List[str]],
+                          dirty_sizes: Optional[Set[int]],
+                          progress_callback=None,
+                          file_info: Optional[Dict[str, Dict]] = None,
+                          previous_hardlinks: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+        """
+        Re-check only changed size buckets and merge with a previous result
+        
+        Args:
+            file_groups: Files grouped by size for the whole tree
+            previous_groups: Duplicate groups from the previous scan
+            dirty_sizes: Sizes whose buckets changed since then (None: all)
+            progress_callback: Callback for progress updates
+            file_info: Path -> info mapping from the scanner
+            previous_hardlinks: Hardlink groups from the previous scan
+            
+        Returns:
+            Dictionary of original -> duplicates
+        """
+        if dirty_sizes is None:
+            return self.find_duplicates(file_groups, progress_callback, file_info)
+        
+        dirty_groups = {}
+        for size, file_list in file_groups.items():
+            if size in dirty_sizes:
+                dirty_groups[size] = file_list
+        
+        duplicate_groups = self.find_duplicates(dirty_groups, progress_callback, file_info)
+        
+        # Groups in untouched buckets are still valid as they were
+        for original, duplicates in previous_groups.items():
+            size = self._known_size(original, file_info)
+            if size is not None and size not in dirty_sizes:
+                duplicate_groups[original] = list(duplicates)
+        
+        for path, links in (previous_hardlinks or {}).items():
+            size = self._known_size(path, file_info)
+            if size is not None and size not in dirty_sizes:
+                self.hardlink_groups[path] = list(links)
+        
+        logger.info(f"Incremental update re-checked {len(dirty_groups)} of {len(file_groups)} size groups")
         return duplicate_groups
     
+    def _known_size(self, file_path: str, file_info: Optional[Dict[str, Dict]] = None) -> Optional[int]:
+        """Size of a file from the scanner's data, or None if it is gone"""
+        if file_info is not None:
+            info = file_info.get(file_path)
+            return info['size'] if info is not None else None
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return None
+    
+    def get_hardlink_groups(self) -> Dict[str, List[str]]:
+        """
+        Paths from the last find_duplicates call that are already hardlinked
+        
+        Returns:
+            Dictionary of kept path -> other paths to the same inode
+        """
+        return {path: list(links) for path, links in self.hardlink_groups.items()}
+    
+    def _collapse_hardlinks(self, size_groups: List[Tuple[int, List]],
+                            file_info: Optional[Dict[str, Dict]] = None,
+                            file_table: Optional[FileTable] = None) -> List[Tuple[int, List]]:
+        """
+        Replace every set of same-inode paths with its first path
+        
+        Deleting one link of a hardlinked file frees no space, so the extra
+        links are recorded in self.hardlink_groups instead of being hashed and
+        reported as duplicates. Groups left with a single path are dropped.
+        With a file_table the groups hold file ids, read from its columns.
+        """
+        collapsed_groups = []
+        collapsed = 0
+        for size, file_list in size_groups:
+            first_path = {}
+            kept = []
+            for file_path in file_list:
+                if file_table is not None:
+                    identity = file_table.identity(file_path)
+                    if not identity[0] or not identity[1]:
+                        identity = None
+                else:
+                    identity = self._file_identity(file_path, file_info)
+                if identity is None:
+                    kept.append(file_path)
+                    continue
+                
+                if identity in first_path:
+                    self.hardlink_groups.setdefault(first_path[identity], []).append(file_path)
+                    collapsed += 1
+                else:
+                    first_path[identity] = file_path
+                    kept.append(file_path)
+            
+            if len(kept) > 1:
+                collapsed_groups.append((size, kept))
+        
+        if collapsed:
+            self.stats['hardlinks_collapsed'] += collapsed
+            logger.info(f"Collapsed {collapsed} hardlinked paths before hashing")
+        return collapsed_groups
+    
+    def _file_identity(self, file_path: str,
+                       file_info: Optional[Dict[str, Dict]] = None) -> Optional[Tuple[int, int]]:
+        """Return (device, inode) for a file, or None if it has no stable identity"""
+        info = file_info.get(file_path) if file_info is not None else None
+        if info is not None and 'inode' in info:
+            device, inode = info['device'], info['inode']
+        else:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+            device, inode = stat.st_dev, stat.st_ino
+        
+        # Some filesystems report 0 for every file, and a device of 0 is an
+        # unknown volume (e.g. from DirEntry.stat() on Windows)
+        if not device or not inode:
+            return None
+        return device, inode
+    
     def _find_duplicates_in_group(self, file_list: List[str]) -> Dict[str, List[str]]:
         """Find duplicates within a group of same-sized files"""
         if len(file_list) < 2:
             return {}
+        try:
+            return self._process_groups([(os.path.getsize(file_list[0]), list(file_list))])
+        finally:
+            self._close_process_pool()
+    
+    def _process_groups(self, size_groups: List[Tuple[int, List[str]]],
+                        progress_callback=None) -> Dict[str, List[str]]:
+        """Run the whole pipeline over size groups and collect the result"""
+        return dict(self._iter_process_groups(size_groups, progress_callback))
+    
+    def _iter_process_groups(self, size_groups: List[Tuple[int, List[str]]],
+                             progress_callback=None) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Run the screening and full-hash stages over all size groups at once,
+        so the worker pool always has work from many groups in flight, and
+        yield each group as soon as it is confirmed
+        """
+        # Files whose content is unchanged since a previous scan need no reads at all
+        cached_hashes = {}
+        to_screen = []
+        candidate_groups = []
+        for size, file_list in size_groups:
+            group_cached = self._lookup_cached_hashes(file_list)
+            cached_hashes.update(group_cached)
+            if len(group_cached) == len(file_list):
+                candidate_groups.append((size, file_list))
+            else:
+                to_screen.append((size, file_list))
+        
+        # Progressive screening: each stage splits buckets and drops singletons
+        screening_start = time.perf_counter()
+        total_stages = len(self.stages) + 1
+        completed_stages = []
+        covered_groups = []
+        for index, stage in enumerate(self.stages):
+            active_groups = []
+            for size, file_list in to_screen:
+                if self._is_fully_covered(size, completed_stages):
+                    covered_groups.append((size, file_list))
+                else:
+                    active_groups.append((size, file_list))
+            
+            to_screen = self._screen_stage(active_groups, stage, progress_callback,
+                                           index, total_stages)
+            completed_stages.append(stage)
+        
+        for size, file_list in to_screen:
+            if self._is_fully_covered(size, completed_stages):
+                covered_groups.append((size, file_list))
+            else:
+                candidate_groups.append((size, file_list))
+        hashing_start = time.perf_counter()
+        self.stats['screening_time'] += hashing_start - screening_start
         
-        # Quick screening using partial comparison
-        candidate_groups = self._quick_screen_duplicates(file_list)
+        try:
+            yield from self._iter_confirm_groups(covered_groups, candidate_groups,
+                                                 cached_hashes, progress_callback, total_stages)
+        finally:
+            self.stats['hashing_time'] += time.perf_counter() - hashing_start
+    
+    def _iter_confirm_groups(self, covered_groups: List[Tuple[int, List[str]]],
+                             candidate_groups: List[Tuple[int, List[str]]],
+                             cached_hashes: Dict[str, str], progress_callback,
+                             total_stages: int) -> Iterator[Tuple[str, List[str]]]:
+        """Confirm the groups left after screening and yield each one as it is done"""
+        # Groups whose screening blocks already spanned every byte are confirmed
+        for _, files in covered_groups:
+            yield self._make_group(files)
+        
+        # Small groups can be confirmed by a lockstep byte comparison instead
+        direct_groups = []
+        if self.compare_strategy == 'direct':
+            hash_candidates = []
+            for size, file_list in candidate_groups:
+                if len(file_list) <= self.direct_compare_max and not self._all_cached(file_list, cached_hashes):
+                    direct_groups.append((size, file_list))
+                else:
+                    hash_candidates.append((size, file_list))
+            candidate_groups = hash_candidates
+        
+        for _, files in self._iter_direct_compare_groups(direct_groups):
+            yield self._make_group(files)
         
         # Detailed hash comparison for candidate groups
-        duplicate_groups = {}
-        processed_files = set()
+        def full_hash(file_path):
+            return cached_hashes.get(file_path) or self.hasher.calculate_hash(file_path)
         
-        for group in candidate_groups:
-            if len(group) < 2:
-                continue
-            
-            # Compute full hashes and group duplicates
-            hash_groups = defaultdict(list)
-            for file_path in group:
-                if file_path in processed_files:
-                    continue
-                
+        for _, files in self._iter_bucket_groups(candidate_groups, full_hash, progress_callback,
+                                                 total_stages - 1, total_stages, "Hashing",
+                                                 self.hasher, 'full', cached_hashes):
+            yield self._make_group(files)
+    
+    def _make_group(self, files: List[str]) -> Tuple[str, List[str]]:
+        """Pick the original of a confirmed group (keep one original per hash group)"""
+        original = self._select_original_file(files)
+        duplicates = [f for f in files if f != original]
+        return original, duplicates
+    
+    def _all_cached(self, file_list: List[str], cached_hashes: Dict[str, str]) -> bool:
+        """Check whether every file in a group already has a cached full hash"""
+        for file_path in file_list:
+            if file_path not in cached_hashes:
+                return False
+        return True
+    
+    def _iter_direct_compare_groups(self, size_groups: List[Tuple[int, List[str]]]) -> Iterator[Tuple[int, List[str]]]:
+        """Confirm small groups by comparing file contents directly, yielding each as it settles"""
+        def compare(group):
+            try:
+                return self._direct_compare(group[0], group[1])
+            except (IOError, OSError) as e:
+                logger.warning(f"Could not compare group of {len(group[1])} files: {e}")
+                return []
+        
+        for (size, _), split_groups in self._map_ordered(size_groups, compare):
+            for file_list in split_groups or []:
+                yield size, file_list
+    
+    def _direct_compare(self, size: int, file_list: List[str]) -> List[List[str]]:
+        """
+        Read all files of a group in lockstep and split it as contents diverge
+        
+        Stops reading a file as soon as no other member shares its content so
+        far, so two different files cost only one block each past the point
+        where they differ. No hash is computed.
+        
+        Returns:
+            Lists of files with identical content (two or more members each)
+        """
+        block_size = self.hasher.select_chunk_size(size)
+        bytes_read = 0
+        
+        with ExitStack() as stack:
+            handles = {}
+            for file_path in file_list:
                 try:
-                    file_hash = self.hasher.calculate_hash(file_path)
-                    hash_groups[file_hash].append(file_path)
-                    processed_files.add(file_path)
-                except Exception as e:
-                    logger.warning(f"Could not hash {file_path}: {e}")
-                    continue
+                    handles[file_path] = stack.enter_context(open(file_path, 'rb'))
+                except (IOError, OSError) as e:
+                    logger.warning(f"Could not open {file_path}: {e}")
+            
+            active_groups = [list(handles)] if len(handles) > 1 else []
+            identical_groups = []
             
-            # Create duplicate groups (keep one original per hash group)
-            for file_hash, files in hash_groups.items():
-                if len(files) > 1:
-                    original = self._select_original_file(files)
-                    duplicates = [f for f in files if f != original]
-                    duplicate_groups[original] = duplicates
+            while active_groups:
+                next_groups = []
+                for group in active_groups:
+                    blocks = defaultdict(list)
+                    for file_path in group:
+                        block = handles[file_path].read(block_size)
+                        bytes_read += len(block)
+                        blocks[block].append(file_path)
+                    
+                    for block, members in blocks.items():
+                        if len(members) < 2:
+                            continue
+                        if block:
+                            next_groups.append(members)
+                        else:
+                            # All members reached end of file together
+                            identical_groups.append(members)
+                active_groups = next_groups
         
-        return duplicate_groups
+        with self._stats_lock:
+            self.stats['direct_compares'] += len(file_list)
+            self.stats['bytes_read'] += bytes_read
+        
+        return identical_groups
+    
+    def _lookup_cached_hashes(self, file_list: List[str]) -> Dict[str, str]:
+        """Collect cached full hashes for files that have not changed"""
+        cached_hashes = {}
+        if self.hash_cache is None:
+            return cached_hashes
+        
+        for file_path in file_list:
+            file_hash = self.hasher.get_cached_hash(file_path)
+            if file_hash:
+                cached_hashes[file_path] = file_hash
+        
+        self.stats['cache_hits'] += len(cached_hashes)
+        return cached_hashes
+    
+    def _screen_stage(self, size_groups: List[Tuple[int, List[str]]], stage: str,
+                      progress_callback=None, index: int = 0,
+                      total_stages: int = 2) -> List[Tuple[int, List[str]]]:
+        """Run one screening stage (head, tail or samples) over all groups"""
+        def block_hash(file_path):
+            return self.prefilter_hasher.calculate_block_hash(file_path, stage, self.block_size,
+                                                    self.sample_blocks)
+        
+        return self._bucket_groups(size_groups, block_hash, progress_callback,
+                                   index, total_stages, f"Screening ({stage})",
+                                   self.prefilter_hasher, stage)
+    
+    def _is_fully_covered(self, size: int, completed_stages: List[str]) -> bool:
+        """Check whether the screening blocks read so far span the whole file"""
+        if self.prefilter_hasher is not self.hasher:
+            # A cheap prefilter hash is not strong enough to confirm duplicates
+            return False
+        if 'head' not in completed_stages:
+            return False
+        if size <= self.block_size:
+            return True
+        return 'tail' in completed_stages and size <= self.block_size * 2
     
-    def _quick_screen_duplicates(self, file_list: List[str]) -> List[List[str]]:
+    def _bucket_groups(self, size_groups: List[Tuple[int, List[str]]], hash_func: Callable,
+                       progress_callback=None, stage: int = 0, total_stages: int = 2,
+                       label: str = "Processing", hasher: Optional[FileHasher] = None,
+                       position: Optional[str] = None) -> List[Tuple[int, List[str]]]:
         """
-        Quick screening using pigeonhole principle:
-        - Compare first few bytes first
-        - Group files that match in initial screening
+        Split every group by a per-file digest and drop singleton buckets
+        (see _iter_bucket_groups)
         """
-        candidate_groups = []
-        processed = set()
+        return list(self._iter_bucket_groups(size_groups, hash_func, progress_callback,
+                                             stage, total_stages, label, hasher, position))
+    
+    def _iter_bucket_groups(self, size_groups: List[Tuple[int, List[str]]], hash_func: Callable,
+                            progress_callback=None, stage: int = 0, total_stages: int = 2,
+                            label: str = "Processing", hasher: Optional[FileHasher] = None,
+                            position: Optional[str] = None,
+                            known: Optional[Dict[str, str]] = None) -> Iterator[Tuple[int, List[str]]]:
+        """
+        Split every group by a per-file digest and drop singleton buckets,
+        yielding the buckets of each group as soon as its last file is hashed
         
-        for i, file1 in enumerate(file_list):
-            if file1 in processed:
-                continue
-            
-            current_group = [file1]
-            processed.add(file1)
+        Args:
+            size_groups: (size, files) groups to split
+            hash_func: Function computing the digest of one file
+            progress_callback: Callback for progress updates
+            stage: Index of this stage, used to scale overall progress
+            total_stages: Number of stages in the pipeline
+            label: Stage name used in progress messages
+            hasher: Hasher behind hash_func, used with the process executor
+            position: 'full' or the screening stage hash_func computes
+            known: Digests already known by path
             
-            for j, file2 in enumerate(file_list[i+1:], i+1):
-                if file2 in processed:
-                    continue
+        Yields:
+            (size, files) groups with at least two members
+        """
+        file_paths = [file_path for _, file_list in size_groups for file_path in file_list]
+        if self.executor == 'process' and hasher is not None:
+            results = hasher.map_hashes(file_paths, self._get_process_pool(), position,
+                                        self.block_size, self.sample_blocks, known)
+        elif self.device_scheduler is not None:
+            # Reads finish in disk order; groups are assembled once the stage is done
+            digests = dict(self.device_scheduler.map(
+                file_paths, lambda file_path: self._safe_hash(hash_func, file_path)))
+            results = ((file_path, digests[file_path]) for file_path in file_paths)
+        else:
+            results = self._map_ordered(file_paths, lambda file_path: self._safe_hash(hash_func, file_path))
+        reporter = None
+        if progress_callback:
+            # Files are counted per group and bytes by the hasher; snapshots are throttled
+            reporter = ProgressReporter([percent_callback(progress_callback)])
+            reporter.set_stage(label, files_total=len(file_paths),
+                               start_percent=stage / total_stages * 100,
+                               end_percent=(stage + 1) / total_stages * 100)
+            if hasher is not None:
+                hasher.progress = reporter
+        
+        try:
+            for size, file_list in size_groups:
+                buckets = defaultdict(list)
+                for _ in file_list:
+                    file_path, file_hash = next(results)
+                    if file_hash is not None:
+                        buckets[file_hash].append(file_path)
+                
+                if reporter is not None:
+                    reporter.add(files=len(file_list))
+                    reporter.poll()
                 
-                if self.hasher.quick_hash_comparison(file1, file2):
-                    current_group.append(file2)
-                    processed.add(file2)
+                for bucket in buckets.values():
+                    if len(bucket) > 1:
+                        yield size, bucket
             
-            candidate_groups.append(current_group)
+            if reporter is not None:
+                reporter.flush()
+        finally:
+            if hasher is not None and reporter is not None:
+                hasher.progress = None
+    
+    def _map_ordered(self, items: List, func: Callable) -> Iterator[Tuple]:
+        """
+        Apply func to every item, in parallel when workers > 1, yielding
+        (item, result) pairs in input order
         
-        return candidate_groups
+        At most max_in_flight items are queued at once so huge groups do not
+        turn into an unbounded backlog of pending futures. While autotuning,
+        the tuner's current worker count is the in-flight limit instead.
+        """
+        tuner = self._autotuner
+        if self.workers <= 1 and tuner is None:
+            for item in items:
+                yield item, func(item)
+            return
+        
+        in_flight = deque()
+        pool_size = tuner.max_workers if tuner is not None else self.workers
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            for item in items:
+                in_flight.append((item, executor.submit(func, item)))
+                limit = tuner.workers if tuner is not None else self.max_in_flight
+                while len(in_flight) >= limit:
+                    done_item, future = in_flight.popleft()
+                    yield done_item, future.result()
+                    self._observe_io(tuner)
+            
+            while in_flight:
+                done_item, future = in_flight.popleft()
+                yield done_item, future.result()
+                self._observe_io(tuner)
+    
+    def _start_autotune(self, sample_path: str):
+        """Load the I/O profile of the mount holding sample_path and start measuring"""
+        self._autotuner = IOAutotuner.for_path(sample_path, self.workers, self.hasher.chunk_size,
+                                               max_workers=self.workers * 8)
+        self.hasher.chunk_size = self._autotuner.chunk_size
+        self._autotuner.begin(self._bytes_read_so_far())
+    
+    def _observe_io(self, tuner: Optional[IOAutotuner]):
+        """Feed one finished item to the tuner and apply its new read size"""
+        if tuner is not None and tuner.observe(self._bytes_read_so_far()):
+            self.hasher.chunk_size = tuner.chunk_size
+    
+    def _finish_autotune(self):
+        """Store the tuned settings for the next run and restore the read size"""
+        if self._autotuner is None:
+            return
+        tuner, self._autotuner = self._autotuner, None
+        logger.info(f"I/O tuning: {tuner.workers} workers, {tuner.chunk_size} byte reads, "
+                    f"{tuner.bytes_per_second / (1024 * 1024):.1f} MB/s")
+        tuner.save()
+        self.hasher.chunk_size = self.chunk_size
+    
+    def _bytes_read_so_far(self) -> int:
+        """Bytes read by hashing and direct comparison, for throughput sampling"""
+        return self._io_snapshot()['bytes_read'] + self.stats['bytes_read']
+    
+    def _get_process_pool(self) -> ProcessHashPool:
+        """Hashing processes for this run, started on first use"""
+        if self._process_pool is None:
+            self._process_pool = ProcessHashPool(self.workers)
+        return self._process_pool
+    
+    def _close_process_pool(self):
+        """Stop the hashing processes at the end of a run"""
+        if self._process_pool is not None:
+            self._process_pool.close()
+            self._process_pool = None
+    
+    def _io_snapshot(self) -> Dict[str, int]:
+        """Sum the I/O counters of the strong and prefilter hashers"""
+        snapshot = self.hasher.io_stats.copy()
+        if self.prefilter_hasher is not self.hasher:
+            for key, value in self.prefilter_hasher.io_stats.items():
+                snapshot[key] += value
+        return snapshot
+    
+    def _safe_hash(self, hash_func: Callable, file_path: str) -> Optional[str]:
+        """Hash one file, logging and skipping files that cannot be read"""
+        try:
+            return hash_func(file_path)
+        except Exception as e:
+            logger.warning(f"Could not hash {file_path}: {e}")
+            return None
     
     def _select_original_file(self, files: List[str]) -> str:
         """Select the best candidate as original file"""
@@ -0,0 +1,464 @@
+"""
+Staged asyncio Pipeline from Directory Walk to Duplicate Groups
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+from .file_table import FileTable
+from .file_walker import list_directory, normalize_roots
+from .pigeonhole_engine import PigeonholeEngine
+from .progress import ProgressReporter, ProgressSnapshot
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class ScanPipeline:
+    """
+    Walk, bucket, screen, full-hash and emit as concurrent stages
+
+    Each stage is a group of asyncio tasks. Stages are connected by bounded
+    asyncio queues, so a fast stage waits for a slow one instead of piling
+    up work. Directory listings and hashing run in thread pools whose
+    futures the stages await; the event loop only moves file ids between
+    stages.
+    Size, mtime and inode come from the DirEntry data of each listing, so
+    the stat stage runs inside the walk stage's listing threads.
+
+    Hashing starts while the walk is still running. A file enters the
+    engine's first screening stage (e.g. its head block) as soon as a
+    second file of its size turns up, and each following stage (tail,
+    samples) as soon as another file matches it on every stage so far.
+    After the last stage it is fully hashed, unless the screened blocks
+    already span the whole file. That work is needed whatever the rest of
+    the walk finds. Groups are emitted once the walk is over and their
+    size bucket has no hashing left. Until every directory is listed, any
+    bucket can still gain a member from another part of the tree.
+
+    Screening uses the engine's prefilter hasher, stages, block size and
+    sample count; confirmation uses its full hasher and HashCache. Engines
+    set up for direct compare, process hashing, I/O autotuning or device
+    scheduling need PigeonholeEngine.find_duplicates (see supports()).
+    """
+
+    # Seconds between progress reports
+    PROGRESS_INTERVAL = 0.2
+
+    def __init__(self, engine: PigeonholeEngine, directories: Iterable[str],
+                 extensions: Optional[Iterable[str]] = None,
+                 min_size: int = 0,
+                 max_size: int = 0,
+                 include_zero_byte: bool = False,
+                 skip_dir: Optional[Callable[[str], bool]] = None,
+                 walk_workers: int = 4,
+                 hash_workers: Optional[int] = None,
+                 queue_size: int = 1024,
+                 progress_callback: Optional[Callable[[float, str], None]] = None):
+        """
+        Args:
+            engine: Engine whose hashers, cache and statistics are used
+            directories: Roots to scan (overlapping roots are walked once)
+            extensions: File extensions to include (None for all)
+            min_size: Minimum file size in bytes (0 for no limit)
+            max_size: Maximum file size in bytes (0 for no limit)
+            include_zero_byte: Whether empty files are reported as duplicates
+            skip_dir: Predicate on a directory name; True prunes that subtree
+            walk_workers: Directory listing threads
+            hash_workers: Hashing threads (defaults to engine.workers)
+            queue_size: Capacity of each queue between stages
+            progress_callback: Called as progress_callback(percent, message)
+        """
+        if not self.supports(engine):
+            raise ValueError("Engine options need PigeonholeEngine.find_duplicates, "
+                             "not the scan pipeline")
+        self.engine = engine
+        self.directories = list(directories)
+        self.extensions = {ext.lower() for ext in extensions} if extensions else None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.include_zero_byte = include_zero_byte
+        self.skip_dir = skip_dir
+        self.walk_workers = walk_workers if walk_workers > 0 else 1
+        self.hash_workers = hash_workers or engine.workers
+        self.queue_size = queue_size
+        self.progress_callback = progress_callback
+
+        self.file_table = FileTable()
+        self.hardlink_groups: Dict[str, List[str]] = {}
+        self.stats = {
+            'directories': 0,
+            'files': 0,
+            'screen_hashes': 0,
+            'full_hashes': 0,
+            'hashed_during_walk': 0,
+            'groups': 0
+        }
+        self._stop = threading.Event()
+
+    @staticmethod
+    def supports(engine: PigeonholeEngine) -> bool:
+        """
+        Whether the pipeline honours every option of an engine
+
+        Direct compare needs whole settled groups, and the process executor,
+        autotuner and device scheduler drive the engine's own read loop.
+        """
+        return (engine.compare_strategy == 'hash' and engine.executor == 'thread'
+                and not engine.autotune and engine.device_scheduler is None)
+
+    def run(self) -> Dict[str, List[str]]:
+        """
+        Run the whole pipeline
+
+        Returns:
+            Dictionary of original -> duplicates
+        """
+        return dict(self.stream())
+
+    def stream(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Run the pipeline in a background event loop, yielding groups as they are emitted
+
+        Stopping iteration early, or calling stop(), cancels the remaining work.
+        """
+        results = queue.Queue()
+        thread = threading.Thread(target=self._run_loop, args=(results,), daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._stop.set()
+            thread.join()
+
+    def stop(self):
+        """Cancel the pipeline from any thread"""
+        self._stop.set()
+
+    def _run_loop(self, results: queue.Queue):
+        """Thread body: run the stages on a private event loop"""
+        try:
+            asyncio.run(self._run(results.put))
+        except asyncio.CancelledError:
+            logger.info("Scan pipeline cancelled")
+        except Exception as e:
+            logger.error(f"Scan pipeline failed: {e}")
+            results.put(e)
+        finally:
+            results.put(_DONE)
+
+    async def _run(self, emit: Callable):
+        """Wire the stages together and wait for them to drain"""
+        self._emit = emit
+        self._walk_done = False
+        # size -> file id (one file) or list of file ids
+        self._buckets: Dict[int, object] = {}
+        self._identities: Dict[int, Dict[Tuple[int, int], int]] = {}
+        # (size, digests of the stages so far) -> file ids, and file id -> those digests
+        self._screen_classes: Dict[Tuple[int, Tuple[str, ...]], List[int]] = {}
+        self._screen: Dict[int, Tuple[str, ...]] = {}
+        self._full: Dict[int, str] = {}
+        self._pending: Dict[int, int] = {}
+        self._queued = 0
+        self._hashed = 0
+        self._candidates = 0
+        self._hashed_base = 0
+
+        # Settled hashes count as files, hasher reads as bytes
+        self.progress = ProgressReporter([self._report_progress], interval=self.PROGRESS_INTERVAL)
+        self.progress.set_stage("Walking", end_percent=50.0)
+        hashers = {self.engine.hasher, self.engine.prefilter_hasher}
+        for hasher in hashers:
+            hasher.progress = self.progress
+
+        reads_before = self.engine._io_snapshot()
+        self._walk_pool = ThreadPoolExecutor(max_workers=self.walk_workers)
+        self._hash_pool = ThreadPoolExecutor(max_workers=self.hash_workers)
+        self._futures = set()
+        entries = asyncio.Queue(self.queue_size)
+        # One queue per screening stage, so a stage only ever feeds later ones
+        screen_queues = [asyncio.Queue(self.queue_size) for _ in self.engine.stages]
+        full_queue = asyncio.Queue(self.queue_size)
+
+        tasks = [asyncio.create_task(self._monitor(asyncio.current_task()))]
+        for _ in range(self.hash_workers):
+            for index in range(len(screen_queues)):
+                tasks.append(asyncio.create_task(
+                    self._screen_worker(index, screen_queues, full_queue)))
+            tasks.append(asyncio.create_task(self._full_worker(full_queue)))
+
+        try:
+            walker = asyncio.create_task(self._walk(entries))
+            tasks.append(walker)
+            await self._bucket_stage(entries, screen_queues[0] if screen_queues else full_queue)
+            await walker
+
+            self._walk_done = True
+            self._hashed_base = self._hashed
+            self.progress.set_stage("Hashing", files_total=self._queued - self._hashed,
+                                    start_percent=50.0)
+            logger.info(f"Walk finished: {self.stats['files']} files, "
+                        f"{self.stats['hashed_during_walk']} hashed during the walk")
+            for size in list(self._buckets):
+                if not self._pending.get(size):
+                    self._emit_bucket(size)
+
+            for screen_queue in screen_queues:
+                await screen_queue.join()
+            await full_queue.join()
+            for size in list(self._buckets):
+                self._emit_bucket(size)
+        finally:
+            for hasher in hashers:
+                hasher.progress = None
+            for task in tasks:
+                task.cancel()
+            # Drop queued listings and reads of a stopped run (shutdown's
+            # cancel_futures needs Python 3.9)
+            for future in list(self._futures):
+                future.cancel()
+            self._walk_pool.shutdown(wait=False)
+            self._hash_pool.shutdown(wait=False)
+            self._record_stats(reads_before)
+
+        if self.progress_callback:
+            self.progress_callback(100.0, f"Found {self.stats['groups']} duplicate groups")
+
+    async def _walk(self, entries: asyncio.Queue):
+        """Stage 1: list directories in threads and feed their files downstream"""
+        pending = set()
+        for root in normalize_roots(self.directories):
+            pending.add(self._submit(self._walk_pool, self._list, root))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                self.stats['directories'] += 1
+                for subdirectory in subdirectories:
+                    pending.add(self._submit(self._walk_pool, self._list, subdirectory))
+                for entry in files:
+                    await entries.put(entry)
+        await entries.put(None)
+
+    def _submit(self, pool: ThreadPoolExecutor, func: Callable, *args) -> asyncio.Future:
+        """Run func(*args) in a pool, keeping the future so a stopped run can cancel it"""
+        future = pool.submit(func, *args)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return asyncio.wrap_future(future)
+
+    def _list(self, directory: str):
+        """Runs in a listing thread"""
+        return list_directory(directory, self.extensions, self.min_size, self.max_size,
+                              self.include_zero_byte, self.skip_dir, self._log_error)
+
+    def _log_error(self, path: str, error: OSError):
+        logger.warning(f"Could not access {path}: {error}")
+
+    async def _bucket_stage(self, entries: asyncio.Queue, first_queue: asyncio.Queue):
+        """Stage 2: record files, collapse hardlinks and start hashing shared sizes"""
+        while True:
+            entry = await entries.get()
+            if entry is None:
+                return
+
+            file_id = self.file_table.add_entry(entry)
+            self.stats['files'] += 1
+            size = entry.size
+
+            members = self._buckets.get(size)
+            if members is None:
+                # Most sizes are unique; keep them as a bare id
+                self._buckets[size] = file_id
+                continue
+            if isinstance(members, int):
+                members = self._buckets[size] = [members]
+
+            if entry.device and entry.inode:
+                identities = self._identities.get(size)
+                if identities is None:
+                    identities = self._identities[size] = {}
+                    for member in members:
+                        identity = self.file_table.identity(member)
+                        if identity[0] and identity[1]:
+                            identities[identity] = member
+                first = identities.get((entry.device, entry.inode))
+                if first is not None:
+                    first_path = self.file_table.path_of(first)
+                    self.hardlink_groups.setdefault(first_path, []).append(entry.path)
+                    continue
+                identities[(entry.device, entry.inode)] = file_id
+
+            members.append(file_id)
+            self._candidates += 2 if len(members) == 2 else 1
+            if size == 0:
+                continue
+            # A second member means both need screening, whatever comes later
+            if len(members) == 2:
+                await self._enqueue(first_queue, size, members[0])
+            await self._enqueue(first_queue, size, file_id)
+
+    async def _screen_worker(self, index: int, screen_queues: List[asyncio.Queue],
+                             full_queue: asyncio.Queue):
+        """Stage 3: hash one screening block and pass files that still match on"""
+        stage = self.engine.stages[index]
+        screen_queue = screen_queues[index]
+        next_queue = screen_queues[index + 1] if index + 1 < len(screen_queues) else full_queue
+        while True:
+            size, file_id = await screen_queue.get()
+            try:
+                path = self.file_table.path_of(file_id)
+                digest = await self._submit(self._hash_pool, self._hash_block, path, stage)
+                self._count_hash('screen_hashes')
+                if digest is None:
+                    continue
+
+                key = self._screen.get(file_id, ()) + (digest,)
+                self._screen[file_id] = key
+                members = self._screen_classes.setdefault((size, key), [])
+                members.append(file_id)
+                # Blocks spanning the whole file already are the full comparison
+                if self._is_covered(size, len(key)):
+                    continue
+                if len(members) == 2:
+                    await self._enqueue(next_queue, size, members[0])
+                if len(members) >= 2:
+                    await self._enqueue(next_queue, size, file_id)
+            finally:
+                screen_queue.task_done()
+                self._settle(size)
+
+    async def _full_worker(self, full_queue: asyncio.Queue):
+        """Stage 4: confirm files that match on every screening block with a full hash"""
+        while True:
+            size, file_id = await full_queue.get()
+            try:
+                path = self.file_table.path_of(file_id)
+                digest = await self._submit(self._hash_pool, self._hash_full, path)
+                self._count_hash('full_hashes')
+                if digest is not None:
+                    self._full[file_id] = digest
+            finally:
+                full_queue.task_done()
+                self._settle(size)
+
+    async def _enqueue(self, target: asyncio.Queue, size: int, file_id: int):
+        """Queue hashing work and hold the size bucket open until it is done"""
+        self._pending[size] = self._pending.get(size, 0) + 1
+        self._queued += 1
+        await target.put((size, file_id))
+
+    def _settle(self, size: int):
+        """One piece of work for a size finished; emit the bucket if it was the last"""
+        self._hashed += 1
+        self.progress.add(files=1)
+        remaining = self._pending[size] - 1
+        if remaining:
+            self._pending[size] = remaining
+            return
+        del self._pending[size]
+        if self._walk_done and size in self._buckets:
+            self._emit_bucket(size)
+
+    def _count_hash(self, counter: str):
+        self.stats[counter] += 1
+        if not self._walk_done:
+            self.stats['hashed_during_walk'] += 1
+
+    def _emit_bucket(self, size: int):
+        """Stage 5: split a settled bucket by digest and emit its groups"""
+        members = self._buckets.pop(size)
+        self._identities.pop(size, None)
+        if isinstance(members, int):
+            return
+
+        if size == 0:
+            classes = {'': members}
+        else:
+            classes = {}
+            for file_id in members:
+                key = self._screen.pop(file_id, ())
+                digest = self._full.pop(file_id, None)
+                if digest is None and key and self._is_covered(size, len(key)):
+                    digest = key
+                if digest is not None:
+                    classes.setdefault(digest, []).append(file_id)
+
+        for file_ids in classes.values():
+            if len(file_ids) > 1:
+                paths = [self.file_table.path_of(file_id) for file_id in file_ids]
+                self.stats['groups'] += 1
+                self._emit(self.engine._make_group(paths))
+
+        for key in [key for key in self._screen_classes if key[0] == size]:
+            del self._screen_classes[key]
+
+    def _is_covered(self, size: int, stages_done: int) -> bool:
+        """Whether the first stages_done screening blocks span every byte of a file"""
+        return self.engine._is_fully_covered(size, self.engine.stages[:stages_done])
+
+    def _hash_block(self, path: str, stage: str) -> Optional[str]:
+        """Runs in a hashing thread; a failure skips the file instead of ending the worker"""
+        return self.engine._safe_hash(
+            lambda file_path: self.engine.prefilter_hasher.calculate_block_hash(
+                file_path, stage, self.engine.block_size, self.engine.sample_blocks),
+            path)
+
+    def _hash_full(self, path: str) -> Optional[str]:
+        """Runs in a hashing thread; a failure skips the file instead of ending the worker"""
+        return self.engine._safe_hash(self.engine.hasher.calculate_hash, path)
+
+    async def _monitor(self, main_task: asyncio.Task):
+        """Report progress and turn stop() into task cancellation"""
+        while True:
+            await asyncio.sleep(0.05)
+            if self._stop.is_set():
+                main_task.cancel()
+                return
+
+            if self.progress_callback:
+                # Hashing work keeps being queued while earlier work finishes
+                self.progress.set_totals(files_total=self._queued - self._hashed_base)
+                self.progress.poll()
+
+    def _report_progress(self, snapshot: ProgressSnapshot):
+        """Progress sink: the walk maps to 0-50%, hashing after it to 50-100%"""
+        if not self.progress_callback:
+            return
+        if self._walk_done:
+            message = snapshot.message()
+        else:
+            message = (f"Walking: {self.stats['files']} files in {self.stats['directories']} "
+                       f"directories, {snapshot.files_done}/{snapshot.files_total} hashed")
+        self.progress_callback(snapshot.percent, message)
+
+    def _record_stats(self, reads_before: Dict[str, int]):
+        """Fold this run into the engine's statistics"""
+        reads_after = self.engine._io_snapshot()
+        full_reads = reads_after['full_reads'] - reads_before['full_reads']
+        hardlinks = 0
+        for links in self.hardlink_groups.values():
+            hardlinks += len(links)
+
+        stats = self.engine.stats
+        stats['files_processed'] += self._candidates
+        stats['partial_hashes'] += self.stats['screen_hashes']
+        stats['full_hashes'] += full_reads
+        stats['comparisons_made'] += self.stats['screen_hashes'] + full_reads
+        stats['hash_computations_saved'] += self._candidates - full_reads
+        stats['bytes_read'] += reads_after['bytes_read'] - reads_before['bytes_read']
+        stats['hardlinks_collapsed'] += hardlinks
+        self.engine.hardlink_groups = self.hardlink_groups
+        if self.engine.hash_cache is not None:
+            self.engine.hash_cache.flush()
@@ -0,0 +1,166 @@
+"""
+Process Pool Backend for CPU-bound Hashing
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+from .hashing import FileHasher
+
+logger = logging.getLogger(__name__)
+
+# Read size for whole-file hashing inside a worker
+READ_SIZE = 1024 * 1024
+
+# (path, ranges): ranges is a list of (offset, length), or None for the whole file
+HashTask = Tuple[str, Optional[Sequence[Tuple[int, int]]]]
+# (digest bytes or None, bytes read, error message or None)
+HashResult = Tuple[Optional[bytes], int, Optional[str]]
+
+
+def _hash_task(hash_factory, path: str, ranges, buffer: memoryview) -> HashResult:
+    """Hash one file, or selected byte ranges of it"""
+    hash_func = hash_factory()
+    bytes_read = 0
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            if ranges is None:
+                while True:
+                    count = f.readinto(buffer)
+                    if not count:
+                        break
+                    hash_func.update(buffer[:count])
+                    bytes_read += count
+            else:
+                for offset, length in ranges:
+                    f.seek(offset)
+                    block = f.read(length)
+                    hash_func.update(block)
+                    bytes_read += len(block)
+    except OSError as e:
+        return None, bytes_read, str(e)
+    return hash_func.digest(), bytes_read, None
+
+
+def hash_chunk(algorithm: str, tasks: List[HashTask]) -> List[HashResult]:
+    """
+    Worker entry point: hash a chunk of files in one round trip
+
+    Only paths and byte ranges come in and only raw digests go out, so the
+    IPC cost per file is a few dozen bytes.
+    """
+    hash_factory = FileHasher.HASH_ALGORITHMS[algorithm]
+    buffer = memoryview(bytearray(READ_SIZE))
+    results = []
+    for path, ranges in tasks:
+        results.append(_hash_task(hash_factory, path, ranges, buffer))
+    return results
+
+
+class ProcessHashPool:
+    """
+    Pool of hashing processes for strong digests on fast storage
+
+    Threads stop scaling once hashing is CPU-bound, because sha256 and
+    friends only release the GIL per update call. Here every worker is a
+    separate process. Tasks are sent in chunks of chunk_files files to
+    amortize the IPC round trip, with a bounded number of chunks in flight.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_files: int = 32,
+                 max_chunks_in_flight: Optional[int] = None):
+        """
+        Args:
+            workers: Number of processes (defaults to the CPU count)
+            chunk_files: Files sent to a worker per task
+            max_chunks_in_flight: Chunks submitted ahead of the consumer
+                (defaults to twice the worker count)
+        """
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.chunk_files = chunk_files
+        self.max_chunks_in_flight = max_chunks_in_flight or self.workers * 2
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Submitted chunks not yet collected, cancelled by close()
+        self._pending = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use"""
+        if self._executor is None:
+            # Forking a process that runs GUI and watchdog threads is unsafe
+            methods = multiprocessing.get_all_start_methods()
+            method = 'forkserver' if 'forkserver' in methods else 'spawn'
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(method))
+            logger.info(f"Started {self.workers} hashing processes ({method})")
+        return self._executor
+
+    def imap(self, algorithm: str,
+             items: Iterable[Tuple[Any, Optional[HashTask]]]) -> Iterator[Tuple[Any, Optional[HashResult]]]:
+        """
+        Hash tasks in the worker processes, yielding results in input order
+
+        Args:
+            algorithm: Name from FileHasher.HASH_ALGORITHMS
+            items: (key, task) pairs; a task of None is passed through with
+                a None result, so callers can mix in already-known answers
+
+        Yields:
+            (key, result) for every item
+        """
+        in_flight = deque()
+        chunk = []
+        chunk_tasks = 0
+
+        for key, task in items:
+            chunk.append((key, task))
+            if task is not None:
+                chunk_tasks += 1
+            # Known answers also close a chunk, so they are not held back for long
+            if chunk_tasks >= self.chunk_files or len(chunk) >= self.chunk_files * 4:
+                in_flight.append(self._submit(algorithm, chunk))
+                chunk, chunk_tasks = [], 0
+                if len(in_flight) >= self.max_chunks_in_flight:
+                    yield from self._collect(in_flight.popleft())
+
+        if chunk:
+            in_flight.append(self._submit(algorithm, chunk))
+        while in_flight:
+            yield from self._collect(in_flight.popleft())
+
+    def _submit(self, algorithm: str, chunk: List[Tuple[Any, Optional[HashTask]]]):
+        """Send the real tasks of one chunk to a worker"""
+        tasks = [task for _, task in chunk if task is not None]
+        future = self._get_executor().submit(hash_chunk, algorithm, tasks) if tasks else None
+        if future is not None:
+            self._pending.add(future)
+        return chunk, future
+
+    def _collect(self, submitted) -> Iterator[Tuple[Any, Optional[HashResult]]]:
+        """Merge a chunk's results back with its pass-through items"""
+        chunk, future = submitted
+        results = iter(())
+        if future is not None:
+            results = iter(future.result())
+            self._pending.discard(future)
+        for key, task in chunk:
+            yield key, (next(results) if task is not None else None)
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            # Chunks of an abandoned imap are dropped rather than hashed
+            # (shutdown's cancel_futures needs Python 3.9)
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> 'ProcessHashPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
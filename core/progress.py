@@ -0,0 +1,241 @@
+"""
+Throttled Progress Reporting Shared by Scanning, Hashing and Batch Jobs
+"""
+
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressSnapshot(NamedTuple):
+    """Progress of the current stage at one point in time"""
+    stage: str
+    percent: float
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    elapsed: float
+    files_per_second: float
+    bytes_per_second: float
+    eta: Optional[float]
+
+    def message(self) -> str:
+        """One-line description, e.g. 'Hashing 120/500 files, 35.2 MB/s, ETA 0:12'"""
+        if self.files_total:
+            text = f"{self.stage} {self.files_done}/{self.files_total} files"
+        else:
+            text = f"{self.stage} {self.files_done} files"
+        if self.bytes_per_second > 0:
+            text += f", {self.bytes_per_second / (1024 * 1024):.1f} MB/s"
+        elif self.files_per_second > 0:
+            text += f", {self.files_per_second:.0f} files/s"
+        if self.eta is not None:
+            minutes, seconds = divmod(int(self.eta + 0.5), 60)
+            text += f", ETA {minutes}:{seconds:02d}"
+        return text
+
+
+def percent_callback(callback: Callable[[float, str], None]) -> Callable[[ProgressSnapshot], None]:
+    """Adapt a progress_callback(percent, message) to a snapshot sink"""
+    def sink(snapshot: ProgressSnapshot):
+        callback(snapshot.percent, snapshot.message())
+    return sink
+
+
+class ProgressReporter:
+    """
+    Aggregates progress counters and emits snapshots at a fixed rate
+
+    Producers call add() from any thread. Each thread bumps its own
+    counter slot, so the hot path takes no lock. The slots are summed
+    only when a snapshot is taken. Snapshots go to every sink at most
+    once per interval: from poll(), called by a thread that loops anyway,
+    or from a background emitter started with start(). Throughput is a
+    moving average between snapshots. The ETA uses bytes when a byte
+    total is known, and files otherwise.
+
+    A stage maps its own 0-100% onto [start_percent, end_percent] of the
+    whole run. Counters restart at every stage.
+    """
+
+    # Seconds between two snapshots (10 Hz)
+    INTERVAL = 0.1
+    # Weight of the newest sample in the throughput average
+    SMOOTHING = 0.3
+
+    def __init__(self, sinks: Optional[List[Callable[[ProgressSnapshot], None]]] = None,
+                 interval: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            sinks: Callables receiving each ProgressSnapshot
+            interval: Seconds between snapshots (defaults to INTERVAL)
+            clock: Time source, replaceable for tests
+        """
+        self.sinks = list(sinks or [])
+        self.interval = self.INTERVAL if interval is None else interval
+        self._clock = clock
+
+        self._local = threading.local()
+        self._counters: List[List[int]] = []
+        self._register_lock = threading.Lock()
+        self._emit_lock = threading.Lock()
+
+        self.stage = ''
+        self.files_total = 0
+        self.bytes_total = 0
+        self.start_percent = 0.0
+        self.end_percent = 100.0
+        self._base_files = 0
+        self._base_bytes = 0
+        self._stage_start = clock()
+        self._last_emit: Optional[float] = None
+        self._last_sample: Optional[tuple] = None
+        self._files_rate = 0.0
+        self._bytes_rate = 0.0
+
+        self._emitter: Optional[threading.Thread] = None
+        self._emitter_stop = threading.Event()
+
+    def add_sink(self, sink: Callable[[ProgressSnapshot], None]):
+        """Send snapshots to another UI or CLI sink"""
+        self.sinks.append(sink)
+
+    def set_stage(self, stage: str, files_total: int = 0, bytes_total: int = 0,
+                  start_percent: float = 0.0, end_percent: float = 100.0):
+        """Start a new stage; counters and throughput restart from zero"""
+        files_done, bytes_done = self.totals()
+        self._base_files = files_done
+        self._base_bytes = bytes_done
+        self.stage = stage
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.start_percent = start_percent
+        self.end_percent = end_percent
+        self._stage_start = self._clock()
+        self._last_sample = None
+        self._files_rate = 0.0
+        self._bytes_rate = 0.0
+
+    def set_totals(self, files_total: Optional[int] = None, bytes_total: Optional[int] = None):
+        """Update the totals of the current stage as they become known"""
+        if files_total is not None:
+            self.files_total = files_total
+        if bytes_total is not None:
+            self.bytes_total = bytes_total
+
+    def add(self, files: int = 0, bytes_read: int = 0):
+        """Count finished work; safe to call from any thread without locking"""
+        counter = getattr(self._local, 'counter', None)
+        if counter is None:
+            counter = [0, 0]
+            with self._register_lock:
+                self._counters.append(counter)
+            self._local.counter = counter
+        counter[0] += files
+        counter[1] += bytes_read
+
+    def totals(self):
+        """(files, bytes) counted since the reporter was created"""
+        files = 0
+        bytes_read = 0
+        for counter in list(self._counters):
+            files += counter[0]
+            bytes_read += counter[1]
+        return files, bytes_read
+
+    def snapshot(self) -> ProgressSnapshot:
+        """Current progress of the stage"""
+        files, bytes_read = self.totals()
+        files_done = files - self._base_files
+        bytes_done = bytes_read - self._base_bytes
+        now = self._clock()
+        self._update_rates(now, files_done, bytes_done)
+
+        fraction = None
+        remaining = None
+        if self.bytes_total > 0:
+            fraction = bytes_done / self.bytes_total
+            if self._bytes_rate > 0:
+                remaining = (self.bytes_total - bytes_done) / self._bytes_rate
+        elif self.files_total > 0:
+            fraction = files_done / self.files_total
+            if self._files_rate > 0:
+                remaining = (self.files_total - files_done) / self._files_rate
+        if fraction is None:
+            fraction = 0.0
+        elif fraction > 1.0:
+            fraction = 1.0
+        if remaining is not None and remaining < 0:
+            remaining = 0.0
+
+        percent = self.start_percent + (self.end_percent - self.start_percent) * fraction
+        return ProgressSnapshot(self.stage, percent, files_done, self.files_total,
+                                bytes_done, self.bytes_total, now - self._stage_start,
+                                self._files_rate, self._bytes_rate, remaining)
+
+    def poll(self) -> bool:
+        """
+        Emit a snapshot if the interval has passed since the last one
+
+        Returns:
+            True if a snapshot was emitted
+        """
+        now = self._clock()
+        if self._last_emit is not None and now - self._last_emit < self.interval:
+            return False
+        self.flush()
+        return True
+
+    def flush(self):
+        """Emit a snapshot now (e.g. when a stage finishes)"""
+        with self._emit_lock:
+            self._last_emit = self._clock()
+            snapshot = self.snapshot()
+            for sink in self.sinks:
+                try:
+                    sink(snapshot)
+                except Exception as e:
+                    logger.error(f"Progress sink error: {e}")
+
+    def start(self):
+        """Emit from a background thread, for producers without a loop of their own"""
+        if self._emitter is not None:
+            return
+        self._emitter_stop.clear()
+        self._emitter = threading.Thread(target=self._emit_loop, daemon=True)
+        self._emitter.start()
+
+    def stop(self):
+        """Stop the background emitter and emit a final snapshot"""
+        if self._emitter is not None:
+            self._emitter_stop.set()
+            self._emitter.join()
+            self._emitter = None
+        self.flush()
+
+    def _emit_loop(self):
+        while not self._emitter_stop.wait(self.interval):
+            self.flush()
+
+    def _update_rates(self, now: float, files_done: int, bytes_done: int):
+        """Fold the work since the previous snapshot into the moving averages"""
+        if self._last_sample is None:
+            previous = (self._stage_start, 0, 0)
+        else:
+            previous = self._last_sample
+        elapsed = now - previous[0]
+        if elapsed <= 0:
+            return
+        files_rate = (files_done - previous[1]) / elapsed
+        bytes_rate = (bytes_done - previous[2]) / elapsed
+        if self._last_sample is None:
+            self._files_rate, self._bytes_rate = files_rate, bytes_rate
+        else:
+            self._files_rate += self.SMOOTHING * (files_rate - self._files_rate)
+            self._bytes_rate += self.SMOOTHING * (bytes_rate - self._bytes_rate)
+        self._last_sample = (now, files_done, bytes_done)
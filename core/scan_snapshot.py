@@ -0,0 +1,153 @@
+"""
+Persisted Scan Snapshots for Incremental Rescans
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ScanSnapshot:
+    """
+    Result of a previous scan, saved so the next scan can skip unchanged work
+
+    For every directory the snapshot records its mtime, its subdirectory
+    names and its matching files as compact lists of
+    [name, size, mtime, ctime, mtime_ns, device, inode]. It also keeps the
+    duplicate and hardlink groups found last time. File digests are not
+    duplicated here: they live in the HashCache under the same
+    (device, inode, size, mtime_ns) identity and are reused from there.
+
+    A directory's mtime only changes when entries are added, removed or
+    renamed inside it, so an incremental rescan does not notice files that
+    were rewritten in place. Run a full scan periodically to pick those up.
+    """
+
+    VERSION = 1
+
+    def __init__(self, roots: Optional[List[str]] = None, filters: Optional[Dict] = None):
+        self.roots = list(roots or [])
+        self.filters = dict(filters or {})
+        self.directories: Dict[str, Dict] = {}
+        self.duplicate_groups: Dict[str, List[str]] = {}
+        self.hardlink_groups: Dict[str, List[str]] = {}
+        self.created = time.time()
+
+    @staticmethod
+    def make_filters(extensions: Optional[Iterable[str]] = None, min_size: int = 0,
+                     max_size: int = 0) -> Dict:
+        """Canonical form of the scan filters a snapshot is valid for"""
+        normalized = []
+        if extensions:
+            normalized = sorted({ext.lower() for ext in extensions})
+        return {'extensions': normalized, 'min_size': min_size, 'max_size': max_size}
+
+    @staticmethod
+    def default_path(roots: List[str], filters: Dict) -> Path:
+        """Snapshot file for a set of roots and filters under ~/.pigeonfinder/snapshots"""
+        key = json.dumps([sorted(roots), filters], sort_keys=True)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return Path.home() / ".pigeonfinder" / "snapshots" / f"{digest}.json"
+
+    def matches(self, roots: List[str], filters: Dict) -> bool:
+        """Check whether this snapshot was taken with the same roots and filters"""
+        return sorted(self.roots) == sorted(roots) and self.filters == filters
+
+    def reset(self, roots: List[str], filters: Dict):
+        """Forget everything and start over for new roots or filters"""
+        self.__init__(roots, filters)
+
+    def file_count(self) -> int:
+        """Number of files recorded in the snapshot"""
+        count = 0
+        for record in self.directories.values():
+            count += len(record['files'])
+        return count
+
+    @classmethod
+    def load(cls, path) -> Optional['ScanSnapshot']:
+        """
+        Load a snapshot from disk
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            The snapshot, or None if it is missing, unreadable or from another version
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                logger.warning(f"Could not read scan snapshot {path}: {e}")
+            return None
+
+        if data.get('version') != cls.VERSION:
+            logger.info(f"Ignoring scan snapshot {path} from another version")
+            return None
+
+        snapshot = cls(data['roots'], data['filters'])
+        snapshot.directories = data['directories']
+        snapshot.duplicate_groups = data.get('duplicate_groups', {})
+        snapshot.hardlink_groups = data.get('hardlink_groups', {})
+        snapshot.created = data.get('created', 0.0)
+        return snapshot
+
+    def save(self, path):
+        """
+        Write the snapshot to disk atomically
+
+        Args:
+            path: Snapshot file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': self.VERSION,
+            'created': self.created,
+            'roots': self.roots,
+            'filters': self.filters,
+            'directories': self.directories,
+            'duplicate_groups': self.duplicate_groups,
+            'hardlink_groups': self.hardlink_groups
+        }
+
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+        logger.info(f"Saved scan snapshot with {self.file_count()} files to {path}")
+
+
+def changed_sizes(old_files: Optional[List[List]], new_files: List[List]) -> Set[int]:
+    """
+    Sizes touched by the difference between two listings of one directory
+
+    A file counts as changed when it was added or removed, or when its size,
+    mtime_ns or inode differ. Both the old and new size are returned, since
+    the file left one size bucket and joined another.
+    """
+    old_by_name = {}
+    for record in old_files or []:
+        old_by_name[record[0]] = record
+    new_by_name = {}
+    for record in new_files:
+        new_by_name[record[0]] = record
+
+    sizes = set()
+    for name, old in old_by_name.items():
+        new = new_by_name.get(name)
+        if new is None or (old[1], old[4], old[6]) != (new[1], new[4], new[6]):
+            sizes.add(old[1])
+    for name, new in new_by_name.items():
+        old = old_by_name.get(name)
+        if old is None or (old[1], old[4], old[6]) != (new[1], new[4], new[6]):
+            sizes.add(new[1])
+    return sizes
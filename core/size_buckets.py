@@ -0,0 +1,123 @@
+"""
+Vectorized Size Bucketing of Scanned Files
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# (size, start, end): one bucket, as a slice of the sorted file ids
+BucketRange = Tuple[int, int, int]
+
+
+def bucket_ranges(sizes: Sequence[int],
+                  min_size: int = 0,
+                  max_size: int = 0,
+                  include_zero_byte: bool = False,
+                  keep: Optional[Sequence[bool]] = None,
+                  vectorized: Optional[bool] = None) -> Tuple[Sequence[int], List[BucketRange]]:
+    """
+    Sort file ids by size and find the buckets shared by two or more files
+
+    With NumPy the size column is filtered with boolean masks, ordered with
+    a stable argsort and split where neighbouring sizes differ, so no Python
+    code runs per file. Without NumPy the same result is built with a
+    sort and one loop over the sorted ids.
+
+    Args:
+        sizes: Size of every file, indexed by file id (array('q') or list)
+        min_size: Minimum file size in bytes (0 for no limit)
+        max_size: Maximum file size in bytes (0 for no limit)
+        include_zero_byte: Whether empty files form a bucket
+        keep: Optional per-file flags; files flagged False are left out
+        vectorized: Force (True) or avoid (False) the NumPy path; None picks
+            NumPy when it is installed
+
+    Returns:
+        Tuple of (order, ranges). order holds the ids of every file in a
+        shared bucket, sorted by size; ranges lists (size, start, end) so
+        each bucket is order[start:end]. Ids within a bucket stay in
+        ascending order and buckets are in ascending size.
+    """
+    if vectorized is None:
+        vectorized = np is not None
+    if vectorized:
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        return _numpy_bucket_ranges(sizes, min_size, max_size, include_zero_byte, keep)
+    return _python_bucket_ranges(sizes, min_size, max_size, include_zero_byte, keep)
+
+
+def _numpy_bucket_ranges(sizes, min_size, max_size, include_zero_byte, keep):
+    """bucket_ranges on NumPy arrays"""
+    # Copied so the caller's array can keep growing after we return
+    size_column = np.array(sizes, dtype=np.int64, copy=True)
+
+    mask = np.ones(len(size_column), dtype=bool) if keep is None else np.array(keep, dtype=bool)
+    if not include_zero_byte:
+        mask &= size_column != 0
+    if min_size > 0:
+        mask &= size_column >= min_size
+    if max_size > 0:
+        mask &= size_column <= max_size
+
+    candidate_ids = np.flatnonzero(mask)
+    candidate_sizes = size_column[candidate_ids]
+    order = np.argsort(candidate_sizes, kind='stable')
+    sorted_ids = candidate_ids[order]
+    sorted_sizes = candidate_sizes[order]
+
+    # A run starts at 0 and wherever the size changes
+    boundaries = np.flatnonzero(sorted_sizes[1:] != sorted_sizes[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(sorted_sizes)]))
+    lengths = ends - starts
+    shared = lengths > 1
+
+    # Drop every singleton at once, then renumber the surviving runs
+    sorted_ids = sorted_ids[np.repeat(shared, lengths)]
+    bucket_ends = np.cumsum(lengths[shared])
+    bucket_starts = bucket_ends - lengths[shared]
+
+    ranges = list(zip(sorted_sizes[starts[shared]].tolist(),
+                      bucket_starts.tolist(), bucket_ends.tolist()))
+    return sorted_ids.tolist(), ranges
+
+
+def _python_bucket_ranges(sizes, min_size, max_size, include_zero_byte, keep):
+    """bucket_ranges without NumPy"""
+    candidate_ids = []
+    for file_id, size in enumerate(sizes):
+        if keep is not None and not keep[file_id]:
+            continue
+        if size == 0 and not include_zero_byte:
+            continue
+        if min_size > 0 and size < min_size:
+            continue
+        if max_size > 0 and size > max_size:
+            continue
+        candidate_ids.append(file_id)
+
+    # list.sort is stable, so ids stay ascending within a size
+    candidate_ids.sort(key=sizes.__getitem__)
+
+    order = []
+    ranges = []
+    start = 0
+    count = len(candidate_ids)
+    while start < count:
+        size = sizes[candidate_ids[start]]
+        end = start + 1
+        while end < count and sizes[candidate_ids[end]] == size:
+            end += 1
+        if end - start > 1:
+            ranges.append((size, len(order), len(order) + end - start))
+            order.extend(candidate_ids[start:end])
+        start = end
+    return order, ranges
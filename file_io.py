@@ -1,9 +1,14 @@
 import os
 import sys
+import errno
 import shutil
-from collections import defaultdict
+import secrets
+import itertools
 from datetime import datetime
 
+from core.file_walker import walk_files
+from core.file_table import FileTable
+
 # --- Configuration Constants (Needed for Traversal/Filtering) ---
 ZERO_BYTE_SIZE = 0
 
@@ -13,68 +18,32 @@ def scan_files(root_path, allowed_extensions, min_size, include_zero_byte, progr
     """
     Member 2's primary task: Recursively scans directory and groups files by size (Pigeonhole Level 1).
     Applies filtering based on CLI arguments.
+    Candidates are counted during the single walk, so progress totals are estimates.
+    Only sizes shared by two or more files are returned.
     """
-    files_by_size = defaultdict(list)
+    table = FileTable()
     
     print(f"[M2] Scanning {root_path} and Grouping by Size (Level 1 Pigeonhole)...")
 
-    # If caller provided a progress_callback, first compute total candidate files
-    total_candidates = None
-    if progress_callback is not None:
-        total = 0
-        for dirpath, _, filenames in os.walk(root_path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if not os.path.isfile(filepath):
-                    continue
-                try:
-                    file_size = os.path.getsize(filepath)
-                except OSError:
-                    continue
-                if file_size == ZERO_BYTE_SIZE and not include_zero_byte:
-                    continue
-                if file_size < min_size:
-                    continue
-                if allowed_extensions:
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext not in allowed_extensions:
-                        continue
-                total += 1
-        total_candidates = total
-
-    seen = 0
-    for dirpath, _, filenames in os.walk(root_path):
-        for filename in filenames:
-            filepath = os.path.join(dirpath, filename)
-
-            if not os.path.isfile(filepath):
-                continue
+    def report_progress(seen, total_candidates):
+        try:
+            progress_callback(seen, total_candidates)
+        except Exception:
+            # Don't let progress callback exceptions break scanning
+            pass
 
-            try:
-                file_size = os.path.getsize(filepath)
-
-                # Filtering logic
-                if file_size == ZERO_BYTE_SIZE and not include_zero_byte:
-                    continue
-                if file_size < min_size:
-                    continue
-                if allowed_extensions:
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext not in allowed_extensions:
-                        continue
-
-                files_by_size[file_size].append(filepath)
-                seen += 1
-                if progress_callback is not None and total_candidates is not None:
-                    try:
-                        progress_callback(seen, total_candidates)
-                    except Exception:
-                        # Don't let progress callback exceptions break scanning
-                        pass
+    def report_error(filepath, error):
+        print(f"[WARNING] Skipping file {filepath} due to OS error: {error}", file=sys.stderr)
 
-            except OSError as e:
-                print(f"[WARNING] Skipping file {filepath} due to OS error: {e}", file=sys.stderr)
+    for entry in walk_files(root_path, allowed_extensions, min_size,
+                            include_zero_byte=include_zero_byte,
+                            progress_callback=report_progress if progress_callback is not None else None,
+                            on_error=report_error):
+        table.add_entry(entry)
 
+    files_by_size = {}
+    for size, file_ids in table.size_groups(include_zero_byte).items():
+        files_by_size[size] = [table.path_of(file_id) for file_id in file_ids]
     return files_by_size
 
 # --- Action Execution (The Writing/Altering Component) ---
@@ -135,6 +104,103 @@ def select_original_file(duplicate_set, keep_mode):
             best = p
     return best
 
+# Errors after which a move falls back to reserve-and-copy: another filesystem,
+# or one without hard links (FAT/exFAT, some network shares)
+NO_LINK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+def _destination_names(move_path, filename):
+    """
+    Yields candidate destination paths in move_path, the plain name first.
+    """
+    name, ext = os.path.splitext(filename)
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    yield os.path.join(move_path, filename)
+    yield os.path.join(move_path, f"{name}_DUP_{timestamp}{ext}")
+    while True:
+        # Many files of one name: a random token avoids probing a counter
+        yield os.path.join(move_path, f"{name}_DUP_{timestamp}_{secrets.token_hex(4)}{ext}")
+
+def unique_destination(move_path, filename):
+    """
+    Reserve a destination path in move_path that no other file uses.
+    The name is claimed with an exclusive create, so concurrent moves of
+    files with the same name cannot overwrite each other. Used when the
+    file has to be copied to another filesystem.
+    """
+    for dest_path in _destination_names(move_path, filename):
+        try:
+            fd = os.open(dest_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+            return dest_path
+        except FileExistsError:
+            continue
+
+def rename_unique(target_path, move_path):
+    """
+    Moves a file into move_path on the same filesystem without copying it.
+    The name is claimed atomically: a hard link fails if the name is taken,
+    and where there are no hard links a Windows rename never replaces a file.
+    Returns the destination path; raises OSError (errno EXDEV across
+    filesystems) if the file could not be renamed.
+    """
+    names = _destination_names(move_path, os.path.basename(target_path))
+    for dest_path in names:
+        try:
+            os.link(target_path, dest_path)
+        except FileExistsError:
+            continue
+        except OSError as e:
+            if e.errno == errno.EXDEV or os.name != 'nt':
+                raise
+            # No hard links on this Windows volume; retry this name with rename
+            names = itertools.chain([dest_path], names)
+            break
+        try:
+            os.unlink(target_path)
+        except OSError:
+            os.remove(dest_path)
+            raise
+        return dest_path
+
+    for dest_path in names:
+        try:
+            os.rename(target_path, dest_path)
+            return dest_path
+        except FileExistsError:
+            continue
+
+def act_on_file(target_path, action, move_path=None):
+    """
+    Deletes or moves one file, without printing.
+    Returns the destination path for moves (None for deletes) and raises
+    OSError on failure. move_path must already exist.
+    """
+    if action == 'delete':
+        os.remove(target_path)
+        return None
+    if action == 'move':
+        # A link would move a symlink's target, so symlinks go through shutil.move
+        if not os.path.islink(target_path):
+            try:
+                return rename_unique(target_path, move_path)
+            except OSError as e:
+                if e.errno not in NO_LINK_ERRNOS:
+                    raise
+        
+        # Another filesystem: reserve the name, then copy and delete
+        dest_path = unique_destination(move_path, os.path.basename(target_path))
+        try:
+            shutil.move(target_path, dest_path)
+        except Exception:
+            # The source is still in place; drop the reserved name or partial copy
+            try:
+                os.remove(dest_path)
+            except OSError:
+                pass
+            raise
+        return dest_path
+    raise ValueError(f"Unknown action: {action}")
+
 def process_action(duplicate_set, original_path, action, move_path=None):
     """
     Performs deletion or moving on all files in the set EXCEPT the original.
@@ -146,25 +212,15 @@ def process_action(duplicate_set, original_path, action, move_path=None):
         return 0
 
     print(f"  [ACTION] Keeping: {os.path.basename(original_path)}")
+    if action == 'move':
+        os.makedirs(move_path, exist_ok=True)
 
     for target_path in files_to_act_on:
         try:
+            dest_path = act_on_file(target_path, action, move_path)
             if action == 'delete':
-                os.remove(target_path)
                 print(f"  [DELETED] {target_path}")
             elif action == 'move':
-                os.makedirs(move_path, exist_ok=True)
-                
-                filename = os.path.basename(target_path)
-                dest_path = os.path.join(move_path, filename)
-                
-                # Create a unique path if destination already exists
-                if os.path.exists(dest_path):
-                    name, ext = os.path.splitext(filename)
-                    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-                    dest_path = os.path.join(move_path, f"{name}_DUP_{timestamp}{ext}")
-
-                shutil.move(target_path, dest_path)
                 print(f"  [MOVED] {target_path} -> {dest_path}")
             
             processed_count += 1
@@ -173,4 +229,3 @@ def process_action(duplicate_set, original_path, action, move_path=None):
             print(f"  [ERROR] Failed to {action} {target_path}: {e}", file=sys.stderr)
             
     return processed_count
-
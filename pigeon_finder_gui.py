@@ -4,18 +4,30 @@ import sys
 import os
 import time
 import hashlib
+import csv
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from array import array
+from bisect import bisect_right
 from datetime import datetime
+from itertools import accumulate
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QGridLayout, QLabel, QLineEdit, QPushButton, QCheckBox,
-    QComboBox, QSpinBox, QProgressBar, QStackedWidget, QTableWidget,
-    QTableWidgetItem, QMessageBox, QFileDialog, QGroupBox, QHeaderView
+    QComboBox, QSpinBox, QProgressBar, QStackedWidget, QTableView,
+    QMessageBox, QFileDialog, QGroupBox, QHeaderView
+)
+from PyQt5.QtCore import (
+    Qt, QThread, pyqtSignal, QMutex, QObject, QAbstractTableModel,
+    QSortFilterProxyModel, QModelIndex, QTimer
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QMutex, QObject
 
 # Import shared backend logic
-from file_io import scan_files, process_action, select_original_file
-from core import PigeonholeEngine
+from file_io import act_on_file
+from core import PigeonholeEngine, FileScanner, HashCache
+from core.pipeline import ScanPipeline
+from utils.config import Config
 
 # --- 1. CORE LOGIC & CONFIGURATION ---
 HASH_CHUNK_SIZE = 65536
@@ -69,12 +81,14 @@ def get_file_metadata(path):
         return 0, 0
 
 
-def select_original_file(duplicate_set, keep_mode):
+def select_original_file(duplicate_set, keep_mode, get_mtime=None):
     # Explicit selection without built-in min/max
     if not duplicate_set:
         return None
 
     def _mtime(p):
+        if get_mtime is not None:
+            return get_mtime(p)
         try:
             return get_file_metadata(p)[1]
         except Exception:
@@ -134,32 +148,448 @@ class ScanWorker(QObject):
         self.min_size = min_size
         self.include_zero_byte = include_zero_byte
         self._is_running = True
+        self._pipeline = None
+        self.file_table = None
 
     def stop(self):
         self._is_running = False
+        if self._pipeline is not None:
+            self._pipeline.stop()
+
+    def _build_engine(self):
+        """An engine set up from the shared settings, with the on-disk hash cache"""
+        config = Config()
+        hash_cache = HashCache() if config.get('scanning.use_hash_cache', True) else None
+        return PigeonholeEngine(
+            config.get('scanning.default_algorithm', 'md5'),
+            hash_cache=hash_cache,
+            workers=config.get('scanning.hash_workers', 4),
+            stages=config.get('scanning.hash_stages', PigeonholeEngine.SCREENING_STAGES),
+            block_size=config.get('scanning.block_size', 65536),
+            sample_blocks=config.get('scanning.sample_blocks', 4),
+            prefilter_algorithm=config.get('scanning.prefilter_algorithm', 'auto'),
+            chunk_size=config.get('scanning.chunk_size', 8192),
+            io_strategy=config.get('scanning.io_strategy', 'auto'),
+            compare_strategy=config.get('scanning.compare_strategy', 'hash'),
+            direct_compare_max=config.get('scanning.direct_compare_max', 3),
+            executor=config.get('scanning.hash_executor', 'thread'),
+            autotune=config.get('scanning.autotune_io', False),
+            device_scheduling=config.get('scanning.device_scheduling', False),
+            rotational_workers=config.get('scanning.rotational_workers', 1)
+        )
 
     def run_scan(self):
         start_time = time.time()
         try:
-            # Provide a progress callback to the scanning function
-            def progress_cb(current, total):
-                # If stop requested, raise to interrupt
+            def progress_cb(percent, message):
+                self.progress_update.emit(int(percent), 100)
+
+            engine = self._build_engine()
+            if ScanPipeline.supports(engine):
+                # Hashing of shared sizes starts while the tree is still being walked
+                self._pipeline = ScanPipeline(engine, [self.root_path], self.allowed_extensions,
+                                              self.min_size, include_zero_byte=self.include_zero_byte,
+                                              progress_callback=progress_cb)
                 if not self._is_running:
                     raise Exception('Scan cancelled')
-                self.progress_update.emit(current, total)
-
-            files_by_size = scan_files(self.root_path, self.allowed_extensions, self.min_size, self.include_zero_byte, progress_callback=progress_cb)
-            if not files_by_size:
-                self.scan_complete.emit([], time.time() - start_time)
-                return
-            engine = PigeonholeEngine()
-            duplicate_dict = engine.find_duplicates(files_by_size)
+                duplicate_dict = self._pipeline.run()
+                self.file_table = self._pipeline.file_table
+            else:
+                duplicate_dict = self._scan_sequential(engine, progress_cb)
+            if not self._is_running:
+                raise Exception('Scan cancelled')
             duplicates = [[original] + dups for original, dups in duplicate_dict.items()]
             runtime = time.time() - start_time
             self.scan_complete.emit(duplicates, runtime)
         except Exception as e:
             self.error_occurred.emit(str(e))
 
+    def _scan_sequential(self, engine, progress_cb):
+        """Walk first, then run the engine; for options the pipeline cannot honour"""
+        min_size = self.min_size
+        if not self.include_zero_byte and min_size < 1:
+            min_size = 1
+        scanner = FileScanner()
+        scanner.scan_directories([self.root_path], self.allowed_extensions, min_size)
+        self.file_table = scanner.file_table
+        duplicate_dict = {}
+        for original_id, duplicate_ids in engine.iter_duplicates(
+                scanner.get_file_id_groups_by_size(), progress_callback=progress_cb,
+                file_info=self.file_table):
+            if not self._is_running:
+                break
+            duplicate_dict[self.file_table.path_of(original_id)] = [
+                self.file_table.path_of(file_id) for file_id in duplicate_ids]
+        return duplicate_dict
+
+
+class ActionWorker(QObject):
+    """
+    Deletes or moves duplicates off the GUI thread
+
+    Unlinks and same-filesystem renames only touch metadata, so up to
+    RENAME_WORKERS of them run at once. Moves to another filesystem copy
+    data and get COPY_WORKERS. Progress is reported at most every
+    PROGRESS_INTERVAL seconds. Every file's outcome is written to a CSV
+    log in ACTION_LOG_DIR.
+    """
+    progress_update = pyqtSignal(int, int)  # done, total
+    action_complete = pyqtSignal(int, int, int, str)  # succeeded, failed, skipped, log path
+    error_occurred = pyqtSignal(str)
+
+    ACTION_LOG_DIR = os.path.join(os.path.expanduser('~'), '.pigeonfinder', 'action_logs')
+    RENAME_WORKERS = 8
+    COPY_WORKERS = 2
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, duplicate_sets, originals, keep_mode, action, move_path=''):
+        """
+        originals holds the known original of each set, or None where it
+        still has to be picked with keep_mode.
+        """
+        super().__init__()
+        self.duplicate_sets = duplicate_sets
+        self.originals = originals
+        self.keep_mode = keep_mode
+        self.action = action
+        self.move_path = move_path
+        self.log_path = ''
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            targets = []
+            for set_index, duplicate_set in enumerate(self.duplicate_sets):
+                original = self.originals[set_index]
+                if original is None:
+                    original = select_original_file(duplicate_set, self.keep_mode)
+                for path in duplicate_set:
+                    if path != original:
+                        targets.append(path)
+
+            results = self._process(targets)
+            self.log_path = self._write_log(results)
+
+            succeeded = 0
+            for _, outcome, _ in results:
+                if outcome != 'failed':
+                    succeeded += 1
+            failed = len(results) - succeeded
+            self.action_complete.emit(succeeded, failed, len(targets) - len(results), self.log_path)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+    def _process(self, targets):
+        """Run the action over targets, returning (path, outcome, detail) per file attempted"""
+        dest_device = None
+        if self.action == 'move':
+            os.makedirs(self.move_path, exist_ok=True)
+            dest_device = os.stat(self.move_path).st_dev
+
+        total = len(targets)
+        results = []
+        directory_devices = {}
+        last_report = 0.0
+        rename_pool = ThreadPoolExecutor(max_workers=self.RENAME_WORKERS)
+        copy_pool = ThreadPoolExecutor(max_workers=self.COPY_WORKERS)
+        in_flight = set()
+        limit = (self.RENAME_WORKERS + self.COPY_WORKERS) * 4
+        try:
+            for path in targets:
+                if self._stop_event.is_set():
+                    break
+                pool = rename_pool
+                if dest_device is not None:
+                    directory = os.path.dirname(path)
+                    device = directory_devices.get(directory)
+                    if device is None:
+                        try:
+                            device = os.stat(directory).st_dev
+                        except OSError:
+                            device = -1
+                        directory_devices[directory] = device
+                    if device != dest_device:
+                        pool = copy_pool
+                in_flight.add(pool.submit(self._act, path))
+
+                if len(in_flight) >= limit:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results.append(future.result())
+                    now = time.monotonic()
+                    if now - last_report >= self.PROGRESS_INTERVAL:
+                        last_report = now
+                        self.progress_update.emit(len(results), total)
+
+            for future in in_flight:
+                results.append(future.result())
+        finally:
+            rename_pool.shutdown(wait=True)
+            copy_pool.shutdown(wait=True)
+        self.progress_update.emit(len(results), total)
+        return results
+
+    def _act(self, path):
+        try:
+            dest_path = act_on_file(path, self.action, self.move_path)
+        except Exception as e:
+            return path, 'failed', str(e)
+        if self.action == 'delete':
+            return path, 'deleted', ''
+        return path, 'moved', dest_path
+
+    def _write_log(self, results):
+        """Write one CSV row per attempted file; returns the log path ('' if it could not be written)"""
+        try:
+            os.makedirs(self.ACTION_LOG_DIR, exist_ok=True)
+            log_path = os.path.join(self.ACTION_LOG_DIR,
+                                    f"{self.action}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+            with open(log_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['path', 'result', 'detail'])
+                writer.writerows(results)
+            return log_path
+        except OSError:
+            return ''
+
+
+class MetadataCache(QObject):
+    """
+    Stats duplicate sets on a background thread for the results table
+
+    Sets are requested as the view asks for their rows, and are answered
+    in batches through metadata_ready. Sizes and mtimes come from the
+    scan's file table where possible, so most requests never stat.
+    """
+    metadata_ready = pyqtSignal(int, list)  # generation, set indexes
+    BATCH_SECONDS = 0.05
+    BATCH_SETS = 256
+
+    def __init__(self):
+        super().__init__()
+        self.file_info = None
+        self._metadata = {}
+        self._requested = set()
+        self._generation = 0
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def reset(self, file_info=None):
+        """Forget everything; answers to older requests are dropped"""
+        self._generation += 1
+        self._requested = set()
+        self._metadata = {}
+        self.file_info = file_info
+
+    def get(self, path):
+        """(size, mtime) of a file, or None if it has not been fetched yet"""
+        return self._metadata.get(path)
+
+    def request(self, set_index, paths):
+        """Fetch a set's metadata in the background (once per set)"""
+        if set_index in self._requested:
+            return
+        self._requested.add(set_index)
+        self._requests.put((self._generation, set_index, paths, self.file_info, self._metadata))
+
+    def _run(self):
+        while True:
+            generation, set_index, paths, file_info, metadata = self._requests.get()
+            ready = []
+            deadline = time.monotonic() + self.BATCH_SECONDS
+            while True:
+                for path in paths:
+                    metadata[path] = self._stat(path, file_info)
+                ready.append(set_index)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or len(ready) >= self.BATCH_SETS:
+                    break
+                try:
+                    next_request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if next_request[0] != generation:
+                    self._requests.put(next_request)
+                    break
+                _, set_index, paths, file_info, metadata = next_request
+            self.metadata_ready.emit(generation, ready)
+
+    def _stat(self, path, file_info):
+        if file_info is not None:
+            info = file_info.get(path)
+            if info is not None:
+                return info['size'], info['modified']
+        return get_file_metadata(path)
+
+
+class DuplicateTableModel(QAbstractTableModel):
+    """
+    Lazy table model over duplicate sets, one row per file
+
+    Rows are a flat path list plus the first row of every set, so loading
+    a result costs no stat calls and no per-cell objects. Size, date and
+    the keep/act decision fill in as MetadataCache answers for the rows
+    the view actually shows. Qt.UserRole returns raw sort keys for
+    QSortFilterProxyModel.
+    """
+    HEADERS = ["Action", "File Name", "Size", "Path", "Date Modified"]
+    PENDING = "…"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cache = MetadataCache()
+        self.cache.metadata_ready.connect(self._on_metadata_ready)
+        self.highlight = None
+        self.keep_mode = 'newest'
+        self.action = "Do Nothing (Report Only)"
+        self._sets = []
+        self._paths = []
+        self._set_starts = array('q')
+        self._originals = []
+
+    def set_results(self, duplicate_sets, keep_mode, action, file_info=None):
+        """Replace the displayed sets; file_info is the scan's path -> info mapping"""
+        self.beginResetModel()
+        self.cache.reset(file_info)
+        self.keep_mode = keep_mode
+        self.action = action
+        self._sets = duplicate_sets
+        self._paths = []
+        for duplicate_set in duplicate_sets:
+            self._paths.extend(duplicate_set)
+        starts = list(accumulate([len(duplicate_set) for duplicate_set in duplicate_sets], initial=0))
+        starts.pop()
+        self._set_starts = array('q', starts)
+        self._originals = [None] * len(duplicate_sets)
+        self.endResetModel()
+
+    def set_keep_mode(self, keep_mode):
+        """Pick originals again with another keep mode"""
+        self.keep_mode = keep_mode
+        self._originals = [None] * len(self._sets)
+        self._refresh_column(0)
+
+    def set_action(self, action):
+        self.action = action
+        self._refresh_column(0)
+
+    def marked_count(self):
+        """Files that Execute Actions would delete or move (all but one per set)"""
+        if self.action not in ("Delete Duplicates", "Move Duplicates"):
+            return 0
+        return len(self._paths) - len(self._sets)
+
+    def cached_original(self, set_index):
+        """The set's original if it has been picked already, else None"""
+        return self._originals[set_index]
+
+    def original_of(self, set_index):
+        """The set's original, or None while its metadata is still being fetched"""
+        original = self._originals[set_index]
+        if original is not None:
+            return original
+
+        duplicate_set = self._sets[set_index]
+        if self.keep_mode != 'path_length':
+            for path in duplicate_set:
+                if self.cache.get(path) is None:
+                    self.cache.request(set_index, duplicate_set)
+                    return None
+        original = select_original_file(duplicate_set, self.keep_mode,
+                                        get_mtime=lambda path: self.cache.get(path)[1])
+        self._originals[set_index] = original
+        return original
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        path = self._paths[row]
+        set_index = bisect_right(self._set_starts, row) - 1
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return self._action_text(set_index, path)
+            if column == 1:
+                return os.path.basename(path)
+            if column == 3:
+                return path
+            metadata = self._metadata(set_index, path)
+            if metadata is None:
+                return self.PENDING
+            if column == 2:
+                return f"{metadata[0] / 1024:.2f} KB"
+            return datetime.fromtimestamp(metadata[1]).strftime('%Y-%m-%d %H:%M:%S')
+
+        if role == Qt.UserRole:
+            if column in (2, 4):
+                metadata = self._metadata(set_index, path)
+                if metadata is None:
+                    return -1
+                return metadata[0] if column == 2 else metadata[1]
+            return self.data(index, Qt.DisplayRole)
+
+        if role == Qt.BackgroundRole and self.highlight is not None:
+            if self.original_of(set_index) == path:
+                return self.highlight
+        if role == Qt.ToolTipRole and column == 3:
+            return path
+        return None
+
+    def _metadata(self, set_index, path):
+        metadata = self.cache.get(path)
+        if metadata is None:
+            self.cache.request(set_index, self._sets[set_index])
+        return metadata
+
+    def _action_text(self, set_index, path):
+        original = self.original_of(set_index)
+        if original is None:
+            return self.PENDING
+        if path == original:
+            return "KEEP (Original)"
+        if self.action == "Delete Duplicates":
+            return "Delete"
+        if self.action == "Move Duplicates":
+            return "Move"
+        return "KEEP (Duplicate)"
+
+    def _refresh_column(self, column):
+        if self._paths:
+            self.dataChanged.emit(self.index(0, column), self.index(len(self._paths) - 1, column))
+
+    def _on_metadata_ready(self, generation, set_indexes):
+        """Repaint the rows of sets whose metadata arrived"""
+        if generation != self.cache.generation:
+            return
+        last_column = len(self.HEADERS) - 1
+        for set_index in set_indexes:
+            start = self._set_starts[set_index]
+            end = start + len(self._sets[set_index]) - 1
+            self.dataChanged.emit(self.index(start, 0), self.index(end, last_column))
+
 
 class PigeonFinderApp(QMainWindow):
     def __init__(self):
@@ -174,7 +604,7 @@ class PigeonFinderApp(QMainWindow):
             QPushButton:hover { background-color: #16a085; }
             QLineEdit, QSpinBox, QComboBox { background-color: white; color: #2c3e50; border: 1px solid #bdc3c7; padding: 5px; border-radius: 3px; }
             QGroupBox { border: 2px solid #bdc3c7; margin-top: 10px; padding: 10px; border-radius: 5px; }
-            QTableWidget { background-color: white; color: #2c3e50; border: 1px solid #bdc3c7; selection-background-color: #3498db; gridline-color: #d1d5da; }
+            QTableView { background-color: white; color: #2c3e50; border: 1px solid #bdc3c7; selection-background-color: #3498db; gridline-color: #d1d5da; }
             QHeaderView::section { background-color: #ecf0f1; padding: 4px; border: 1px solid #bdc3c7; color: #2c3e50; }
             QProgressBar::chunk { background-color: #3498db; }
         """
@@ -301,13 +731,37 @@ class PigeonFinderApp(QMainWindow):
 
         self.results_page = QWidget()
         self.results_layout = QVBoxLayout(self.results_page)
-        self.results_table = QTableWidget()
-        self.results_table.setColumnCount(5)
-        self.results_table.setHorizontalHeaderLabels(["Action", "File Name", "Size", "Path", "Date Modified"])
-        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.results_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
-        self.results_table.cellChanged.connect(self._handle_manual_selection)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter by path...")
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self._apply_filter)
+        self.filter_input.textChanged.connect(self.filter_timer.start)
+        self.results_layout.addWidget(self.filter_input)
+
+        # Model/view: rows are produced on demand, metadata is fetched in the background
+        self.results_model = DuplicateTableModel(self)
+        self.results_model.highlight = self.palette().color(self.palette().Highlight)
+        self.results_proxy = QSortFilterProxyModel(self)
+        self.results_proxy.setSourceModel(self.results_model)
+        self.results_proxy.setSortRole(Qt.UserRole)
+        self.results_proxy.setFilterKeyColumn(3)
+        self.results_proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_proxy)
+        self.results_table.setWordWrap(False)
+        self.results_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.results_table.verticalHeader().setDefaultSectionSize(24)
+        header = self.results_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setSectionResizeMode(3, QHeaderView.Stretch)
+        # No sort until a header is clicked, so results open in scan order
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.results_table.setSortingEnabled(True)
         self.results_layout.addWidget(self.results_table)
+        self.action_combo.currentTextChanged.connect(self._results_action_changed)
+        self.keep_mode_combo.currentTextChanged.connect(self._results_keep_mode_changed)
 
         result_action_bar = QHBoxLayout()
         self.summary_label = QLabel("Summary: 0 Sets, 0 Duplicates.")
@@ -351,14 +805,23 @@ class PigeonFinderApp(QMainWindow):
         self.move_path_widget.setVisible(text == "Move Duplicates")
 
     def _update_execute_button(self):
-        count = 0
-        for i in range(self.results_table.rowCount()):
-            item = self.results_table.item(i, 0)
-            if item and item.text() in ["Delete", "Move"]:
-                count += 1
+        count = self.results_model.marked_count()
         self.execute_button.setText(f"Execute Actions ({count} files)")
         self.execute_count = count
 
+    def _keep_mode(self):
+        return self.keep_mode_combo.currentText().split()[0].lower()
+
+    def _results_action_changed(self, text):
+        self.results_model.set_action(text)
+        self._update_execute_button()
+
+    def _results_keep_mode_changed(self, text):
+        self.results_model.set_keep_mode(self._keep_mode())
+
+    def _apply_filter(self):
+        self.results_proxy.setFilterFixedString(self.filter_input.text())
+
     # Scanning/threading
     def _start_scan_thread(self):
         root_path = self.path_input.text()
@@ -380,7 +843,7 @@ class PigeonFinderApp(QMainWindow):
         self.statusBar().showMessage(f"Scanning {root_path}...")
 
         self.thread = QThread()
-        # Pass a progress callback into scan_files via the worker
+        # The worker reports pipeline progress as a percentage
         self.worker = ScanWorker(root_path, ext_list, min_size, include_zero_byte)
         self.worker.moveToThread(self.thread)
         self.thread.started.connect(self.worker.run_scan)
@@ -393,8 +856,8 @@ class PigeonFinderApp(QMainWindow):
         if total > 0:
             percentage = int((current / total) * 100)
             self.progress_bar.setValue(percentage)
-            self.status_message.setText(f"Processing: {current}/{total} files. Hashing is in progress...")
-            self.statusBar().showMessage(f"Scanning: {current}/{total}")
+            self.status_message.setText(f"Scanning and hashing: {percentage}%")
+            self.statusBar().showMessage(f"Scanning: {percentage}%")
 
     def _scan_finished(self, duplicate_sets, runtime):
         try:
@@ -408,7 +871,7 @@ class PigeonFinderApp(QMainWindow):
         self.status_message.setText(f"Scan complete in {runtime:.2f} seconds.")
         self.statusBar().showMessage(f"Scan complete in {runtime:.2f}s")
         self.duplicate_sets = duplicate_sets
-        self._display_results(duplicate_sets, runtime)
+        self._display_results(duplicate_sets, runtime, self.worker.file_table)
 
     def _handle_scan_error(self, message):
         try:
@@ -423,6 +886,12 @@ class PigeonFinderApp(QMainWindow):
         self.statusBar().showMessage("Scan error")
 
     def _cancel_scan(self):
+        # The cancel button also stops a running delete/move
+        if getattr(self, 'action_worker', None) is not None:
+            self.action_worker.stop()
+            self.cancel_button.setEnabled(False)
+            self.statusBar().showMessage("Cancelling...")
+            return
         # Attempt to stop worker and thread
         try:
             if hasattr(self, 'worker') and hasattr(self.worker, 'stop'):
@@ -446,7 +915,7 @@ class PigeonFinderApp(QMainWindow):
         self._start_scan_thread()
 
     # Results display
-    def _display_results(self, duplicate_sets, runtime):
+    def _display_results(self, duplicate_sets, runtime, file_info=None):
         self.center_stack.setCurrentIndex(1)
         total_duplicates = 0
         total_files = 0
@@ -458,39 +927,28 @@ class PigeonFinderApp(QMainWindow):
                 dups = 0
             total_duplicates += dups
         self.summary_label.setText(f"Summary: {len(duplicate_sets)} Sets found, {total_duplicates} Duplicates (of {total_files} total files).")
-        self.results_table.setRowCount(0)
-        keep_mode = self.keep_mode_combo.currentText().split()[0].lower()
-        row_count = 0
-        for i, duplicate_set in enumerate(duplicate_sets):
-            original_path = select_original_file(duplicate_set, keep_mode)
-            for path in duplicate_set:
-                self.results_table.insertRow(row_count)
-                is_original = (path == original_path)
-                action_text = "KEEP (Original)" if is_original else "Delete" if self.action_combo.currentText() == "Delete Duplicates" else "Move" if self.action_combo.currentText() == "Move Duplicates" else "KEEP (Duplicate)"
-                action_item = QTableWidgetItem(action_text)
-                if is_original:
-                    action_item.setBackground(self.palette().color(self.palette().Highlight))
-                action_item.setFlags(Qt.ItemIsEnabled)
-                self.results_table.setItem(row_count, 0, action_item)
-                size, mtime = get_file_metadata(path)
-                mtime_str = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
-                self.results_table.setItem(row_count, 1, QTableWidgetItem(os.path.basename(path)))
-                self.results_table.setItem(row_count, 2, QTableWidgetItem(f"{size / 1024:.2f} KB"))
-                self.results_table.setItem(row_count, 3, QTableWidgetItem(path))
-                self.results_table.setItem(row_count, 4, QTableWidgetItem(mtime_str))
-                for col in range(5):
-                    item = self.results_table.item(row_count, col)
-                    if item:
-                        item.setBackground(self.palette().color(self.palette().Base).lighter(105) if self.current_theme == 'light' else self.palette().color(self.palette().Midlight))
-                        if is_original:
-                            item.setBackground(self.palette().color(self.palette().Highlight))
-                row_count += 1
-        self.results_table.resizeColumnsToContents()
-        self.results_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.results_model.set_results(duplicate_sets, self._keep_mode(),
+                                       self.action_combo.currentText(), file_info)
+        self._size_columns()
         self._update_execute_button()
 
-    def _handle_manual_selection(self):
-        self._update_execute_button()
+    def _size_columns(self, sample_rows=200):
+        """Fixed widths, with the name column sized from a sample of rows"""
+        metrics = self.results_table.fontMetrics()
+        name_width = metrics.horizontalAdvance(DuplicateTableModel.HEADERS[1])
+        rows = self.results_model.rowCount()
+        step = rows // sample_rows if rows > sample_rows else 1
+        for row in range(0, rows, step):
+            name = self.results_model.data(self.results_model.index(row, 1))
+            width = metrics.horizontalAdvance(name)
+            if width > name_width:
+                name_width = width
+        if name_width > 400:
+            name_width = 400
+        self.results_table.setColumnWidth(0, metrics.horizontalAdvance("KEEP (Duplicate)") + 24)
+        self.results_table.setColumnWidth(1, name_width + 24)
+        self.results_table.setColumnWidth(2, metrics.horizontalAdvance("0000000.00 KB") + 24)
+        self.results_table.setColumnWidth(4, metrics.horizontalAdvance("0000-00-00 00:00:00") + 24)
 
     def _confirm_execute_actions(self):
         if getattr(self, 'execute_count', 0) == 0:
@@ -503,18 +961,64 @@ class PigeonFinderApp(QMainWindow):
             self._execute_actions(action_type.lower(), move_path)
 
     def _execute_actions(self, action, move_path=""):
-        QMessageBox.information(self, "Action Started", f"Starting {action} process. UI may momentarily freeze...")
-        processed_count = 0
-        for duplicate_set in getattr(self, 'duplicate_sets', []):
-            keep_mode = self.keep_mode_combo.currentText().split()[0].lower()
-            original_path = select_original_file(duplicate_set, keep_mode)
-            processed_count += self._process_io_action(duplicate_set, original_path, action, move_path)
-        QMessageBox.information(self, "Action Complete", f"Successfully completed {action} for {processed_count} files!")
+        duplicate_sets = getattr(self, 'duplicate_sets', [])
+        # Originals already picked for the table are reused; the worker picks the rest
+        originals = [self.results_model.cached_original(i) for i in range(len(duplicate_sets))]
+
+        self.execute_button.setEnabled(False)
+        self.scan_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.center_stack.setCurrentIndex(0)
+        self.progress_bar.setValue(0)
+        self.status_message.setText(f"Starting {action}...")
+
+        self.action_thread = QThread()
+        self.action_worker = ActionWorker(duplicate_sets, originals, self._keep_mode(), action, move_path)
+        self.action_worker.moveToThread(self.action_thread)
+        self.action_thread.started.connect(self.action_worker.run)
+        self.action_worker.progress_update.connect(self._update_action_progress)
+        self.action_worker.action_complete.connect(self._actions_finished)
+        self.action_worker.error_occurred.connect(self._handle_action_error)
+        self.action_thread.start()
+
+    def _update_action_progress(self, done, total):
+        if total > 0:
+            percentage = int((done / total) * 100)
+            self.progress_bar.setValue(percentage)
+            self.status_message.setText(f"Processing duplicates: {done}/{total} files")
+            self.statusBar().showMessage(f"Processing: {done}/{total}")
+
+    def _finish_action_thread(self):
+        try:
+            self.action_thread.quit()
+            self.action_thread.wait()
+        except Exception:
+            pass
+        self.action_worker = None
+        self.execute_button.setEnabled(True)
+        self.scan_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    def _actions_finished(self, succeeded, failed, skipped, log_path):
+        self._finish_action_thread()
+        message = f"Completed for {succeeded} files."
+        if failed:
+            message += f"\n{failed} files failed."
+        if skipped:
+            message += f"\n{skipped} files were skipped (cancelled)."
+        if log_path:
+            message += f"\n\nPer-file log:\n{log_path}"
+        QMessageBox.information(self, "Action Complete", message)
+        self.status_message.setText(f"Action complete: {succeeded} succeeded, {failed} failed.")
+        self.statusBar().showMessage("Action complete")
         self.duplicate_sets = []
         self._display_results([], 0)
 
-    def _process_io_action(self, duplicate_set, original_path, action, move_path=None):
-        return process_action(duplicate_set, original_path, action, move_path)
+    def _handle_action_error(self, message):
+        self._finish_action_thread()
+        QMessageBox.critical(self, "Action Error", message)
+        self.status_message.setText("Action terminated due to an error.")
+        self.statusBar().showMessage("Action error")
 
     def _export_report(self):
         if not getattr(self, 'duplicate_sets', None):
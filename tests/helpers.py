@@ -0,0 +1,31 @@
+"""
+Shared Helpers for the Unit Tests
+"""
+
+import os
+
+
+class TempFilesMixin:
+    """Helpers for test cases that keep their files in self.test_dir"""
+
+    def write_file(self, name, content):
+        """Create a file in the test directory and return its path"""
+        path = os.path.join(self.test_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def normalize(self, duplicate_groups):
+        """Turn original -> duplicates into a comparable set of groups"""
+        return {frozenset([original] + dups) for original, dups in duplicate_groups.items()}
+
+
+class FakeClock:
+    """Clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
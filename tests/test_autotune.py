@@ -0,0 +1,102 @@
+"""
+Unit Tests for the I/O Autotuner
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.autotune import IOAutotuner, mount_point
+from core.pigeonhole_engine import PigeonholeEngine
+from tests.helpers import FakeClock
+
+class TestIOAutotuner(unittest.TestCase):
+    """Test cases for IOAutotuner"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.profile_path = Path(self.test_dir) / "io_profiles.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def run_tuner(self, tuner, clock, bytes_per_second, samples=40):
+        """Feed the tuner samples whose throughput depends on its settings"""
+        total = 0
+        for _ in range(samples):
+            clock.now += 0.5
+            total += int(bytes_per_second(tuner.workers, tuner.chunk_size) * 0.5)
+            tuner.observe(total, files=10)
+            if tuner.phase == 'settled':
+                break
+
+    def test_climbs_for_high_latency_storage(self):
+        """Throughput that grows with concurrency pushes the worker count up"""
+        clock = FakeClock()
+        tuner = IOAutotuner('/mnt/share', workers=2, max_workers=64, clock=clock)
+
+        def network(workers, chunk_size):
+            return 10e6 * (workers if workers < 16 else 16)
+
+        self.run_tuner(tuner, clock, network)
+
+        self.assertEqual(tuner.phase, 'settled')
+        self.assertEqual(tuner.workers, 16)
+
+    def test_backs_off_for_thrashing_disk(self):
+        """Throughput that drops with concurrency pulls the worker count down"""
+        clock = FakeClock()
+        tuner = IOAutotuner('/mnt/hdd', workers=4, clock=clock)
+
+        def spinning(workers, chunk_size):
+            larger_reads = chunk_size if chunk_size < 1024 * 1024 else 1024 * 1024
+            return 150e6 / workers * larger_reads / (1024 * 1024)
+
+        self.run_tuner(tuner, clock, spinning)
+
+        self.assertEqual(tuner.workers, 1)
+        self.assertGreaterEqual(tuner.chunk_size, 1024 * 1024)
+
+    def test_profile_round_trip(self):
+        """Saved settings are the starting point for the same mount"""
+        tuner = IOAutotuner.for_path(self.test_dir, workers=3, profile_path=self.profile_path)
+        tuner.workers = 12
+        tuner.chunk_size = 256 * 1024
+        tuner.save()
+
+        again = IOAutotuner.for_path(self.test_dir, workers=3, profile_path=self.profile_path)
+
+        self.assertEqual(again.mount, mount_point(self.test_dir))
+        self.assertEqual((again.workers, again.chunk_size), (12, 256 * 1024))
+
+    def test_engine_autotune_records_profile(self):
+        """An autotuned run finds the same duplicates and stores a profile"""
+        paths = []
+        for i in range(20):
+            path = os.path.join(self.test_dir, f"f{i}.bin")
+            with open(path, "wb") as f:
+                f.write(bytes([i % 4]) * 20000)
+            paths.append(path)
+        groups = {20000: paths}
+
+        original_path = IOAutotuner.PROFILE_PATH
+        IOAutotuner.PROFILE_PATH = self.profile_path
+        try:
+            engine = PigeonholeEngine(block_size=1024, workers=2, autotune=True)
+            result = engine.find_duplicates(groups)
+        finally:
+            IOAutotuner.PROFILE_PATH = original_path
+
+        expected = PigeonholeEngine(block_size=1024).find_duplicates(groups)
+        self.assertEqual(result, expected)
+        self.assertIn(mount_point(self.test_dir), IOAutotuner.load_profiles(self.profile_path))
+        self.assertEqual(engine.hasher.chunk_size, 8192)
+
+if __name__ == '__main__':
+    unittest.main()
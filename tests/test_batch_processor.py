@@ -0,0 +1,91 @@
+"""
+Unit Tests for Batch Processor
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.batch_processor import BatchProcessor
+
+class TestBatchProcessor(unittest.TestCase):
+    """Test cases for BatchProcessor"""
+
+    def test_results_in_task_order(self):
+        """Results come back in task order, with errors recorded per task"""
+        processor = BatchProcessor(max_workers=3, batch_size=4)
+
+        def square(task):
+            if task == 7:
+                raise ValueError("bad task")
+            return task * task
+
+        results = processor.process_batch(list(range(20)), square)
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results[3], 9)
+        self.assertEqual(results[7], {'error': 'bad task', 'task': 7})
+        self.assertFalse(processor.is_running)
+
+    def test_threads_bounded_by_max_workers(self):
+        """Small batches never run on more than max_workers threads"""
+        processor = BatchProcessor(max_workers=3, batch_size=1)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+        threads = set()
+
+        def task(_):
+            with lock:
+                active[0] += 1
+                if active[0] > peak[0]:
+                    peak[0] = active[0]
+                threads.add(threading.current_thread().ident)
+            time.sleep(0.001)
+            with lock:
+                active[0] -= 1
+
+        processor.process_batch(list(range(200)), task)
+
+        self.assertLessEqual(peak[0], 3)
+        self.assertLessEqual(len(threads), 3)
+
+    def test_stop_processing_cancels_remaining_tasks(self):
+        """stop_processing from a worker lets running tasks finish and skips the rest"""
+        processor = BatchProcessor(max_workers=2, batch_size=5)
+
+        def task(item):
+            if item == 10:
+                processor.stop_processing()
+            time.sleep(0.001)
+            return item
+
+        results = processor.process_batch(list(range(1000)), task)
+
+        self.assertIn(10, results)
+        self.assertLess(len(results), 100)
+
+    def test_progress_is_rate_limited(self):
+        """Thousands of tasks produce a handful of progress events ending at 100"""
+        processor = BatchProcessor(max_workers=4, batch_size=10)
+        events = []
+        callers = set()
+
+        def on_progress(progress, message):
+            events.append((progress, message))
+            callers.add(threading.current_thread().ident)
+
+        processor.add_progress_callback(on_progress)
+        processor.process_batch(list(range(5000)), lambda item: item)
+
+        self.assertLess(len(events), 50)
+        self.assertEqual(events[-1], (100.0, "Processed 5000/5000 items"))
+        self.assertEqual(callers, {threading.current_thread().ident})
+
+if __name__ == '__main__':
+    unittest.main()
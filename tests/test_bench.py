@@ -0,0 +1,84 @@
+"""
+Unit Tests for the Benchmark Harness
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+import json
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import generate_tree, run_benchmarks
+
+
+class TestBench(unittest.TestCase):
+    """Test cases for the synthetic tree generator and benchmark runner"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def list_tree(self, root):
+        """Relative path -> content of every file under root"""
+        contents = {}
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    contents[os.path.relpath(path, root)] = f.read()
+        return contents
+
+    def test_tree_is_reproducible(self):
+        """The same seed gives the same files and manifest"""
+        first = os.path.join(self.test_dir, "first")
+        second = os.path.join(self.test_dir, "second")
+        manifest = generate_tree(first, files=40, min_size=100, max_size=5000, seed=7)
+        self.assertEqual(generate_tree(second, files=40, min_size=100, max_size=5000, seed=7),
+                         manifest)
+
+        self.assertEqual(self.list_tree(first), self.list_tree(second))
+        self.assertEqual(len(self.list_tree(first)), 40)
+
+    def test_manifest_counts_duplicates(self):
+        """The manifest's duplicate groups match the content actually written"""
+        manifest = generate_tree(self.test_dir, files=60, min_size=100, max_size=3000,
+                                 duplicate_ratio=0.4, same_prefix_ratio=0.3, depth=2, seed=3)
+
+        copies = {}
+        for content in self.list_tree(self.test_dir).values():
+            copies[content] = copies.get(content, 0) + 1
+        groups = 0
+        for count in copies.values():
+            if count > 1:
+                groups += 1
+
+        self.assertEqual(manifest['duplicate_groups'], groups)
+        self.assertEqual(sum(manifest['kinds'].values()), 60)
+
+    def test_benchmarks_find_expected_groups(self):
+        """Every benchmark finds the tree's duplicates and the result is JSON"""
+        manifest = generate_tree(self.test_dir, files=50, min_size=100, max_size=200000, seed=1)
+
+        results = run_benchmarks(self.test_dir, manifest, repeat=1)
+
+        self.assertEqual(set(results['results']), {'engine', 'pipeline', 'cli'})
+        for name, result in results['results'].items():
+            self.assertTrue(result['median']['correct'], name)
+        for stage in ('walk', 'bucket', 'screening', 'hashing', 'total'):
+            self.assertIn(stage, results['results']['engine']['median'])
+        json.dumps(results)
+
+    def test_invalid_ratios(self):
+        """Ratios that add up to more than one are rejected"""
+        with self.assertRaises(ValueError):
+            generate_tree(self.test_dir, files=10, duplicate_ratio=0.6, same_size_ratio=0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Unit Tests for the Columnar File Table
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.file_scanner import FileScanner
+from core.file_table import FileTable
+from core.pigeonhole_engine import PigeonholeEngine
+from core.size_buckets import bucket_ranges, np
+
+class TestFileTable(unittest.TestCase):
+    """Test cases for FileTable"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(30):
+            path = os.path.join(self.test_dir, f"dir{i % 3}", f"file_{i:02d}_é.bin")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(bytes([i % 5]) * (100 + i % 10))
+            self.paths.append(path)
+
+        self.scanner = FileScanner()
+        self.table = self.scanner.scan_directory(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_paths_round_trip(self):
+        """Every path maps to an id and back, and metadata matches stat"""
+        self.assertEqual(len(self.table), 30)
+        self.assertEqual(set(self.table), set(self.paths))
+        self.assertEqual(len(self.table.directories), 3)
+
+        for path in self.paths:
+            file_id = self.table.id_of(path)
+            self.assertEqual(self.table.path_of(file_id), path)
+            stat = os.stat(path)
+            self.assertEqual(self.table[path]['size'], stat.st_size)
+            self.assertEqual(self.table[path]['modified_ns'], stat.st_mtime_ns)
+            self.assertEqual(self.table.identity(file_id), (stat.st_dev, stat.st_ino))
+
+    def test_missing_paths(self):
+        """Unknown paths behave like missing dictionary keys"""
+        missing = os.path.join(self.test_dir, "dir0", "nope.bin")
+        self.assertIsNone(self.table.id_of(missing))
+        self.assertNotIn(missing, self.table)
+        self.assertIsNone(self.table.get(missing))
+        with self.assertRaises(KeyError):
+            self.table[missing]
+
+    def test_size_groups_use_ids(self):
+        """Size groups hold file ids and agree with the path-based groups"""
+        id_groups = self.scanner.get_file_id_groups_by_size()
+        path_groups = self.scanner.get_file_groups_by_size()
+
+        self.assertEqual(set(id_groups), set(path_groups))
+        for size, file_ids in id_groups.items():
+            self.assertEqual([self.table.path_of(i) for i in file_ids], path_groups[size])
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_vectorized_buckets_match_python(self):
+        """The NumPy and pure-Python bucketing paths agree"""
+        sizes = [5, 0, 3, 5, 7, 0, 3, 3, 9, 5, 12, 12]
+        keep = [True] * 11 + [False]
+        for options in [{}, {'include_zero_byte': True}, {'min_size': 4},
+                        {'max_size': 5}, {'keep': keep}]:
+            vectorized = bucket_ranges(sizes, vectorized=True, **options)
+            plain = bucket_ranges(sizes, vectorized=False, **options)
+            self.assertEqual(vectorized, plain)
+
+        order, ranges = bucket_ranges(sizes, vectorized=True)
+        self.assertEqual(ranges, [(3, 0, 3), (5, 3, 6), (12, 6, 8)])
+        self.assertEqual(order, [2, 6, 7, 0, 3, 9, 10, 11])
+
+    def test_size_groups_filters(self):
+        """Extension and size filters narrow the groups without rescanning"""
+        with open(os.path.join(self.test_dir, "dir0", "extra.TXT"), "wb") as f:
+            f.write(bytes([0]) * 100)
+        with open(os.path.join(self.test_dir, "dir1", "extra.txt"), "wb") as f:
+            f.write(bytes([0]) * 100)
+        self.table = self.scanner.scan_directory(self.test_dir)
+
+        text_groups = self.scanner.get_file_groups_by_size(extensions=['.txt'])
+        self.assertEqual(list(text_groups), [100])
+        self.assertEqual(len(text_groups[100]), 2)
+
+        sized = self.table.size_groups(min_size=102, max_size=104)
+        self.assertEqual(sorted(sized), [102, 103, 104])
+        self.assertEqual(self.table.size_groups(extensions=['.jpg']), {})
+
+    def test_compact_memory(self):
+        """Per-file metadata stays in the tens of bytes plus the name"""
+        name_bytes = 0
+        for path in self.paths:
+            name_bytes += len(os.fsencode(os.path.basename(path)))
+        per_file = (self.table.memory_usage() - name_bytes) / len(self.table)
+
+        self.assertLess(per_file, 64)
+
+    def test_engine_with_file_ids(self):
+        """The engine accepts id groups and answers with ids"""
+        engine = PigeonholeEngine()
+        id_result = engine.find_duplicates(self.scanner.get_file_id_groups_by_size(),
+                                           file_info=self.table)
+        path_result = PigeonholeEngine().find_duplicates(self.scanner.get_file_groups_by_size())
+
+        resolved = {}
+        for original, duplicates in id_result.items():
+            self.assertIsInstance(original, int)
+            resolved[self.table.path_of(original)] = [self.table.path_of(i) for i in duplicates]
+        self.assertEqual(resolved, path_result)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Unit Tests for the Persistent Hash Cache
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.hash_cache import HashCache
+from core.hashing import FileHasher
+from core.pigeonhole_engine import PigeonholeEngine
+
+class TestHashCache(unittest.TestCase):
+    """Test cases for HashCache"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = HashCache(os.path.join(self.test_dir, "cache.db"))
+
+        self.file1 = os.path.join(self.test_dir, "file1.bin")
+        self.file2 = os.path.join(self.test_dir, "file2.bin")
+        for path in (self.file1, self.file2):
+            with open(path, "wb") as f:
+                f.write(b"duplicate content" * 100)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_hit_for_unchanged_file(self):
+        """Cached digest is returned while size and mtime are unchanged"""
+        hasher = FileHasher('sha256', cache=self.cache)
+        file_hash = hasher.calculate_hash(self.file1)
+
+        self.assertEqual(hasher.get_cached_hash(self.file1), file_hash)
+        self.assertEqual(self.cache.stats['writes'], 1)
+
+    def test_stale_after_modification(self):
+        """A modified file no longer matches its cached entry"""
+        hasher = FileHasher('sha256', cache=self.cache)
+        old_hash = hasher.calculate_hash(self.file1)
+
+        with open(self.file1, "ab") as f:
+            f.write(b"more")
+
+        self.assertIsNone(hasher.get_cached_hash(self.file1))
+        self.assertNotEqual(hasher.calculate_hash(self.file1), old_hash)
+
+    def test_invalidate_and_compact(self):
+        """Explicit invalidation and compaction remove entries"""
+        hasher = FileHasher('md5', cache=self.cache)
+        hasher.calculate_hash(self.file1)
+        hasher.calculate_hash(self.file2)
+
+        self.assertEqual(self.cache.invalidate(self.file1), 1)
+        self.assertEqual(len(self.cache), 1)
+
+        os.remove(self.file2)
+        self.assertEqual(self.cache.compact(), 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_engine_rescan_uses_cache(self):
+        """A rescan of an unchanged group is answered from the cache"""
+        groups = {os.path.getsize(self.file1): [self.file1, self.file2]}
+
+        first = PigeonholeEngine(hash_cache=self.cache, block_size=256).find_duplicates(groups)
+        engine = PigeonholeEngine(hash_cache=self.cache, block_size=256)
+        second = engine.find_duplicates(groups)
+
+        self.assertEqual(first, second)
+        self.assertEqual(engine.get_optimization_stats()['cache_hits'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
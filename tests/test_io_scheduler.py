@@ -0,0 +1,94 @@
+"""
+Unit Tests for Device-aware I/O Scheduling
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+import threading
+import time
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import io_scheduler
+from core.io_scheduler import DeviceScheduler, order_by_disk_position
+from core.pigeonhole_engine import PigeonholeEngine
+
+class TestDeviceScheduler(unittest.TestCase):
+    """Test cases for DeviceScheduler"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(12):
+            path = os.path.join(self.test_dir, f"f{i:02d}.bin")
+            with open(path, "wb") as f:
+                f.write(bytes([i % 3]) * 8192)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_plan_partitions_by_device(self):
+        """Files are grouped per st_dev and unreadable files set apart"""
+        missing = os.path.join(self.test_dir, "missing.bin")
+        plan = DeviceScheduler().plan(self.paths + [missing])
+
+        by_device = {device: paths for device, _, paths in plan}
+        self.assertEqual(sorted(by_device[os.stat(self.test_dir).st_dev]), self.paths)
+        self.assertEqual(by_device[-1], [missing])
+
+    def test_orders_by_offset_then_inode(self):
+        """Located files are sorted by physical offset, the rest by inode"""
+        offsets = {self.paths[0]: 900, self.paths[1]: 100, self.paths[2]: None, self.paths[3]: None}
+        inodes = {self.paths[2]: 50, self.paths[3]: 7}
+
+        with mock.patch.object(io_scheduler, 'physical_offset', side_effect=offsets.get):
+            ordered = order_by_disk_position(self.paths[:4], inodes)
+
+        self.assertEqual(ordered, [self.paths[1], self.paths[0], self.paths[3], self.paths[2]])
+
+    def test_rotational_device_reads_one_at_a_time(self):
+        """A spinning disk gets a single reader that follows disk order"""
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+        order = []
+
+        def read(path):
+            with lock:
+                active[0] += 1
+                if active[0] > peak[0]:
+                    peak[0] = active[0]
+                order.append(path)
+            time.sleep(0.001)
+            with lock:
+                active[0] -= 1
+            return os.path.basename(path)
+
+        offsets = {path: 1000 - i for i, path in enumerate(self.paths)}
+        with mock.patch.object(io_scheduler, 'is_rotational', return_value=True), \
+                mock.patch.object(io_scheduler, 'physical_offset', side_effect=offsets.get):
+            scheduler = DeviceScheduler(workers=4)
+            results = dict(scheduler.map(self.paths, read))
+
+        self.assertEqual(peak[0], 1)
+        self.assertEqual(order, list(reversed(self.paths)))
+        self.assertEqual(results[self.paths[0]], "f00.bin")
+        self.assertEqual(scheduler.stats['rotational_devices'], 1)
+
+    def test_engine_with_device_scheduling(self):
+        """Scheduled reads find the same duplicates as plain threads"""
+        groups = {8192: self.paths}
+        expected = PigeonholeEngine(block_size=1024).find_duplicates(groups)
+        result = PigeonholeEngine(block_size=1024, workers=3,
+                                  device_scheduling=True).find_duplicates(groups)
+
+        self.assertEqual(result, expected)
+
+if __name__ == '__main__':
+    unittest.main()
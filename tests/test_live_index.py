@@ -0,0 +1,90 @@
+"""
+Unit Tests for the Live Duplicate Index
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+import threading
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.file_scanner import FileScanner
+from core.pigeonhole_engine import PigeonholeEngine
+from core.live_index import LiveDuplicateIndex
+from tests.helpers import TempFilesMixin
+
+class TestLiveDuplicateIndex(TempFilesMixin, unittest.TestCase):
+    """Test cases for LiveDuplicateIndex"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.a = self.write_file("a.bin", b"A" * 1000)
+        self.b = self.write_file("b.bin", b"A" * 1000)
+        self.c = self.write_file("c.bin", b"C" * 2000)
+
+        scanner = FileScanner()
+        scanner.scan_directory(self.test_dir)
+        groups = PigeonholeEngine().find_duplicates(scanner.get_file_groups_by_size())
+
+        self.index = LiveDuplicateIndex(debounce=60)
+        self.index.load(scanner.scanned_files, groups)
+
+    def tearDown(self):
+        self.index.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_seeded_from_scan(self):
+        """The index answers with the scan's groups before any event"""
+        self.assertEqual(self.normalize(self.index.get_duplicates()), {frozenset([self.a, self.b])})
+        self.assertEqual(self.index.stats['files_hashed'], 0)
+
+    def test_created_file_joins_group(self):
+        """A new copy is hashed and joins the existing group"""
+        d = self.write_file("d.bin", b"A" * 1000)
+        self.index.on_event('created', d)
+        changed = self.index.flush()
+
+        self.assertEqual(changed, {d})
+        self.assertEqual(self.normalize(self.index.get_duplicates()),
+                         {frozenset([self.a, self.b, d])})
+        # The new file plus one representative of the scanned group
+        self.assertEqual(self.index.stats['files_hashed'], 2)
+
+    def test_burst_is_coalesced(self):
+        """Repeated events for one file are applied once"""
+        for _ in range(20):
+            self.index.on_event('modified', self.c)
+        self.index.on_event('deleted', self.b)
+        os.remove(self.b)
+
+        self.assertEqual(self.index.flush(), {self.b})
+        self.assertEqual(self.index.get_duplicates(), {})
+        self.assertEqual(self.index.stats['batches'], 1)
+
+    def test_modified_file_leaves_group(self):
+        """A copy rewritten with other content of the same size drops out"""
+        self.write_file("b.bin", b"B" * 1000)
+        os.utime(self.b, ns=(1, 1))
+        self.index.on_event('modified', self.b)
+        self.index.flush()
+
+        self.assertEqual(self.index.get_duplicates(), {})
+
+    def test_debounce_timer_applies_changes(self):
+        """Without an explicit flush the timer applies queued events"""
+        updated = threading.Event()
+        index = LiveDuplicateIndex(debounce=0.05, on_update=lambda changed: updated.set())
+        d = self.write_file("d.bin", b"C" * 2000)
+
+        index.on_event('created', self.c)
+        index.on_event('created', d)
+
+        self.assertTrue(updated.wait(5))
+        self.assertEqual(self.normalize(index.get_duplicates()), {frozenset([self.c, d])})
+
+if __name__ == '__main__':
+    unittest.main()
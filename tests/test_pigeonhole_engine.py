@@ -0,0 +1,248 @@
+"""
+Unit Tests for Pigeonhole Engine
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pigeonhole_engine import PigeonholeEngine
+from core.hashing import FileHasher
+from tests.helpers import TempFilesMixin
+
+class TestPigeonholeEngine(TempFilesMixin, unittest.TestCase):
+    """Test cases for PigeonholeEngine"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def group_by_size(self, paths):
+        """Build size groups the way FileScanner does"""
+        groups = {}
+        for path in paths:
+            groups.setdefault(os.path.getsize(path), []).append(path)
+        return groups
+
+    def test_finds_duplicates(self):
+        """Identical files are grouped, same-size different files are not"""
+        a = self.write_file("a.bin", b"A" * 50000)
+        b = self.write_file("b.bin", b"A" * 50000)
+        c = self.write_file("c.bin", b"B" * 50000)
+
+        engine = PigeonholeEngine()
+        result = engine.find_duplicates(self.group_by_size([a, b, c]))
+
+        self.assertEqual(self.normalize(result), {frozenset([a, b])})
+
+    def test_prefix_bucketing_reads_each_file_once(self):
+        """Screening reads one prefix per file and skips full hashes of unique prefixes"""
+        paths = [self.write_file(f"unique{i}.bin", bytes([i]) * 4096) for i in range(10)]
+        paths.append(self.write_file("copy.bin", bytes([0]) * 4096))
+
+        engine = PigeonholeEngine(stages=['head'], block_size=1024)
+        engine.find_duplicates(self.group_by_size(paths))
+        stats = engine.get_optimization_stats()
+
+        self.assertEqual(stats['partial_hashes'], 11)
+        self.assertEqual(stats['full_hashes'], 2)
+        self.assertEqual(stats['comparisons_made'], 13)
+        self.assertEqual(stats['hash_computations_saved'], 9)
+
+    def test_staged_screening_splits_on_middle_blocks(self):
+        """Files sharing head and tail are told apart by the sample blocks"""
+        head, tail = b"H" * 4096, b"T" * 4096
+        a = self.write_file("a.mp4", head + b"1" * 40000 + tail)
+        b = self.write_file("b.mp4", head + b"2" * 40000 + tail)
+        c = self.write_file("c.mp4", head + b"1" * 40000 + tail)
+
+        engine = PigeonholeEngine(block_size=4096, sample_blocks=3)
+        result = engine.find_duplicates(self.group_by_size([a, b, c]))
+        stats = engine.get_optimization_stats()
+
+        self.assertEqual(self.normalize(result), {frozenset([a, c])})
+        self.assertEqual(stats['partial_hashes'], 9)
+        self.assertEqual(stats['full_hashes'], 2)
+
+    def test_small_files_confirmed_by_screening(self):
+        """Files no larger than one block need no separate full read"""
+        a = self.write_file("a.txt", b"same")
+        b = self.write_file("b.txt", b"same")
+
+        engine = PigeonholeEngine()
+        result = engine.find_duplicates(self.group_by_size([a, b]))
+
+        self.assertEqual(self.normalize(result), {frozenset([a, b])})
+        self.assertEqual(engine.get_optimization_stats()['full_hashes'], 0)
+
+    @unittest.skipUnless('xxh3_128' in FileHasher.HASH_ALGORITHMS, "xxhash not installed")
+    def test_fast_prefilter_with_strong_confirmation(self):
+        """A cheap prefilter hash still confirms duplicates with the strong hash"""
+        a = self.write_file("a.bin", b"Q" * 200000)
+        b = self.write_file("b.bin", b"Q" * 200000)
+        c = self.write_file("c.bin", b"Q" * 199999 + b"R")
+
+        engine = PigeonholeEngine('sha256', prefilter_algorithm='xxh3_128', block_size=1024)
+        result = engine.find_duplicates(self.group_by_size([a, b, c]))
+
+        self.assertEqual(engine.prefilter_hasher.algorithm, 'xxh3_128')
+        self.assertEqual(self.normalize(result), {frozenset([a, b])})
+        self.assertEqual(engine.get_optimization_stats()['full_hashes'], 2)
+
+    def test_direct_compare_small_groups(self):
+        """Small groups are confirmed byte by byte without full hashing"""
+        a = self.write_file("a.bin", b"Z" * 300000)
+        b = self.write_file("b.bin", b"Z" * 300000)
+        c = self.write_file("c.bin", b"Z" * 299999 + b"Y")
+
+        engine = PigeonholeEngine(stages=['head'], block_size=1024, compare_strategy='direct')
+        result = engine.find_duplicates(self.group_by_size([a, b, c]))
+        stats = engine.get_optimization_stats()
+
+        self.assertEqual(self.normalize(result), {frozenset([a, b])})
+        self.assertEqual(stats['full_hashes'], 0)
+        self.assertEqual(stats['direct_compares'], 3)
+
+    def test_direct_compare_falls_back_for_large_groups(self):
+        """Groups above the threshold are still hashed"""
+        paths = [self.write_file(f"f{i}.bin", b"W" * 5000) for i in range(4)]
+
+        engine = PigeonholeEngine(stages=['head'], block_size=1024, compare_strategy='direct',
+                                  direct_compare_max=3)
+        result = engine.find_duplicates(self.group_by_size(paths))
+
+        self.assertEqual(self.normalize(result), {frozenset(paths)})
+        self.assertEqual(engine.get_optimization_stats()['full_hashes'], 4)
+
+    @unittest.skipUnless(hasattr(os, 'link'), "hardlinks not supported")
+    def test_hardlinks_collapsed_before_io(self):
+        """Paths to one inode are reported as linked, not hashed as duplicates"""
+        a = self.write_file("a.bin", b"L" * 100000)
+        b = os.path.join(self.test_dir, "b.bin")
+        os.link(a, b)
+        c = self.write_file("c.bin", b"L" * 100000)
+
+        engine = PigeonholeEngine(block_size=1024)
+        result = engine.find_duplicates(self.group_by_size([a, b, c]))
+        stats = engine.get_optimization_stats()
+
+        self.assertEqual(self.normalize(result), {frozenset([a, c])})
+        self.assertEqual(engine.get_hardlink_groups(), {a: [b]})
+        self.assertEqual(stats['hardlinks_collapsed'], 1)
+        self.assertEqual(stats['full_hashes'], 2)
+
+    @unittest.skipUnless(hasattr(os, 'link'), "hardlinks not supported")
+    def test_only_hardlinks_need_no_reads(self):
+        """A size group made only of links to one inode is never read"""
+        a = self.write_file("a.bin", b"M" * 5000)
+        b = os.path.join(self.test_dir, "b.bin")
+        os.link(a, b)
+        file_info = {path: {'device': os.stat(path).st_dev, 'inode': os.stat(path).st_ino}
+                     for path in (a, b)}
+
+        engine = PigeonholeEngine()
+        result = engine.find_duplicates(self.group_by_size([a, b]), file_info=file_info)
+
+        self.assertEqual(result, {})
+        self.assertEqual(engine.get_optimization_stats()['bytes_read'], 0)
+
+    def test_unknown_device_never_collapsed(self):
+        """Files whose device is unknown (0) are hashed even if their inodes match"""
+        a = self.write_file("a.bin", b"N" * 5000)
+        b = self.write_file("b.bin", b"N" * 5000)
+        c = self.write_file("c.bin", b"O" * 5000)
+        # Windows DirEntry data: no volume, so equal file indexes on two drives look alike
+        file_info = {path: {'device': 0, 'inode': 42} for path in (a, b, c)}
+
+        engine = PigeonholeEngine()
+        result = engine.find_duplicates(self.group_by_size([a, b, c]), file_info=file_info)
+
+        self.assertEqual(self.normalize(result), {frozenset([a, b])})
+        self.assertEqual(engine.get_optimization_stats()['hardlinks_collapsed'], 0)
+
+    def test_parallel_matches_serial(self):
+        """Parallel hashing returns the same groups in the same order"""
+        paths = []
+        for i in range(40):
+            paths.append(self.write_file(f"dir{i % 4}/f{i}.bin", bytes([i % 7]) * (1000 + i % 3)))
+
+        groups = self.group_by_size(paths)
+        serial = PigeonholeEngine().find_duplicates(groups)
+        parallel = PigeonholeEngine(workers=8, max_in_flight=5).find_duplicates(groups)
+
+        self.assertEqual(list(serial.items()), list(parallel.items()))
+        self.assertTrue(serial)
+
+    def test_process_executor_matches_threads(self):
+        """Hashing in worker processes finds the same groups as threads"""
+        paths = []
+        for i in range(12):
+            paths.append(self.write_file(f"p{i}.bin", bytes([i % 3]) * (150000 + i % 2)))
+        paths.append(self.write_file("p_diff.bin", bytes([0]) * 149999 + b"X"))
+        groups = self.group_by_size(paths)
+
+        threaded = PigeonholeEngine('sha256', block_size=1024).find_duplicates(groups)
+        engine = PigeonholeEngine('sha256', block_size=1024, workers=2, executor='process')
+        result = engine.find_duplicates(groups)
+
+        self.assertEqual(self.normalize(result), self.normalize(threaded))
+        self.assertEqual(engine.get_optimization_stats()['full_hashes'],
+                         len(paths) - 1)
+        self.assertIsNone(engine._process_pool)
+
+    def test_iter_duplicates_streams_windows(self):
+        """Streamed groups match find_duplicates and arrive window by window"""
+        paths = []
+        for i in range(12):
+            paths.append(self.write_file(f"s{i}.bin", bytes([i % 3]) * (3000 + i % 4)))
+        groups = self.group_by_size(paths)
+
+        expected = PigeonholeEngine(block_size=1024).find_duplicates(groups)
+        engine = PigeonholeEngine(block_size=1024)
+        streamed = list(engine.iter_duplicates(groups, window_files=3))
+
+        self.assertEqual(self.normalize(dict(streamed)), self.normalize(expected))
+        self.assertEqual(len(streamed), len(expected))
+
+    def test_iter_duplicates_stops_early(self):
+        """Stopping the stream early skips the remaining windows but keeps stats"""
+        paths = []
+        for i in range(8):
+            paths.append(self.write_file(f"e{i}.bin", bytes([i % 4]) * (5000 + i % 4)))
+
+        engine = PigeonholeEngine(block_size=1024)
+        stream = engine.iter_duplicates(self.group_by_size(paths), window_files=2)
+        first = next(stream)
+        stream.close()
+        stats = engine.get_optimization_stats()
+
+        self.assertEqual(len(first[1]), 1)
+        self.assertEqual(stats['files_processed'], 8)
+        self.assertEqual(stats['full_hashes'], 2)
+
+    def test_progress_callback_contract(self):
+        """Progress is reported as (percent, message) and ends at 100"""
+        a = self.write_file("a.bin", b"x" * 100)
+        b = self.write_file("b.bin", b"x" * 100)
+        calls = []
+
+        PigeonholeEngine(workers=2).find_duplicates(
+            self.group_by_size([a, b]),
+            progress_callback=lambda progress, message: calls.append((progress, message))
+        )
+
+        self.assertTrue(calls)
+        self.assertEqual(calls[-1][0], 100.0)
+        for progress, message in calls:
+            self.assertIsInstance(message, str)
+            self.assertLessEqual(progress, 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
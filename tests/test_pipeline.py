@@ -0,0 +1,171 @@
+"""
+Unit Tests for the Staged Scan Pipeline
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+import threading
+import time
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pipeline import ScanPipeline
+from core.pigeonhole_engine import PigeonholeEngine
+from tests.helpers import TempFilesMixin
+
+
+class TestScanPipeline(TempFilesMixin, unittest.TestCase):
+    """Test cases for ScanPipeline"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_matches_engine(self):
+        """The pipeline finds the same groups as the sequential engine"""
+        paths = []
+        for i in range(4):
+            paths.append(self.write_file(f"d{i}/same.bin", b"S" * 70000))
+            paths.append(self.write_file(f"d{i}/prefix.bin", b"P" * 70000 + bytes([i % 2])))
+            paths.append(self.write_file(f"d{i}/unique.bin", b"U" * (100 + i)))
+            paths.append(self.write_file(f"d{i}/small.txt", b"tiny"))
+
+        groups = {}
+        for path in paths:
+            groups.setdefault(os.path.getsize(path), []).append(path)
+        expected = PigeonholeEngine().find_duplicates(groups)
+
+        result = ScanPipeline(PigeonholeEngine(), [self.test_dir]).run()
+
+        self.assertEqual(self.normalize(result), self.normalize(expected))
+        self.assertEqual(len(result), 4)
+
+    def test_screening_stages_avoid_full_hashes(self):
+        """Files sharing a head but not a tail are split without full hashes"""
+        self.write_file("a.bin", b"H" * 5000 + b"A" * 5000)
+        b = self.write_file("b.bin", b"H" * 5000 + b"B" * 5000)
+        c = self.write_file("c.bin", b"H" * 5000 + b"B" * 5000)
+
+        engine = PigeonholeEngine(block_size=1024, stages=['head', 'tail'])
+        pipeline = ScanPipeline(engine, [self.test_dir])
+        result = pipeline.run()
+
+        self.assertEqual(self.normalize(result), {frozenset([b, c])})
+        # Three heads and three tails; only the matching tails are fully hashed
+        self.assertEqual(pipeline.stats['screen_hashes'], 6)
+        self.assertEqual(pipeline.stats['full_hashes'], 2)
+
+    def test_unsupported_engine_options(self):
+        """Engines set up for direct compare need the sequential path"""
+        engine = PigeonholeEngine(compare_strategy='direct')
+
+        self.assertFalse(ScanPipeline.supports(engine))
+        self.assertTrue(ScanPipeline.supports(PigeonholeEngine()))
+        with self.assertRaises(ValueError):
+            ScanPipeline(engine, [self.test_dir])
+
+    def test_filters_and_hardlinks(self):
+        """Extension filters apply and hardlinks are collapsed, not reported"""
+        a = self.write_file("a.jpg", b"A" * 5000)
+        b = self.write_file("b.jpg", b"A" * 5000)
+        self.write_file("c.txt", b"A" * 5000)
+        link = os.path.join(self.test_dir, "link.jpg")
+        os.link(a, link)
+
+        engine = PigeonholeEngine()
+        pipeline = ScanPipeline(engine, [self.test_dir], extensions=[".JPG"])
+        result = pipeline.run()
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len(self.normalize(result).pop()), 2)
+        self.assertIn(b, self.normalize(result).pop())
+        self.assertEqual(engine.stats['hardlinks_collapsed'], 1)
+        self.assertEqual(len(pipeline.file_table), 3)
+
+    def test_zero_byte_files(self):
+        """Empty files are grouped without reading them only when asked for"""
+        self.write_file("empty1", b"")
+        self.write_file("empty2", b"")
+
+        self.assertEqual(ScanPipeline(PigeonholeEngine(), [self.test_dir]).run(), {})
+        result = ScanPipeline(PigeonholeEngine(), [self.test_dir], include_zero_byte=True).run()
+        self.assertEqual(len(result), 1)
+
+    def test_hashes_while_walking(self):
+        """Shared sizes are hashed before the walk has finished"""
+        self.write_file("a.bin", b"X" * 20000)
+        self.write_file("b.bin", b"X" * 20000)
+        for i in range(20):
+            os.makedirs(os.path.join(self.test_dir, f"sub{i}", "leaf"))
+
+        def slow_skip(name):
+            # Keep the walk busy long enough for hashing to overlap it
+            time.sleep(0.02)
+            return False
+
+        pipeline = ScanPipeline(PigeonholeEngine(), [self.test_dir], skip_dir=slow_skip,
+                                walk_workers=1)
+        result = pipeline.run()
+
+        self.assertEqual(len(result), 1)
+        self.assertGreater(pipeline.stats['hashed_during_walk'], 0)
+
+    def test_hash_errors_skip_files(self):
+        """A hasher error skips that file; the worker keeps going and the run finishes"""
+        for i in range(5):
+            self.write_file(f"good{i}.bin", bytes([i]) * (1000 + i))
+        bad = {self.write_file(f"bad{i}.bin", bytes([i]) * (1000 + i)) for i in range(5)}
+        a = self.write_file("a.bin", b"E" * 70000)
+        b = self.write_file("b.bin", b"E" * 70000)
+
+        engine = PigeonholeEngine()
+        calculate_block_hash = engine.prefilter_hasher.calculate_block_hash
+
+        def failing_block_hash(path, *args, **kwargs):
+            if path in bad:
+                raise ValueError("corrupt read")
+            return calculate_block_hash(path, *args, **kwargs)
+
+        engine.prefilter_hasher.calculate_block_hash = failing_block_hash
+        pipeline = ScanPipeline(engine, [self.test_dir], hash_workers=1)
+        results = []
+        runner = threading.Thread(target=lambda: results.append(pipeline.run()))
+        runner.start()
+        runner.join(10)
+        if runner.is_alive():
+            pipeline.stop()
+            runner.join()
+            self.fail("pipeline hung after a hashing error")
+
+        self.assertEqual(self.normalize(results[0]), {frozenset([a, b])})
+
+    def test_stop(self):
+        """Stopping from the progress callback ends the run early"""
+        for i in range(30):
+            self.write_file(f"sub{i}/file.bin", b"Z" * 1000)
+        for i in range(30):
+            os.makedirs(os.path.join(self.test_dir, f"sub{i}", "deeper"))
+
+        def slow_skip(name):
+            time.sleep(0.05)
+            return False
+
+        pipeline = ScanPipeline(PigeonholeEngine(), [self.test_dir], skip_dir=slow_skip,
+                                walk_workers=1)
+        pipeline.progress_callback = lambda percent, message: pipeline.stop()
+
+        start = time.monotonic()
+        result = pipeline.run()
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(result, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit Tests for the Process Pool Hashing Backend
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.batch_processor import SmartBatchManager
+from core.hash_cache import HashCache
+from core.hashing import FileHasher
+from core.process_hashing import ProcessHashPool
+
+class TestProcessHashing(unittest.TestCase):
+    """Test cases for ProcessHashPool"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessHashPool(workers=2, chunk_files=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(10):
+            path = os.path.join(self.test_dir, f"file{i}.bin")
+            with open(path, "wb") as f:
+                f.write(bytes([i % 3]) * (70000 + i * 1000))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_full_hashes_match_threads(self):
+        """Digests from worker processes match FileHasher, in input order"""
+        hasher = FileHasher('sha256')
+        missing = os.path.join(self.test_dir, "missing.bin")
+        paths = self.paths[:5] + [missing] + self.paths[5:]
+
+        results = list(hasher.map_hashes(paths, self.pool))
+
+        self.assertEqual([path for path, _ in results], paths)
+        self.assertIsNone(dict(results)[missing])
+        for path in self.paths:
+            self.assertEqual(dict(results)[path], FileHasher('sha256').calculate_hash(path))
+        self.assertEqual(hasher.io_stats['full_reads'], 10)
+
+    def test_block_hashes_match_threads(self):
+        """Screening positions send the same byte ranges calculate_block_hash reads"""
+        hasher = FileHasher('sha1')
+        for position in ('head', 'tail', 'samples'):
+            results = dict(hasher.map_hashes(self.paths, self.pool, position, 4096, 3))
+            for path in self.paths:
+                self.assertEqual(results[path], hasher.calculate_block_hash(path, position, 4096, 3))
+
+    def test_cache_and_known_hashes_skip_workers(self):
+        """Cached and already-known digests are answered without reading"""
+        cache = HashCache(os.path.join(self.test_dir, "cache.db"))
+        hasher = FileHasher('md5', cache=cache)
+        first = dict(hasher.map_hashes(self.paths, self.pool))
+        cache.flush()
+
+        rerun = FileHasher('md5', cache=cache)
+        known = {self.paths[0]: 'known'}
+        second = dict(rerun.map_hashes(self.paths, self.pool, known=known))
+        cache.close()
+
+        self.assertEqual(rerun.io_stats['full_reads'], 0)
+        self.assertEqual(second[self.paths[0]], 'known')
+        self.assertEqual(second[self.paths[1]], first[self.paths[1]])
+
+    def test_batch_hash_process_backend(self):
+        """SmartBatchManager groups the same duplicates with either backend"""
+        manager = SmartBatchManager()
+        threaded = manager.batch_hash(self.paths, 'sha256')
+        processes = manager.batch_hash(self.paths, 'sha256', backend='process')
+
+        self.assertEqual(processes['processed'], 10)
+        self.assertEqual(threaded['duplicate_groups'], processes['duplicate_groups'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit Tests for the Progress Reporter
+"""
+
+import unittest
+import os
+import sys
+import threading
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.progress import ProgressReporter, ProgressSnapshot, percent_callback
+from tests.helpers import FakeClock
+
+
+class TestProgressReporter(unittest.TestCase):
+    """Test cases for ProgressReporter"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.snapshots = []
+        self.reporter = ProgressReporter([self.snapshots.append], interval=0.1, clock=self.clock)
+
+    def test_poll_is_throttled(self):
+        """Snapshots are emitted at most once per interval"""
+        self.reporter.set_stage("Hashing", files_total=1000)
+        for _ in range(1000):
+            self.reporter.add(files=1)
+            self.reporter.poll()
+            self.clock.now += 0.001
+
+        self.assertEqual(len(self.snapshots), 10)
+        self.reporter.flush()
+        self.assertEqual(self.snapshots[-1].files_done, 1000)
+        self.assertEqual(self.snapshots[-1].percent, 100.0)
+
+    def test_counts_from_many_threads(self):
+        """Counters added from several threads are all accounted for"""
+        def work():
+            for _ in range(5000):
+                self.reporter.add(files=1, bytes_read=10)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.reporter.totals(), (20000, 200000))
+
+    def test_stage_percent_range(self):
+        """A stage's progress maps onto its share of the whole run"""
+        self.reporter.add(files=7)
+        self.reporter.set_stage("Full hash", files_total=10, start_percent=50.0, end_percent=100.0)
+        self.reporter.add(files=5)
+
+        snapshot = self.reporter.snapshot()
+        self.assertEqual(snapshot.stage, "Full hash")
+        self.assertEqual(snapshot.files_done, 5)
+        self.assertEqual(snapshot.percent, 75.0)
+
+    def test_throughput_and_eta(self):
+        """Throughput comes from the counters and the ETA prefers bytes"""
+        mb = 1024 * 1024
+        self.reporter.set_stage("Hashing", files_total=4, bytes_total=100 * mb)
+        self.clock.now = 2.0
+        self.reporter.add(files=1, bytes_read=20 * mb)
+
+        snapshot = self.reporter.snapshot()
+        self.assertAlmostEqual(snapshot.bytes_per_second, 10 * mb)
+        self.assertAlmostEqual(snapshot.eta, 8.0)
+        self.assertEqual(snapshot.message(), "Hashing 1/4 files, 10.0 MB/s, ETA 0:08")
+
+    def test_percent_callback_adapter(self):
+        """Snapshots can drive a classic progress_callback(percent, message)"""
+        events = []
+        reporter = ProgressReporter([percent_callback(lambda p, m: events.append((p, m)))],
+                                    clock=self.clock)
+        reporter.set_stage("Scanning")
+        reporter.add(files=3)
+        reporter.flush()
+
+        self.assertEqual(events, [(0.0, "Scanning 3 files")])
+
+    def test_failing_sink_does_not_stop_others(self):
+        """An exception in one sink does not keep snapshots from the rest"""
+        def broken(snapshot):
+            raise RuntimeError("sink failed")
+
+        reporter = ProgressReporter([broken, self.snapshots.append], clock=self.clock)
+        reporter.flush()
+
+        self.assertEqual(len(self.snapshots), 1)
+        self.assertIsInstance(self.snapshots[0], ProgressSnapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
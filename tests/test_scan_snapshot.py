@@ -0,0 +1,114 @@
+"""
+Unit Tests for Incremental Rescans from a Scan Snapshot
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import sys
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.file_scanner import FileScanner
+from core.pigeonhole_engine import PigeonholeEngine
+from core.scan_snapshot import ScanSnapshot
+from tests.helpers import TempFilesMixin
+
+OLD_MTIME_NS = 1_000_000_000_000_000_000
+
+class TestScanSnapshot(TempFilesMixin, unittest.TestCase):
+    """Test cases for ScanSnapshot and FileScanner.scan_incremental"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.a = self.write_file("docs/a.txt", b"same content")
+        self.b = self.write_file("docs/b.txt", b"same content")
+        self.c = self.write_file("media/c.bin", b"X" * 500)
+        self.age_directories()
+
+        self.scanner = FileScanner()
+        self.scanner.RACY_WINDOW_NS = 0
+        self.snapshot = ScanSnapshot()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def age_directories(self):
+        """Give every directory an old mtime so later changes are visible"""
+        for root, dirs, _ in os.walk(self.test_dir):
+            os.utime(root, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+    def scan(self):
+        """Incrementally scan the test directory and find duplicates"""
+        self.scanner.scan_incremental([self.test_dir], self.snapshot)
+        engine = PigeonholeEngine()
+        groups = engine.update_duplicates(self.scanner.get_file_groups_by_size(),
+                                          self.snapshot.duplicate_groups,
+                                          self.scanner.dirty_sizes,
+                                          file_info=self.scanner.scanned_files)
+        self.snapshot.duplicate_groups = groups
+        return engine, groups
+
+    def test_first_scan_matches_full_scan(self):
+        """Without a usable snapshot everything is scanned and dirty"""
+        files = self.scanner.scan_incremental([self.test_dir], self.snapshot)
+
+        self.assertIsNone(self.scanner.dirty_sizes)
+        self.assertEqual(files, FileScanner().scan_directory(self.test_dir))
+
+    def test_unchanged_tree_reads_nothing(self):
+        """A rescan of an unchanged tree keeps the old groups without any reads"""
+        _, first = self.scan()
+        engine, second = self.scan()
+
+        self.assertEqual(self.scanner.dirty_sizes, set())
+        self.assertEqual(second, first)
+        self.assertEqual(engine.get_optimization_stats()['files_processed'], 0)
+
+    def test_only_dirty_buckets_rechecked(self):
+        """New files only re-check their own size bucket"""
+        _, first = self.scan()
+        d = self.write_file("media/d.bin", b"X" * 500)
+
+        engine, groups = self.scan()
+
+        self.assertEqual(self.scanner.dirty_sizes, {500})
+        self.assertEqual(engine.get_optimization_stats()['files_processed'], 2)
+        normalized = {frozenset([original] + dups) for original, dups in groups.items()}
+        self.assertEqual(normalized, {frozenset([self.a, self.b]), frozenset([self.c, d])})
+
+    def test_removed_files_leave_groups(self):
+        """Deleting a duplicate drops its group from the merged result"""
+        self.scan()
+        os.remove(self.b)
+
+        _, groups = self.scan()
+
+        self.assertIn(len(b"same content"), self.scanner.dirty_sizes)
+        self.assertEqual(groups, {})
+
+    def test_save_and_load(self):
+        """A saved snapshot is reused by the next scan"""
+        self.scan()
+        path = os.path.join(self.test_dir, "snapshot.json")
+        self.snapshot.save(path)
+        os.utime(self.test_dir, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+        loaded = ScanSnapshot.load(path)
+        self.scanner.scan_incremental([self.test_dir], loaded)
+
+        self.assertEqual(loaded.file_count(), 3)
+        self.assertEqual(self.scanner.dirty_sizes, set())
+
+    def test_changed_filters_reset_snapshot(self):
+        """A snapshot taken with other filters is not reused"""
+        self.scan()
+        self.scanner.scan_incremental([self.test_dir], self.snapshot, extensions=['.txt'])
+
+        self.assertIsNone(self.scanner.dirty_sizes)
+        self.assertEqual(len(self.scanner.scanned_files), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,9 @@ Unit Tests for File Scanner
 import unittest
 import tempfile
 import os
+import contextlib
 from pathlib import Path
+from unittest import mock
 import sys
 
 # Add parent directory to path to import modules
@@ -13,6 +15,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.file_scanner import FileScanner
 from core.hashing import FileHasher
+from core.file_walker import walk_files, walk_files_parallel, normalize_roots
 
 class TestFileScanner(unittest.TestCase):
     """Test cases for FileScanner"""
@@ -67,6 +70,8 @@ class TestFileScanner(unittest.TestCase):
             self.assertIn('size', file_info)
             self.assertIn('path', file_info)
             self.assertIn('name', file_info)
+            self.assertIn('inode', file_info)
+            self.assertIn('device', file_info)
     
     def test_size_grouping(self):
         """Test file grouping by size"""
@@ -104,6 +109,133 @@ class TestFileScanner(unittest.TestCase):
         files = self.scanner.scan_directory(self.test_dir, max_size=file_size - 1)
         self.assertEqual(len(files), 0)
 
+    def test_hidden_directories_skipped(self):
+        """Hidden directories are pruned from the walk"""
+        hidden = os.path.join(self.test_dir, ".hidden")
+        os.makedirs(hidden)
+        with open(os.path.join(hidden, "secret.txt"), "wb") as f:
+            f.write(b"hidden")
+
+        files = self.scanner.scan_directory(self.test_dir)
+        self.assertEqual(len(files), 4)
+
+class TestFileWalker(unittest.TestCase):
+    """Test cases for the scandir-based walker"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for relative in ("a.txt", "b.jpg", "sub/c.txt", "sub/deeper/d.txt", "z/e.txt"):
+            path = os.path.join(self.test_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(relative.encode())
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir)
+
+    def test_matches_os_walk(self):
+        """The walker finds the same files as os.walk, with stat data"""
+        expected = set()
+        for root, _, files in os.walk(self.test_dir):
+            for name in files:
+                expected.add(os.path.join(root, name))
+
+        entries = list(walk_files(self.test_dir))
+
+        self.assertEqual({entry.path for entry in entries}, expected)
+        for entry in entries:
+            self.assertEqual(entry.size, os.path.getsize(entry.path))
+            self.assertEqual(entry.inode, os.stat(entry.path).st_ino)
+
+    def test_filters_and_progress(self):
+        """Extension filters apply and progress counts candidates in one pass"""
+        progress = []
+        entries = list(walk_files(self.test_dir, extensions={'.TXT'},
+                                  progress_callback=lambda seen, total: progress.append((seen, total))))
+
+        self.assertEqual(len(entries), 4)
+        self.assertEqual([seen for seen, _ in progress], [1, 2, 3, 4])
+        for seen, total in progress:
+            self.assertGreaterEqual(total, seen)
+
+    def test_parallel_walk_matches_serial(self):
+        """Parallel walking finds the same files in a deterministic order"""
+        serial = sorted(walk_files(self.test_dir))
+        parallel = list(walk_files_parallel([self.test_dir], workers=4))
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(list(walk_files_parallel([self.test_dir], workers=4)), parallel)
+
+    def test_overlapping_roots_walked_once(self):
+        """Repeated and nested roots do not produce duplicate entries"""
+        sub = os.path.join(self.test_dir, "sub")
+        roots = [sub, self.test_dir, self.test_dir + os.sep]
+
+        self.assertEqual(normalize_roots(roots), [self.test_dir])
+        entries = list(walk_files_parallel(roots, workers=3))
+        self.assertEqual(len(entries), 5)
+
+    def test_scanner_multiple_roots(self):
+        """scan_directories over several roots matches separate scans"""
+        scanner = FileScanner()
+        sub = os.path.join(self.test_dir, "sub")
+        z = os.path.join(self.test_dir, "z")
+
+        files = scanner.scan_directories([sub, z], workers=2)
+        expected = set(FileScanner().scan_directory(sub)) | set(FileScanner().scan_directory(z))
+
+        self.assertEqual(set(files), expected)
+        self.assertEqual(len(files), 3)
+
+    def zero_device_scandir(self):
+        """os.scandir whose entries stat like Windows DirEntry (st_dev and st_ino 0)"""
+        real_scandir = os.scandir
+
+        class Entry:
+            def __init__(self, entry):
+                self._entry = entry
+
+            def __getattr__(self, name):
+                return getattr(self._entry, name)
+
+            def stat(self):
+                st = self._entry.stat()
+                return os.stat_result((st.st_mode, 0, 0, st.st_nlink, st.st_uid, st.st_gid,
+                                       st.st_size, int(st.st_atime), int(st.st_mtime),
+                                       int(st.st_ctime)))
+
+        @contextlib.contextmanager
+        def scandir(path):
+            with real_scandir(path) as entries:
+                yield [Entry(entry) for entry in entries]
+
+        return scandir
+
+    def test_zero_device_is_restated(self):
+        """Files without a device number from DirEntry get it from a full stat"""
+        with mock.patch('os.scandir', self.zero_device_scandir()):
+            entries = list(walk_files(self.test_dir))
+
+        self.assertEqual(len(entries), 5)
+        for entry in entries:
+            stat = os.stat(entry.path)
+            self.assertEqual((entry.device, entry.inode), (stat.st_dev, stat.st_ino))
+
+    def test_unknown_identity(self):
+        """Without any device number the identity is recorded as unknown"""
+        real_stat = os.stat
+
+        def zero_device_stat(path, *args, **kwargs):
+            st = real_stat(path, *args, **kwargs)
+            return os.stat_result((st.st_mode, 1234, 0) + tuple(st)[3:10])
+
+        with mock.patch('os.scandir', self.zero_device_scandir()), \
+                mock.patch('os.stat', zero_device_stat):
+            entries = list(walk_files(self.test_dir))
+
+        self.assertEqual({(entry.device, entry.inode) for entry in entries}, {(0, 0)})
+
 class TestFileHasher(unittest.TestCase):
     """Test cases for FileHasher"""
     
@@ -125,6 +257,30 @@ class TestFileHasher(unittest.TestCase):
         self.assertEqual(len(file_hash), 32)  # MD5 hash length
         self.assertEqual(file_hash, self.hasher.calculate_hash(self.test_file.name))
     
+    def test_io_strategies_agree(self):
+        """Every read strategy produces the same digest"""
+        big_file = tempfile.NamedTemporaryFile(delete=False)
+        big_file.write(os.urandom(300000))
+        big_file.close()
+
+        try:
+            digests = set()
+            for strategy in ('read', 'readinto', 'mmap'):
+                hasher = FileHasher('sha256', chunk_size=4096, io_strategy=strategy)
+                digests.add(hasher.calculate_hash(big_file.name))
+            self.assertEqual(len(digests), 1)
+        finally:
+            os.unlink(big_file.name)
+
+    def test_adaptive_chunk_size(self):
+        """Large files are read in a bounded number of iterations"""
+        ten_gb = 10 * 1024 ** 3
+        chunk_size = self.hasher.select_chunk_size(ten_gb)
+
+        self.assertLessEqual(ten_gb // chunk_size, 4096)
+        self.assertEqual(self.hasher.select_chunk_size(100), self.hasher.chunk_size)
+        self.assertEqual(self.hasher.select_io_strategy(ten_gb), 'mmap')
+
     def test_quick_comparison(self):
         """Test quick file comparison"""
         # Create another file with same content
@@ -6,11 +6,17 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
 import threading
+import time
 import logging
 from pathlib import Path
 from ..core.file_scanner import FileScanner
 from ..core.pigeonhole_engine import PigeonholeEngine
 from ..core.duplicate_manager import DuplicateManager
+from ..core.hash_cache import HashCache
+from ..core.hashing import FileHasher
+from ..core.scan_snapshot import ScanSnapshot
+from ..core.live_index import LiveDuplicateIndex
+from ..core.pipeline import ScanPipeline
 from core.file_scanner import FileScanner
 from core.pigeonhole_engine import PigeonholeEngine
 from core.duplicate_manager import DuplicateManager
@@ -28,24 +34,33 @@ logger = logging.getLogger(__name__)
 class MainWindow(ctk.CTk):
     """Main application window with all advanced features"""
     
+    # Streamed result groups handed to the UI thread at once
+    STREAM_BATCH_GROUPS = 50
+    
     def __init__(self):
         super().__init__()
         
         # Initialize components
         self.config = Config()
+        self.hash_cache = HashCache() if self.config.get('scanning.use_hash_cache', True) else None
         self.scanner = FileScanner()
-        self.engine = PigeonholeEngine()
+        self.engine = PigeonholeEngine(hash_cache=self.hash_cache)
         self.manager = DuplicateManager()
         self.scanner = FileScanner()
-        self.engine = PigeonholeEngine()
+        self.engine = PigeonholeEngine(hash_cache=self.hash_cache)
         self.manager = DuplicateManager()
         self.batch_manager = SmartBatchManager()
         
         # UI state
         self.is_scanning = False
+        self.active_pipeline = None
+        self._pending_progress = None
+        self._progress_lock = threading.Lock()
         self.is_monitoring = False
         self.current_directory = ""
         self.duplicate_groups = {}
+        self.live_index = None
+        self.last_scan_filters = (None, 0, 0)
         
         self.setup_window()
         self.create_widgets()
@@ -254,7 +269,7 @@ class MainWindow(ctk.CTk):
         self.algo_var = ctk.StringVar(value=self.config.get('scanning.default_algorithm', 'md5'))
         algo_menu = ctk.CTkOptionMenu(
             algo_frame, 
-            values=["md5", "sha1", "sha256", "sha512", "blake2b"],
+            values=list(FileHasher.HASH_ALGORITHMS.keys()),
             variable=self.algo_var
         )
         algo_menu.pack(fill="x", pady=2)
@@ -494,13 +509,34 @@ class MainWindow(ctk.CTk):
             
     def start_scan(self):
         """Start duplicate file scan"""
-        directory = self.dir_entry.get().strip()
-        if not directory or not os.path.exists(directory):
+        # Several roots may be given, separated by os.pathsep
+        directories = [d.strip() for d in self.dir_entry.get().split(os.pathsep) if d.strip()]
+        if not directories:
             messagebox.showerror("Error", "Please select a valid directory")
             return
+        for directory in directories:
+            if not os.path.exists(directory):
+                messagebox.showerror("Error", f"Please select a valid directory:\n{directory}")
+                return
         
         # Update engine with selected algorithm
-        self.engine = PigeonholeEngine(self.algo_var.get())
+        self.engine = PigeonholeEngine(
+            self.algo_var.get(),
+            hash_cache=self.hash_cache,
+            workers=self.config.get('scanning.hash_workers', 4),
+            stages=self.config.get('scanning.hash_stages', PigeonholeEngine.SCREENING_STAGES),
+            block_size=self.config.get('scanning.block_size', 65536),
+            sample_blocks=self.config.get('scanning.sample_blocks', 4),
+            prefilter_algorithm=self.config.get('scanning.prefilter_algorithm', 'auto'),
+            chunk_size=self.config.get('scanning.chunk_size', 8192),
+            io_strategy=self.config.get('scanning.io_strategy', 'auto'),
+            compare_strategy=self.config.get('scanning.compare_strategy', 'hash'),
+            direct_compare_max=self.config.get('scanning.direct_compare_max', 3),
+            executor=self.config.get('scanning.hash_executor', 'thread'),
+            autotune=self.config.get('scanning.autotune_io', False),
+            device_scheduling=self.config.get('scanning.device_scheduling', False),
+            rotational_workers=self.config.get('scanning.rotational_workers', 1)
+        )
         
         # Parse options
         min_size = self.parse_size_input(self.min_size.get())
@@ -523,7 +559,7 @@ class MainWindow(ctk.CTk):
         
         thread = threading.Thread(
             target=self._scan_thread,
-            args=(directory, extensions, min_size, max_size)
+            args=(directories, extensions, min_size, max_size)
         )
         thread.daemon = True
         thread.start()
@@ -531,6 +567,8 @@ class MainWindow(ctk.CTk):
     def stop_scan(self):
         """Stop current scan"""
         self.is_scanning = False
+        if self.active_pipeline is not None:
+            self.active_pipeline.stop()
         self.scan_btn.configure(state="normal")
         self.stop_btn.configure(state="disabled")
         self.update_status("Scan stopped by user")
@@ -546,14 +584,18 @@ class MainWindow(ctk.CTk):
             # Start monitoring
             try:
                 self.scanner.start_monitoring(directory, self._monitoring_callback)
+                self._seed_live_index()
                 self.is_monitoring = True
                 self.monitor_btn.configure(text="👁️ Stop Monitoring", fg_color=Styles.COLOR_DANGER)
                 self.update_status(f"Started monitoring: {directory}")
             except Exception as e:
                 messagebox.showerror("Monitoring Error", f"Could not start monitoring: {e}")
         else:
-            # Stop monitoring
+            # Stop monitoring; the live index goes stale from here on
             self.scanner.stop_monitoring()
+            if self.live_index is not None:
+                self.live_index.stop()
+                self.live_index = None
             self.is_monitoring = False
             self.monitor_btn.configure(text="👁️ Start Monitoring", fg_color=Styles.COLOR_SECONDARY)
             self.update_status("Stopped directory monitoring")
@@ -563,62 +605,232 @@ class MainWindow(ctk.CTk):
         message = f"File {event_type}: {os.path.basename(file_path)}"
         self.after(0, lambda: self.update_status(message))
         
-    def _scan_thread(self, directory, extensions, min_size, max_size):
+        if self.live_index is not None:
+            self.live_index.on_event(event_type, file_path)
+        
+    def _seed_live_index(self):
+        """Build the live index from the last scan so monitoring keeps its results current"""
+        if self.live_index is not None:
+            self.live_index.stop()
+            self.live_index = None
+        if not len(self.scanner.file_table):
+            return
+        
+        extensions, min_size, max_size = self.last_scan_filters
+        self.live_index = LiveDuplicateIndex(self.engine.hasher, extensions, min_size, max_size,
+                                             on_update=self._live_index_callback)
+        self.live_index.load(self.scanner.scanned_files, self.duplicate_groups)
+        
+    def _live_index_callback(self, changed_paths):
+        """Live index applied a batch of changes (runs on the index's thread)"""
+        self.after(0, self._refresh_live_results)
+        
+    def _refresh_live_results(self):
+        """Show the live index's current duplicates without rescanning"""
+        if self.is_scanning or self.live_index is None:
+            return
+        
+        self.duplicate_groups = self.live_index.get_duplicates()
+        self.manager.set_duplicates(self.duplicate_groups)
+        self.results_panel.update_results(self.manager.duplicate_groups)
+        
+        stats = self.manager.get_duplicate_stats()
+        self.stats_labels["Duplicate Groups"].configure(text=str(stats['total_groups']))
+        self.stats_labels["Space Wasted"].configure(text=f"{stats['wasted_space'] / (1024*1024):.1f} MB")
+        self.update_status(f"Live update: {stats['total_duplicates']} duplicate files")
+        
+    def _scan_thread(self, directories, extensions, min_size, max_size):
         """Scan thread function"""
-        import time
         start_time = time.time()
         
         try:
+            incremental = self.config.get('scanning.incremental_scan', False)
+            # Direct compare, process hashing, I/O autotuning and device
+            # scheduling need the sequential engine path
+            pipelined = (not incremental and self.config.get('scanning.pipelined_scan', True)
+                         and ScanPipeline.supports(self.engine))
+            if pipelined:
+                # Walk, size-bucket and hash concurrently; groups stream in as buckets settle
+                self.update_status("Scanning and hashing...")
+                pipeline = self.scanner.scan_pipeline(
+                    directories, self.engine, extensions, min_size, max_size,
+                    workers=self.config.get('scanning.scan_workers', 1),
+                    progress_callback=self._scan_progress_callback
+                )
+                self.active_pipeline = pipeline
+                try:
+                    duplicate_groups = self._stream_duplicates(pipeline.stream())
+                finally:
+                    self.active_pipeline = None
+                if not self.is_scanning:
+                    return
+                self._finish_scan(duplicate_groups, extensions, min_size, max_size,
+                                  start_time, streamed=True)
+                return
+            
             # Step 1: File scanning
             self.update_status("Scanning directory structure...")
-            files = self.scanner.scan_directory(directory, extensions, min_size, max_size)
+            if incremental:
+                filters = ScanSnapshot.make_filters(extensions, min_size, max_size)
+                snapshot_path = ScanSnapshot.default_path(directories, filters)
+                snapshot = ScanSnapshot.load(snapshot_path) or ScanSnapshot()
+                files = self.scanner.scan_incremental(directories, snapshot, extensions,
+                                                      min_size, max_size)
+            else:
+                files = self.scanner.scan_directories(
+                    directories, extensions, min_size, max_size,
+                    workers=self.config.get('scanning.scan_workers', 1),
+                    progress_callback=self._scan_progress_callback
+                )
             
             if not self.is_scanning:
                 return
                 
-            # Step 2: Group by size (pigeonhole principle)
+            # Step 2: Group by size (pigeonhole principle); file ids keep
+            # paths out of memory until a window of files is hashed
             self.update_status("Applying pigeonhole principle optimization...")
-            size_groups = self.scanner.get_file_groups_by_size()
+            if incremental:
+                size_groups = self.scanner.get_file_groups_by_size()
+            else:
+                size_groups = self.scanner.get_file_id_groups_by_size()
             
             if not self.is_scanning:
                 return
                 
-            # Step 3: Find duplicates
+            # Step 3: Find duplicates (only changed size buckets when incremental)
             self.update_status("Finding duplicate files...")
-            duplicate_groups = self.engine.find_duplicates(
-                size_groups,
-                progress_callback=self._scan_progress_callback
-            )
+            if incremental:
+                duplicate_groups = self.engine.update_duplicates(
+                    size_groups,
+                    snapshot.duplicate_groups,
+                    self.scanner.dirty_sizes,
+                    progress_callback=self._scan_progress_callback,
+                    file_info=self.scanner.scanned_files,
+                    previous_hardlinks=snapshot.hardlink_groups
+                )
+            else:
+                # Stream confirmed groups into the results panel while hashing continues
+                duplicate_groups = self._stream_duplicates(self._iter_engine_groups(size_groups))
             
             if not self.is_scanning:
                 return
-                
-            # Step 4: Update UI with results
-            self.duplicate_groups = duplicate_groups
-            scan_time = time.time() - start_time
             
-            self.after(0, lambda: self._scan_complete(scan_time))
+            if incremental:
+                snapshot.duplicate_groups = duplicate_groups
+                snapshot.hardlink_groups = self.engine.get_hardlink_groups()
+                snapshot.save(snapshot_path)
+                
+            self._finish_scan(duplicate_groups, extensions, min_size, max_size,
+                              start_time, streamed=not incremental)
             
         except Exception as e:
             logger.error(f"Scan error: {e}")
             self.after(0, lambda: self._scan_error(str(e)))
     
+    def _finish_scan(self, duplicate_groups, extensions, min_size, max_size, start_time, streamed):
+        """Step 4: Update UI with results"""
+        self.duplicate_groups = duplicate_groups
+        self.last_scan_filters = (extensions, min_size, max_size)
+        scan_time = time.time() - start_time
+        
+        self.after(0, lambda: self._scan_complete(scan_time, streamed=streamed))
+    
+    def _iter_engine_groups(self, size_groups):
+        """Run the engine over file id groups, yielding path groups"""
+        file_table = self.scanner.file_table
+        for original_id, duplicate_ids in self.engine.iter_duplicates(
+                size_groups,
+                progress_callback=self._scan_progress_callback,
+                file_info=file_table):
+            yield (file_table.path_of(original_id),
+                   [file_table.path_of(file_id) for file_id in duplicate_ids])
+    
+    def _stream_duplicates(self, groups):
+        """
+        Consume a stream of confirmed groups, handing batches to the UI thread
+        
+        Args:
+            groups: Iterator of (original, duplicates); closed early if the scan is stopped
+        
+        Returns:
+            Dictionary of original -> duplicates for everything found
+        """
+        self.after(0, self._begin_streamed_results)
+        
+        duplicate_groups = {}
+        batch = []
+        last_flush = time.time()
+        try:
+            for original, duplicates in groups:
+                if not self.is_scanning:
+                    break
+                duplicate_groups[original] = duplicates
+                batch.append((original, duplicates))
+                
+                if len(batch) >= self.STREAM_BATCH_GROUPS or time.time() - last_flush >= 0.25:
+                    self.after(0, lambda groups=batch: self._add_streamed_results(groups))
+                    batch = []
+                    last_flush = time.time()
+        finally:
+            groups.close()
+        
+        if batch:
+            self.after(0, lambda groups=batch: self._add_streamed_results(groups))
+        return duplicate_groups
+    
+    def _begin_streamed_results(self):
+        """Clear results before streamed groups arrive"""
+        self.manager.set_duplicates({})
+        # The scan's file table is still being filled; visible rows stat instead
+        self.results_panel.set_file_info(None)
+        self.results_panel.begin_results()
+    
+    def _add_streamed_results(self, groups):
+        """Show a batch of confirmed groups; they can be acted on right away"""
+        for original, duplicates in groups:
+            self.manager.duplicate_groups[original] = duplicates
+        self.results_panel.add_groups(groups)
+        self.stats_labels["Duplicate Groups"].configure(text=str(len(self.manager.duplicate_groups)))
+    
     def _scan_progress_callback(self, progress, message):
-        """Update scan progress"""
+        """Update scan progress; updates arriving before the UI caught up are coalesced"""
         if self.is_scanning:
-            self.after(0, lambda: self.update_status(f"{message} - {progress:.1f}%"))
-            self.after(0, lambda: self.status_progress.set(progress / 100))
+            with self._progress_lock:
+                pending = self._pending_progress
+                self._pending_progress = (progress, message)
+            if pending is None:
+                self.after(0, self._apply_scan_progress)
+    
+    def _apply_scan_progress(self):
+        """Show the latest progress posted by the scan thread"""
+        with self._progress_lock:
+            latest, self._pending_progress = self._pending_progress, None
+        if latest is None or not self.is_scanning:
+            return
+        progress, message = latest
+        self.update_status(f"{message} - {progress:.1f}%")
+        self.status_progress.set(progress / 100)
     
-    def _scan_complete(self, scan_time):
+    def _scan_complete(self, scan_time, streamed=False):
         """Handle scan completion"""
         self.is_scanning = False
         self.scan_btn.configure(state="normal")
         self.stop_btn.configure(state="disabled")
         self.status_progress.set(0)
         
-        # Update results panel
-        self.manager.set_duplicates(self.duplicate_groups)
-        self.results_panel.update_results(self.manager.duplicate_groups)
+        # Update results panel (streamed groups are already shown and may
+        # have been acted on, so the manager's view is the current one)
+        self.results_panel.set_file_info(self.scanner.scanned_files)
+        if streamed:
+            self.duplicate_groups = self.manager.duplicate_groups
+            if not self.duplicate_groups:
+                self.results_panel.update_results(self.duplicate_groups)
+        else:
+            self.manager.set_duplicates(self.duplicate_groups)
+            self.results_panel.update_results(self.manager.duplicate_groups)
+        
+        if self.is_monitoring:
+            self._seed_live_index()
         
         # Update statistics
         stats = self.manager.get_duplicate_stats()
@@ -636,7 +848,11 @@ class MainWindow(ctk.CTk):
         # Update stats panel
         self.stats_panel.update_stats(stats, self.engine.get_optimization_stats())
         
-        self.update_status(f"Scan complete! Found {stats['total_duplicates']} duplicate files in {scan_time:.1f}s.")
+        status = f"Scan complete! Found {stats['total_duplicates']} duplicate files in {scan_time:.1f}s."
+        linked = self.engine.get_optimization_stats()['hardlinks_collapsed']
+        if linked:
+            status += f" {linked} paths are already hardlinked and were skipped."
+        self.update_status(status)
         
         # Show notification
         if stats['total_duplicates'] > 0:
@@ -700,7 +916,7 @@ class MainWindow(ctk.CTk):
         """Show tools menu options"""
         menu = ctk.CTkToplevel(self)
         menu.title("Tools Menu")
-        menu.geometry("220x180")
+        menu.geometry("220x210")
         menu.transient(self)
         menu.grab_set()
         
@@ -710,6 +926,7 @@ class MainWindow(ctk.CTk):
         ctk.CTkButton(menu, text="File Preview", command=lambda: self.menu_action("preview")).pack(fill="x", pady=2)
         ctk.CTkButton(menu, text="Clean Empty Folders", command=lambda: self.menu_action("clean_folders")).pack(fill="x", pady=2)
         ctk.CTkButton(menu, text="Disk Space Analyzer", command=lambda: self.menu_action("disk_analyzer")).pack(fill="x", pady=2)
+        ctk.CTkButton(menu, text="Compact Hash Cache", command=lambda: self.menu_action("compact_cache")).pack(fill="x", pady=2)
         ctk.CTkButton(menu, text="System Information", command=lambda: self.menu_action("system_info")).pack(fill="x", pady=2)
         
     def show_view_menu(self):
@@ -753,6 +970,8 @@ class MainWindow(ctk.CTk):
             self.preview_selected_files()
         elif action == "clean_folders":
             self.clean_empty_directories()
+        elif action == "compact_cache":
+            self.compact_hash_cache()
         elif action == "system_info":
             self.show_system_info()
         elif action == "about":
@@ -876,6 +1095,15 @@ class MainWindow(ctk.CTk):
         except Exception as e:
             messagebox.showerror("Cleanup Error", f"Error during cleanup:\n{str(e)}")
     
+    def compact_hash_cache(self):
+        """Drop hash cache entries for files that changed or disappeared"""
+        if self.hash_cache is None:
+            messagebox.showinfo("Hash Cache", "The hash cache is disabled in the settings.")
+            return
+        
+        removed = self.hash_cache.compact()
+        self.update_status(f"Hash cache compacted: removed {removed} stale entries")
+    
     def find_empty_directories(self, directory):
         """Recursively find empty directories"""
         empty_dirs = []
@@ -917,7 +1145,7 @@ class MainWindow(ctk.CTk):
             "Pigeonhole Principle for optimal performance.\n\n"
             "Features:\n"
             "• Mathematical optimization using Pigeonhole Principle\n"
-            "• Multiple hash algorithms (MD5, SHA1, SHA256, SHA512, BLAKE2b)\n"
+            "• Multiple hash algorithms (MD5, SHA1, SHA256, SHA512, BLAKE2b, xxHash3, BLAKE3)\n"
             "• Real-time directory monitoring\n"
             "• Batch file operations\n"
             "• Advanced file preview\n"
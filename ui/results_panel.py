@@ -5,6 +5,9 @@ Results Panel for Displaying and Managing Duplicates
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from pathlib import Path
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
 import os
 from ..core.duplicate_manager import DuplicateManager
 from .styles import Styles
@@ -12,14 +15,149 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+class ResultRows:
+    """
+    Flat row index over duplicate groups
+    
+    Every group is a header row for its original followed by one row per
+    duplicate. Only the first row of each group is stored, so row lookups
+    are a bisect and adding a group costs the same however big it is.
+    """
+    
+    def __init__(self):
+        self.originals = []
+        self.duplicates = []
+        self._starts = array('q')
+        self.total = 0
+    
+    def __len__(self):
+        return len(self.originals)
+    
+    def add(self, original, duplicates):
+        """Append a group"""
+        self._starts.append(self.total)
+        self.originals.append(original)
+        self.duplicates.append(duplicates)
+        self.total += 1 + len(duplicates)
+    
+    def extend(self, duplicate_groups):
+        """Append every group of an original -> duplicates dictionary"""
+        # Keys and values are copied as lists; building a tuple per group
+        # would wake the garbage collector thousands of times
+        duplicate_lists = list(duplicate_groups.values())
+        starts = list(accumulate([1 + len(duplicates) for duplicates in duplicate_lists],
+                                 initial=self.total))
+        self.total = starts.pop()
+        self._starts.extend(starts)
+        self.originals.extend(duplicate_groups)
+        self.duplicates.extend(duplicate_lists)
+    
+    def row(self, index):
+        """
+        Look up one row
+        
+        Returns:
+            Tuple of (group index, file path, is_header)
+        """
+        group_index = bisect_right(self._starts, index) - 1
+        offset = index - self._starts[group_index]
+        if offset == 0:
+            return group_index, self.originals[group_index], True
+        return group_index, self.duplicates[group_index][offset - 1], False
+
+
+class ResultRow(ctk.CTkFrame):
+    """One recycled row widget, showing either a group header or a duplicate"""
+    
+    def __init__(self, parent, panel):
+        super().__init__(parent, fg_color="transparent", corner_radius=0)
+        self.panel = panel
+        self.file_path = None
+        self.kind = None
+        self.visible = False
+        
+        self.checkbox_var = ctk.BooleanVar()
+        self.checkbox = ctk.CTkCheckBox(
+            self,
+            text="",
+            variable=self.checkbox_var,
+            command=self._on_toggle,
+            width=20
+        )
+        self.title_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.detail_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=Styles.FONT_SMALL,
+            text_color=Styles.COLOR_TEXT_SECONDARY,
+            anchor="w"
+        )
+        
+        self.checkbox.grid(row=0, column=0, rowspan=2, padx=(10, 10))
+        self.title_label.grid(row=0, column=1, sticky="ew", padx=(0, 10))
+        self.detail_label.grid(row=1, column=1, sticky="ew", padx=(0, 10))
+        self.grid_columnconfigure(1, weight=1)
+    
+    def show_header(self, file_path, size):
+        """Show a group's original"""
+        if self.kind != 'header':
+            self.kind = 'header'
+            self.configure(fg_color=Styles.COLOR_GROUP_HEADER)
+            self.checkbox.grid_remove()
+            self.title_label.configure(font=Styles.FONT_BOLD)
+        
+        self.file_path = None
+        path = Path(file_path)
+        self.title_label.configure(text=f"Original: {path.name}")
+        self.detail_label.configure(text=f"Size: {size / (1024 * 1024):.2f} MB | Path: {path.parent}")
+    
+    def show_duplicate(self, file_path, size, selected):
+        """Show a selectable duplicate"""
+        if self.kind != 'duplicate':
+            self.kind = 'duplicate'
+            self.configure(fg_color="transparent")
+            self.checkbox.grid()
+            self.title_label.configure(font=Styles.FONT_NORMAL)
+        
+        self.file_path = file_path
+        self.checkbox_var.set(selected)
+        path = Path(file_path)
+        self.title_label.configure(text=path.name)
+        self.detail_label.configure(text=f"Path: {path.parent} | Size: {size / (1024 * 1024):.2f} MB")
+    
+    def _on_toggle(self):
+        if self.file_path is not None:
+            self.panel.toggle_file_selection(self.file_path, self.checkbox_var.get())
+
+
 class ResultsPanel(ctk.CTkFrame):
-    """Panel for displaying and managing duplicate files"""
+    """
+    Panel for displaying and managing duplicate files
+    
+    The list is virtualized: only enough row widgets to fill the viewport
+    are created, and scrolling rebinds them to other rows. Sizes come from
+    the scan's file table (see set_file_info), so nothing is statted for
+    rows that are never shown.
+    """
+    
+    ROW_HEIGHT = 46
+    # Rows moved per mouse wheel notch
+    SCROLL_ROWS = 3
     
     def __init__(self, parent, duplicate_manager: DuplicateManager):
         super().__init__(parent)
         self.manager = duplicate_manager
         self.duplicate_groups = {}
         self.selected_files = set()
+        self.file_info = None
+        
+        self.rows = ResultRows()
+        self._group_sizes = []
+        self._selected_bytes = 0
+        self._first_row = 0
+        self._visible_rows = 0
+        self._row_widgets = []
         
         self.setup_ui()
         
@@ -79,172 +217,121 @@ class ResultsPanel(ctk.CTkFrame):
         
     def create_results_display(self):
         """Create the main results display area"""
-        # Create scrollable frame
-        self.scrollable_frame = ctk.CTkScrollableFrame(self)
-        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        list_frame = ctk.CTkFrame(self)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.scrollbar = ctk.CTkScrollbar(list_frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.viewport = ctk.CTkFrame(list_frame, fg_color="transparent")
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.viewport.bind("<Configure>", self._on_viewport_resize)
+        self._bind_mousewheel(self.viewport)
         
         # Initial message
         self.initial_label = ctk.CTkLabel(
-            self.scrollable_frame,
+            self.viewport,
             text="No duplicates found. Run a scan to see results.",
             font=Styles.FONT_NORMAL,
             text_color=Styles.COLOR_TEXT_SECONDARY
         )
-        self.initial_label.pack(pady=50)
+        self._show_message("No duplicates found. Run a scan to see results.",
+                           Styles.COLOR_TEXT_SECONDARY)
+        
+    def set_file_info(self, file_info):
+        """
+        Use a scan's path -> info mapping (e.g. FileScanner.scanned_files) for file sizes
+        
+        Pass None while that mapping is still being filled; visible rows
+        then fall back to os.stat.
+        """
+        self.file_info = file_info
         
     def update_results(self, duplicate_groups):
         """Update the results display with new duplicate groups"""
+        self._reset_rows()
         self.duplicate_groups = duplicate_groups
-        self.selected_files.clear()
-        
-        # Clear existing results
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
         
         if not duplicate_groups:
-            self.initial_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text="No duplicates found!",
-                font=Styles.FONT_NORMAL,
-                text_color=Styles.COLOR_SUCCESS
-            )
-            self.initial_label.pack(pady=50)
-            return
-        
-        # Create results for each duplicate group
-        for i, (original, duplicates) in enumerate(duplicate_groups.items()):
-            self.create_duplicate_group(i, original, duplicates)
+            self._show_message("No duplicates found!", Styles.COLOR_SUCCESS)
+        else:
+            self.initial_label.place_forget()
+            self.rows.extend(duplicate_groups)
+            self._group_sizes = [None] * len(self.rows)
         
+        self._render()
         self.update_selection_display()
         
-    def create_duplicate_group(self, group_id, original, duplicates):
-        """Create UI for a single duplicate group"""
-        group_frame = ctk.CTkFrame(self.scrollable_frame, border_width=1, border_color=Styles.COLOR_BORDER)
-        group_frame.pack(fill="x", padx=5, pady=5)
-        
-        # Group header
-        header_frame = ctk.CTkFrame(group_frame, fg_color=Styles.COLOR_GROUP_HEADER)
-        header_frame.pack(fill="x", padx=1, pady=1)
-        
-        # Original file info
-        orig_info = self.get_file_info(original)
-        
-        header_content = ctk.CTkFrame(header_frame, fg_color="transparent")
-        header_content.pack(fill="x", padx=10, pady=5)
-        
-        ctk.CTkLabel(
-            header_content,
-            text=f"Original: {orig_info['name']}",
-            font=Styles.FONT_BOLD,
-            anchor="w"
-        ).pack(fill="x")
-        
-        info_text = f"Size: {orig_info['size_mb']:.2f} MB | Path: {orig_info['path']}"
-        ctk.CTkLabel(
-            header_content,
-            text=info_text,
-            font=Styles.FONT_SMALL,
-            text_color=Styles.COLOR_TEXT_SECONDARY,
-            anchor="w"
-        ).pack(fill="x")
-        
-        # Duplicates list
-        for duplicate in duplicates:
-            self.create_duplicate_item(group_frame, duplicate)
-    
-    def create_duplicate_item(self, parent, file_path):
-        """Create UI for a single duplicate file"""
-        item_frame = ctk.CTkFrame(parent, fg_color="transparent")
-        item_frame.pack(fill="x", padx=10, pady=2)
-        
-        file_info = self.get_file_info(file_path)
-        
-        # Checkbox for selection
-        var = ctk.BooleanVar()
-        checkbox = ctk.CTkCheckBox(
-            item_frame,
-            text="",
-            variable=var,
-            command=lambda p=file_path, v=var: self.toggle_file_selection(p, v),
-            width=20
-        )
-        checkbox.pack(side="left", padx=(0, 10))
+    def begin_results(self):
+        """Clear the display before groups are streamed in with add_groups"""
+        self._reset_rows()
+        self.duplicate_groups = {}
+        self._show_message("Searching for duplicates...", Styles.COLOR_TEXT_SECONDARY)
+        self._render()
+        self.update_selection_display()
         
-        # File info
-        info_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
-        info_frame.pack(side="left", fill="x", expand=True)
+    def add_groups(self, groups):
+        """Append confirmed (original, duplicates) groups while a scan is still running"""
+        if not groups:
+            return
         
-        ctk.CTkLabel(
-            info_frame,
-            text=file_info['name'],
-            font=Styles.FONT_NORMAL,
-            anchor="w"
-        ).pack(fill="x")
+        if not self.duplicate_groups:
+            self.initial_label.place_forget()
         
-        path_text = f"Path: {file_info['path']} | Size: {file_info['size_mb']:.2f} MB"
-        ctk.CTkLabel(
-            info_frame,
-            text=path_text,
-            font=Styles.FONT_SMALL,
-            text_color=Styles.COLOR_TEXT_SECONDARY,
-            anchor="w"
-        ).pack(fill="x")
+        for original, duplicates in groups:
+            self.duplicate_groups[original] = duplicates
+            self.rows.add(original, duplicates)
+            self._group_sizes.append(None)
+        self._render()
         
-        # Store reference to checkbox
-        item_frame.checkbox_var = var
-        item_frame.file_path = file_path
-    
     def get_file_info(self, file_path):
         """Get formatted file information"""
-        stat = os.stat(file_path)
+        size = self._file_size(file_path)
+        info = self.file_info.get(file_path) if self.file_info is not None else None
+        if info is not None:
+            modified = info['modified']
+        else:
+            try:
+                modified = os.stat(file_path).st_mtime
+            except OSError:
+                modified = 0
         return {
             'name': Path(file_path).name,
             'path': str(Path(file_path).parent),
-            'size': stat.st_size,
-            'size_mb': stat.st_size / (1024 * 1024),
-            'modified': stat.st_mtime
+            'size': size,
+            'size_mb': size / (1024 * 1024),
+            'modified': modified
         }
     
-    def toggle_file_selection(self, file_path, var):
+    def toggle_file_selection(self, file_path, selected):
         """Toggle file selection"""
-        if var.get():
+        if selected and file_path not in self.selected_files:
             self.selected_files.add(file_path)
-        else:
+            self._selected_bytes += self._file_size(file_path)
+        elif not selected and file_path in self.selected_files:
             self.selected_files.discard(file_path)
+            self._selected_bytes -= self._file_size(file_path)
         
         self.update_selection_display()
     
     def select_all_duplicates(self):
         """Select all duplicate files"""
         self.selected_files.clear()
-        for original, duplicates in self.duplicate_groups.items():
+        self._selected_bytes = 0
+        # Files in a group share one size, so one lookup per group is enough
+        for group_index, duplicates in enumerate(self.rows.duplicates):
             self.selected_files.update(duplicates)
+            self._selected_bytes += self._group_size(group_index) * len(duplicates)
         
-        # Update all checkboxes
-        for widget in self.scrollable_frame.winfo_children():
-            if hasattr(widget, 'winfo_children'):
-                for child in widget.winfo_children():
-                    if hasattr(child, 'checkbox_var') and hasattr(child, 'file_path'):
-                        if child.file_path in self.selected_files:
-                            child.checkbox_var.set(True)
-                        else:
-                            child.checkbox_var.set(False)
-        
+        self._render()
         self.update_selection_display()
     
     def update_selection_display(self):
         """Update selection information and button states"""
         selected_count = len(self.selected_files)
-        total_size = 0
-        for f in self.selected_files:
-            try:
-                total_size += os.path.getsize(f)
-            except Exception:
-                # ignore files we can't stat
-                continue
         
         self.selection_label.configure(
-            text=f"Selected: {selected_count} files ({total_size / (1024*1024):.1f} MB)"
+            text=f"Selected: {selected_count} files ({self._selected_bytes / (1024*1024):.1f} MB)"
         )
         
         # Enable/disable buttons based on selection
@@ -252,6 +339,108 @@ class ResultsPanel(ctk.CTkFrame):
         self.delete_btn.configure(state=state)
         self.move_btn.configure(state=state)
     
+    def _reset_rows(self):
+        """Drop all rows and the selection"""
+        self.rows = ResultRows()
+        self._group_sizes = []
+        self.selected_files.clear()
+        self._selected_bytes = 0
+        self._first_row = 0
+    
+    def _show_message(self, text, color):
+        """Show a message in place of the (empty) list"""
+        self.initial_label.configure(text=text, text_color=color)
+        self.initial_label.place(relx=0.5, y=50, anchor="n")
+    
+    def _file_size(self, file_path):
+        """Size from the scan's file table, or os.stat for files it does not know"""
+        if self.file_info is not None:
+            info = self.file_info.get(file_path)
+            if info is not None:
+                return info['size']
+        try:
+            return os.stat(file_path).st_size
+        except OSError as e:
+            logger.debug(f"Could not stat {file_path}: {e}")
+            return 0
+    
+    def _group_size(self, group_index):
+        """Size shared by a group's files, looked up once"""
+        size = self._group_sizes[group_index]
+        if size is None:
+            size = self._file_size(self.rows.originals[group_index])
+            self._group_sizes[group_index] = size
+        return size
+    
+    def _on_viewport_resize(self, event):
+        """Grow the widget pool to cover the new viewport height"""
+        self._visible_rows = event.height // self.ROW_HEIGHT + 1
+        while len(self._row_widgets) < self._visible_rows:
+            row = ResultRow(self.viewport, self)
+            self._bind_mousewheel(row)
+            self._row_widgets.append(row)
+        self._render()
+    
+    def _bind_mousewheel(self, widget):
+        """Scroll the list from the wheel over a widget and its children"""
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_mousewheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_mousewheel(child)
+    
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._scroll_to(self._first_row - self.SCROLL_ROWS)
+        else:
+            self._scroll_to(self._first_row + self.SCROLL_ROWS)
+    
+    def _on_scrollbar(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', amount, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * self.rows.total))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self._visible_rows
+            self._scroll_to(self._first_row + amount)
+    
+    def _scroll_to(self, first_row):
+        last_first = self.rows.total - self._visible_rows + 1
+        if first_row > last_first:
+            first_row = last_first
+        if first_row < 0:
+            first_row = 0
+        if first_row != self._first_row:
+            self._first_row = first_row
+            self._render()
+    
+    def _render(self):
+        """Bind the pooled row widgets to the rows in the viewport"""
+        total = self.rows.total
+        for slot, widget in enumerate(self._row_widgets):
+            index = self._first_row + slot
+            if slot >= self._visible_rows or index >= total:
+                if widget.visible:
+                    widget.place_forget()
+                    widget.visible = False
+                continue
+            
+            group_index, file_path, is_header = self.rows.row(index)
+            size = self._group_size(group_index)
+            if is_header:
+                widget.show_header(file_path, size)
+            else:
+                widget.show_duplicate(file_path, size, file_path in self.selected_files)
+            if not widget.visible:
+                widget.place(x=0, y=slot * self.ROW_HEIGHT, relwidth=1.0, height=self.ROW_HEIGHT)
+                widget.visible = True
+        
+        if total:
+            last_row = self._first_row + self._visible_rows
+            self.scrollbar.set(self._first_row / total, last_row / total if last_row < total else 1.0)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
     def delete_selected(self):
         """Delete selected files"""
         if not self.selected_files:
@@ -130,7 +130,8 @@ class StatsPanel(ctk.CTkFrame):
             ("Files Processed", f"{files_processed}"),
             ("Hash Computations Saved", f"{comparisons_saved}"),
             ("Efficiency Gain", f"{efficiency:.1f}%"),
-            ("Smart Comparisons Made", f"{comparisons_made}")
+            ("Smart Comparisons Made", f"{comparisons_made}"),
+            ("Already Linked (hardlinks)", f"{self.optimization_stats.get('hardlinks_collapsed', 0)}")
         ]
         
         for label, value in stats:
@@ -27,9 +27,25 @@ class Config:
             },
             'scanning': {
                 'default_algorithm': 'md5',
+                'prefilter_algorithm': 'auto',
                 'chunk_size': 8192,
+                'io_strategy': 'auto',
                 'min_file_size': 0,
-                'use_quick_scan': True
+                'use_quick_scan': True,
+                'use_hash_cache': True,
+                'scan_workers': 1,
+                'incremental_scan': False,
+                'hash_workers': 4,
+                'pipelined_scan': True,
+                'hash_executor': 'thread',
+                'autotune_io': False,
+                'device_scheduling': False,
+                'rotational_workers': 1,
+                'hash_stages': ['head', 'tail', 'samples'],
+                'block_size': 65536,
+                'sample_blocks': 4,
+                'compare_strategy': 'hash',
+                'direct_compare_max': 3
             },
             'behavior': {
                 'confirm_deletions': True,